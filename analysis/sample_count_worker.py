@@ -0,0 +1,38 @@
+from PySide6.QtCore import QThread, Signal
+
+from lib.datastore.reader import DATA_DIR, count_bars
+
+
+def count_samples(bar_counts, resampling_factor=1, window=1):
+    """Training samples of `window` resampled bars that per-symbol bar counts yield."""
+    step = max(1, resampling_factor)
+    return sum(max(0, bars // step - window + 1) for bars in bar_counts.values())
+
+
+class SampleCountWorker(QThread):
+    """
+    Counts, in the background, the training samples the configured
+    instruments' stored bars yield, for the setup wizard's size estimate.
+    The bar counts come from the catalog's coverage index and Parquet
+    footers; no bars are read until training starts.
+    """
+    counted = Signal(int)
+    failed = Signal(str)
+
+    def __init__(self, config: dict, parent=None):
+        super().__init__(parent)
+        self.config = config
+
+    def run(self):
+        config = self.config
+        try:
+            bar_counts = count_bars(
+                config["instruments"], config["interval"],
+                config["master_start_date"], config["master_end_date"],
+                data_dir=config.get("data_dir") or DATA_DIR,
+            )
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        window = config.get("input_window_size", 1) + config.get("prediction_horizon", 0)
+        self.counted.emit(count_samples(bar_counts, config.get("resampling_factor", 1), window))
@@ -2,6 +2,10 @@ import time
 import random
 from PySide6.QtCore import QObject, Signal, QThread
 
+from analysis.sample_count_worker import count_samples
+from lib.datastore.bar_cache import BAR_CACHE
+from lib.datastore.reader import DATA_DIR, load_bars
+
 
 class Communicate(QObject):
     """Holds signals for the worker thread to communicate with the main UI."""
@@ -19,6 +23,8 @@ class TrainingWorker(QThread):
         self.config = config
         self.comm = Communicate()
         self.all_epoch_data = []
+        self.bars = {}
+        self.samples = 0
 
     def run(self):
         """The main entry point for the training thread."""
@@ -26,9 +32,11 @@ class TrainingWorker(QThread):
         try:
             self.comm.log_message.emit("Training worker started.")
             self.comm.log_message.emit(f"Configuration loaded for experiment: {self.config.get('experiment_name', 'N/A')}")
+            self.bars = self.load_data()
+            self.samples = self.count_samples()
 
             max_epochs = self.config.get("training", {}).get("max_epochs", 10)
-            self.comm.log_message.emit(f"Simulating training for {max_epochs} epochs...")
+            self.comm.log_message.emit(f"Simulating training for {max_epochs} epochs on {self.samples:,} samples...")
 
             for epoch in range(1, max_epochs + 1):
                 time.sleep(1) # Shortened for faster testing
@@ -57,6 +65,42 @@ class TrainingWorker(QThread):
             # Signal that the entire process is done, emitting the final results
             self.comm.training_finished.emit(final_results)
 
+    def load_data(self):
+        """
+        Reads the configured instruments' bars over the master date range, as
+        per-symbol NumPy columns, from the configured data directory. A failed
+        read is reported and leaves the run without bars rather than ending it.
+        """
+        symbols = self.config.get("instruments") or []
+        interval = self.config.get("interval")
+        if not symbols or interval in (None, "All Intervals"):
+            self.comm.log_message.emit("No instruments or no single interval configured; skipping data load.")
+            return {}
+        data_dir = self.config.get("data_dir") or DATA_DIR
+        try:
+            bars = load_bars(
+                symbols, interval, self.config.get("master_start_date"), self.config.get("master_end_date"),
+                data_dir=data_dir, as_arrays=True,
+            )
+        except Exception as e:
+            self.comm.log_message.emit(f"Could not load bars from {data_dir}: {e}")
+            return {}
+        cache = BAR_CACHE.stats()
+        self.comm.log_message.emit(
+            f"Loaded {sum(len(block['date']) for block in bars.values())} {interval} bars "
+            f"for {len(bars)}/{len(symbols)} instruments "
+            f"(bar cache: {cache['hits']} hits, {cache['misses']} misses, {cache['bytes'] / 1e6:.1f} MB)."
+        )
+        return bars
+
+    def count_samples(self):
+        """Training samples the loaded bars yield with the configured window and horizon."""
+        window = self.config.get("input_window_size", 1) + self.config.get("prediction_horizon", 0)
+        return count_samples(
+            {symbol: len(block["date"]) for symbol, block in self.bars.items()},
+            self.config.get("resampling_factor", 1), window,
+        )
+
     def prepare_summary(self):
         """Creates a summary dictionary from the completed training run."""
         if not self.all_epoch_data:
@@ -70,6 +114,7 @@ class TrainingWorker(QThread):
                 "Experiment Name": self.config.get('experiment_name', 'N/A'),
                 "Completed On": time.strftime("%Y-%m-%d %H:%M:%S"),
                 "Total Epochs": len(self.all_epoch_data),
+                "Training Samples": f"{self.samples:,}",
                 "Best Validation Loss": f"{best_epoch['val_loss']:.4f} (Epoch {best_epoch['epoch']})",
             },
             "parameter_configuration": self.config,
@@ -17,6 +17,11 @@ except ImportError:
 SESSION_FILE = os.path.join(os.path.dirname(
     __file__), "..", "..", "generated_data", "session.json")
 
+# Endpoint classes the calls are booked under; the names the quota
+# accountant keeps its budgets by.
+HISTORICAL = "historical"
+DEFAULT = "default"
+
 
 def json_serial(obj):
     """JSON serializer for objects not serializable by default json code"""
@@ -26,12 +31,26 @@ def json_serial(obj):
 
 
 class KiteAPI:
-    def __init__(self):
+    def __init__(self, quota=None):
         self.api_key = API_KEY
         self.api_secret = API_SECRET
         self.kite = KiteConnect(api_key=self.api_key)
         self.access_token = None
         self.key = load_key()
+        self.quota = quota
+
+    def set_quota(self, quota):
+        """
+        Books every later call in `quota`, any object with an
+        `acquire(endpoint)` that waits for room, e.g. the machine-wide
+        accountant the downloaders share.
+        """
+        self.quota = quota
+
+    def book(self, endpoint=DEFAULT):
+        """Waits for room in the injected quota; without one, calls are not booked."""
+        if self.quota is not None:
+            self.quota.acquire(endpoint)
 
     def set_access_token(self, access_token):
         self.access_token = access_token
@@ -41,6 +60,7 @@ class KiteAPI:
         return self.kite.login_url()
 
     def generate_session(self, request_token):
+        self.book(DEFAULT)
         try:
             data = self.kite.generate_session(
                 request_token, api_secret=self.api_secret)
@@ -91,7 +111,8 @@ class KiteAPI:
         if not self.access_token:
             return False
         try:
-            margins = self.get_margins()
+            # A probe, not a use of the API: it is not booked in the quota.
+            margins = self.kite.margins()
             if margins is not None:
                 print("Session is valid.")
                 return True
@@ -109,6 +130,7 @@ class KiteAPI:
             return False
 
     def get_historical_data(self, instrument_token, from_date, to_date, interval):
+        self.book(HISTORICAL)
         try:
             return self.kite.historical_data(
                 instrument_token, from_date, to_date, interval
@@ -122,6 +144,7 @@ class KiteAPI:
             return None
 
     def get_instruments(self):
+        self.book(DEFAULT)
         try:
             return self.kite.instruments()
         except (TokenException, NetworkException) as e:
@@ -133,6 +156,7 @@ class KiteAPI:
             return None
 
     def get_margins(self):
+        self.book(DEFAULT)
         try:
             return self.kite.margins()
         except (TokenException, NetworkException) as e:
@@ -143,6 +167,7 @@ class KiteAPI:
             return None
 
     def get_positions(self):
+        self.book(DEFAULT)
         try:
             return self.kite.positions()
         except (TokenException, NetworkException) as e:
@@ -154,6 +179,7 @@ class KiteAPI:
             return None
 
     def get_holdings(self):
+        self.book(DEFAULT)
         try:
             return self.kite.holdings()
         except (TokenException, NetworkException) as e:
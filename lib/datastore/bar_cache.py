@@ -0,0 +1,143 @@
+"""
+Process-wide cache of decoded bars.
+
+The trainer and later the backtester read the same symbol/interval ranges
+again and again; decoding the Parquet pages each time dominates.
+`BAR_CACHE` keeps the Arrow tables `lib.datastore.reader` has read, keyed by
+(data directory, symbol, interval, columns, date range), within a memory
+budget and evicting the least recently used first. A repeat request is a
+dict lookup; a request for a sub-range of a cached range (and a subset of
+its columns) is served by a zero-copy slice of the cached table, found
+among the few entries of the same series.
+
+Each cached table remembers the set of catalog files its series had when it
+was read. A request made with any other set (new downloads, compaction, a
+file dropped without replacement) misses and discards the series' stale
+entries, so the cache never serves bars the catalog no longer lists.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Default memory budget of the process-wide cache.
+DEFAULT_BUDGET = 1 << 30
+
+
+class BarCache:
+    """
+    LRU cache of per-series bar tables with a byte budget. `start_ns` and
+    `end_ns` bound a range in epoch nanoseconds; None is open-ended.
+    `file_ids` are the ids of every catalog file of the series.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_BUDGET):
+        self.max_bytes = max_bytes
+        # key -> (table, file ids), least recently used first.
+        self._tables = OrderedDict()
+        # (data directory, symbol, interval) -> keys of its cached tables.
+        self._series = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._tables)
+
+    @staticmethod
+    def _covers(key, start_ns, end_ns):
+        cached_start, cached_end = key[4], key[5]
+        return (
+            (cached_start is None or (start_ns is not None and cached_start <= start_ns))
+            and (cached_end is None or (end_ns is not None and end_ns <= cached_end))
+        )
+
+    def _drop(self, key):
+        table, _ = self._tables.pop(key)
+        self.bytes -= table.nbytes
+        keys = self._series[key[:3]]
+        keys.discard(key)
+        if not keys:
+            del self._series[key[:3]]
+
+    def _drop_stale(self, series, file_ids):
+        """Discards the tables of `series` read from another set of files."""
+        for key in list(self._series.get(series, ())):
+            if self._tables[key][1] != file_ids:
+                self._drop(key)
+
+    def _find(self, series, key, start_ns, end_ns, columns):
+        if key in self._tables:
+            return key
+        for cached in self._series.get(series, ()):
+            if self._covers(cached, start_ns, end_ns) and columns <= set(cached[3]):
+                return cached
+        return None
+
+    def get(self, data_dir, symbol, interval, start_ns, end_ns, columns, file_ids):
+        """
+        The cached bars of [start_ns, end_ns] with `columns`, from a cached
+        range that covers it and was read while the series had exactly
+        `file_ids`; None on a miss.
+        """
+        series = (os.path.abspath(data_dir), symbol, interval)
+        key = series + (tuple(columns), start_ns, end_ns)
+        with self._lock:
+            self._drop_stale(series, frozenset(file_ids))
+            found = self._find(series, key, start_ns, end_ns, set(columns))
+            if found is None:
+                self.misses += 1
+                return None
+            self._tables.move_to_end(found)
+            self.hits += 1
+            table = self._tables[found][0]
+        if found == key:
+            return table
+        dates = table.column("date").chunk(0).to_numpy().view(np.int64) if table.num_rows else np.empty(0)
+        low = 0 if start_ns is None else np.searchsorted(dates, start_ns, side="left")
+        high = len(dates) if end_ns is None else np.searchsorted(dates, end_ns, side="right")
+        return table.slice(low, high - low).select(columns)
+
+    def put(self, data_dir, symbol, interval, start_ns, end_ns, table, file_ids):
+        """Caches a date-sorted `table` of [start_ns, end_ns], evicting old entries to fit."""
+        table = table.combine_chunks()
+        size = table.nbytes
+        if size > self.max_bytes:
+            return
+        series = (os.path.abspath(data_dir), symbol, interval)
+        key = series + (tuple(table.column_names), start_ns, end_ns)
+        file_ids = frozenset(file_ids)
+        with self._lock:
+            self._drop_stale(series, file_ids)
+            if key in self._tables:
+                self._drop(key)
+            self._tables[key] = (table, file_ids)
+            self._series.setdefault(series, set()).add(key)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self._drop(next(iter(self._tables)))
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._tables.clear()
+            self._series.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """Counters for logs and diagnostics."""
+        with self._lock:
+            return {
+                "entries": len(self._tables),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+BAR_CACHE = BarCache()
@@ -0,0 +1,380 @@
+import os
+import uuid
+from collections import deque
+from datetime import date, datetime, time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from lib.datastore.compact import (
+    COMPACT_SCHEMA,
+    COMPACT_WRITE_OPTIONS,
+    NS_PER_MINUTE,
+    decode_columns,
+    encode_table,
+    is_compact,
+)
+from lib.datastore.catalog import remove_entry_files
+from lib.datastore.schema import BAR_COLUMNS, BAR_SCHEMA, MARKET_TZ, normalize_dates, to_bar_table
+from lib.datastore.trading_calendar import SessionCoverage
+
+STORE_DIRNAME = "bars"
+# Compact (integer tick) files live in their own tree so each dataset has a
+# single schema.
+COMPACT_STORE_DIRNAME = "bars_compact"
+# CSV copies mirror the partition layout in a separate tree so the Parquet
+# dataset only ever discovers Parquet files.
+CSV_STORE_DIRNAME = "bars_csv"
+# Arrow IPC (Feather v2) files: larger than Parquet but memory-mapped and read
+# without decoding.
+ARROW_STORE_DIRNAME = "bars_arrow"
+PARTITIONED = "Partitioned"
+
+PARQUET = "parquet"
+ARROW = "arrow"
+STORE_FORMATS = (PARQUET, ARROW)
+PARQUET_CODECS = ("zstd", "snappy", "lz4", "none")
+DEFAULT_CODEC = "zstd"
+
+
+def partition_dir(interval, symbol, year, root=STORE_DIRNAME):
+    """Relative directory of one partition, in hive `key=value` form."""
+    return os.path.join(
+        root, f"interval={interval}", f"symbol={symbol}", f"year={year}")
+
+
+class BarWriter:
+    """
+    Streams one symbol/interval into the partitioned store.
+
+    Each call to `write_records` or `write_frame` converts one chunk straight
+    into a typed Arrow table and appends it to the current year's file as its
+    own row group, so memory is bounded by the chunk, not the history. Chunks
+    must arrive in date order; rows not after the last written timestamp
+    (overlap at chunk joins) are dropped and counted in `dropped`. Each
+    returned entry carries the per-day coverage bitmaps of its file.
+
+    With `compact=True` the Parquet files use the integer-tick COMPACT_SCHEMA
+    (see lib.datastore.compact) and go to the compact tree.
+
+    `store_format` picks Parquet (compressed with `codec`) or Arrow IPC, which
+    only supports the lz4 and zstd codecs and is written uncompressed
+    otherwise. By default each chunk becomes one row group (one record batch
+    for Arrow); with `row_group_size`, chunks are buffered and written in
+    groups of exactly that many rows, apart from the last of each file.
+
+    CSV formatting is the slowest part of a write. Given a `csv_encoder`
+    executor (e.g. a process pool), chunks are formatted there while this
+    writer moves on, and the encoded text is appended in chunk order; at most
+    `max_pending_csv` chunks are in flight.
+    """
+
+    def __init__(self, data_dir, symbol, interval, start_date, end_date, save_csv=False,
+                 compact=False, tick_size=None, csv_encoder=None, max_pending_csv=4,
+                 store_format=PARQUET, codec=DEFAULT_CODEC, row_group_size=None):
+        if store_format not in STORE_FORMATS:
+            raise ValueError(f"Unknown store format '{store_format}'.")
+        if compact and store_format != PARQUET:
+            raise ValueError("Compact storage is only available for Parquet files.")
+        self.data_dir = data_dir
+        self.symbol = symbol
+        self.interval = interval
+        self.start_date = start_date
+        self.end_date = end_date
+        self.save_csv = save_csv
+        self.compact = compact
+        self.tick_size = tick_size
+        self.store_format = store_format
+        self.codec = codec
+        self.row_group_size = row_group_size or None
+        self.rows = 0
+        self.dropped = 0
+        self.entries = []
+        self.coverage = SessionCoverage(interval)
+        self._last_ts = None
+        self._year = None
+        self._writer = None
+        self._buffer = []
+        self._csv_path = None
+        self._csv_header = False
+        self._file_info = None
+        self._file_range = None
+        self.csv_encoder = csv_encoder
+        self.max_pending_csv = max_pending_csv
+        self._pending_csv = deque()
+
+    def write_records(self, records):
+        """Appends a chunk of Kite historical records (dicts in date order)."""
+        if records:
+            self.write_table(records_to_table(records))
+
+    def write_frame(self, df):
+        """Appends a chunk given as a bar DataFrame."""
+        if not df.empty:
+            self.write_table(to_bar_table(df))
+
+    def write_table(self, table):
+        """Appends a chunk already converted to a BAR_SCHEMA table."""
+        if table.num_rows:
+            self._write_table(table, pd.DatetimeIndex(table.column("date").to_pandas()))
+
+    def _write_table(self, table, dates):
+        ts = dates.asi8
+        if self._last_ts is not None:
+            keep = ts > self._last_ts
+            if not keep.all():
+                self.dropped += int((~keep).sum())
+                table = table.filter(pa.array(keep))
+                dates = dates[keep]
+                ts = ts[keep]
+        if not len(ts):
+            return
+        self._last_ts = int(ts[-1])
+        self.coverage.add(dates)
+
+        years = dates.year
+        for year in pd.unique(years):
+            mask = years == year
+            part = table if mask.all() else table.filter(pa.array(mask))
+            self._open_year(int(year))
+            self._buffer.append(part)
+            self._flush_rows()
+            if self.save_csv:
+                self._write_csv(part)
+            self.rows += part.num_rows
+
+    def _flush_rows(self, final=False):
+        """Writes the buffered rows out in whole row groups (all of them when `final`)."""
+        if not self._buffer:
+            return
+        # Arrow record batches follow the table's chunk layout, so buffered
+        # chunks are combined into one before writing.
+        table = self._buffer[0] if len(self._buffer) == 1 else pa.concat_tables(self._buffer).combine_chunks()
+        size = self.row_group_size
+        cut = table.num_rows if final or not size else table.num_rows - table.num_rows % size
+        if cut:
+            data = table.slice(0, cut)
+            if self.compact:
+                data = encode_table(data, self.tick_size)
+            if self.store_format == ARROW:
+                self._writer.write_table(data, max_chunksize=size)
+            else:
+                self._writer.write_table(data, row_group_size=size)
+        rest = table.slice(cut)
+        self._buffer = [rest] if rest.num_rows else []
+
+    def _write_csv(self, part):
+        header, self._csv_header = self._csv_header, False
+        if self.csv_encoder is None:
+            self._append_csv(self._csv_path, encode_csv(part, header))
+            return
+        self._pending_csv.append(
+            (self._csv_path, self.csv_encoder.submit(encode_csv, part, header)))
+        while self._pending_csv and (
+                self._pending_csv[0][1].done() or len(self._pending_csv) > self.max_pending_csv):
+            path, future = self._pending_csv.popleft()
+            self._append_csv(path, future.result())
+
+    def _flush_csv(self):
+        while self._pending_csv:
+            path, future = self._pending_csv.popleft()
+            self._append_csv(path, future.result())
+
+    def _append_csv(self, path, text):
+        with open(os.path.join(self.data_dir, path), "a", newline="") as f:
+            f.write(text)
+
+    def _open_year(self, year):
+        if year == self._year:
+            return
+        self._close_year()
+        file_id = str(uuid.uuid4())
+        root = store_root(self.compact, self.store_format)
+        rel_dir = partition_dir(self.interval, self.symbol, year, root=root)
+        os.makedirs(os.path.join(self.data_dir, rel_dir), exist_ok=True)
+        if self.store_format == ARROW:
+            file_key = "arrow_filename"
+            rel_path = os.path.join(rel_dir, f"part-{file_id}.arrow")
+            compression = self.codec if self.codec in ("lz4", "zstd") else None
+            self._writer = pa.ipc.new_file(
+                os.path.join(self.data_dir, rel_path), BAR_SCHEMA,
+                options=pa.ipc.IpcWriteOptions(compression=compression))
+        else:
+            file_key = "parquet_filename"
+            rel_path = os.path.join(rel_dir, f"part-{file_id}.parquet")
+            options = COMPACT_WRITE_OPTIONS if self.compact else {}
+            self._writer = pq.ParquetWriter(
+                os.path.join(self.data_dir, rel_path),
+                COMPACT_SCHEMA if self.compact else BAR_SCHEMA,
+                compression=self.codec, **options)
+        self._year = year
+        self._file_range = (max(self.start_date, date(year, 1, 1)), min(self.end_date, date(year, 12, 31)))
+        self._file_info = {
+            "file_id": file_id,
+            "base_filename": f"{self.symbol}_{self.interval}_{year}",
+            "symbol": self.symbol,
+            "start_date": self._file_range[0].strftime("%Y-%m-%d"),
+            "end_date": self._file_range[1].strftime("%Y-%m-%d"),
+            "interval": self.interval,
+            "sharding": PARTITIONED,
+            "shard_name": str(year),
+            file_key: rel_path,
+        }
+        if self.save_csv:
+            csv_dir = partition_dir(self.interval, self.symbol, year, root=CSV_STORE_DIRNAME)
+            os.makedirs(os.path.join(self.data_dir, csv_dir), exist_ok=True)
+            self._csv_path = os.path.join(csv_dir, f"part-{file_id}.csv")
+            self._csv_header = True
+            self._file_info["csv_filename"] = self._csv_path
+
+    def _close_year(self):
+        if self._writer is not None:
+            self._flush_rows(final=True)
+            self._flush_csv()
+            self._writer.close()
+            self._file_info["coverage"] = self.coverage.rows(*self._file_range)
+            self.entries.append(self._file_info)
+            self._writer = None
+            self._year = None
+
+    def close(self):
+        """Finishes the open partition file and returns one catalog entry per written file."""
+        self._close_year()
+        return self.entries
+
+    def abort(self):
+        """Closes and deletes everything written so far."""
+        for _, future in self._pending_csv:
+            future.cancel()
+        self._pending_csv.clear()
+        self._buffer = []
+        self._close_year()
+        remove_entry_files(self.data_dir, self.entries)
+        self.entries = []
+
+
+def records_to_table(records):
+    """Converts Kite historical records (dicts) to a BAR_SCHEMA table."""
+    dates = pd.DatetimeIndex([r["date"] for r in records])
+    dates = dates.tz_localize(MARKET_TZ) if dates.tz is None else dates.tz_convert(MARKET_TZ)
+    return pa.table(
+        [
+            pa.array(dates, type=BAR_SCHEMA.field("date").type),
+            pa.array([r["open"] for r in records], type=pa.float64()),
+            pa.array([r["high"] for r in records], type=pa.float64()),
+            pa.array([r["low"] for r in records], type=pa.float64()),
+            pa.array([r["close"] for r in records], type=pa.float64()),
+            pa.array([r["volume"] for r in records], type=pa.int64()),
+        ],
+        schema=BAR_SCHEMA,
+    )
+
+
+def encode_csv(table, header):
+    """Formats a bar table as CSV text. Module level so it can run in a process pool."""
+    return table.to_pandas().to_csv(index=False, header=header)
+
+
+def store_root(compact=False, store_format=PARQUET):
+    """Top-level directory of the store tree holding files of the given kind."""
+    if store_format == ARROW:
+        return ARROW_STORE_DIRNAME
+    return COMPACT_STORE_DIRNAME if compact else STORE_DIRNAME
+
+
+def write_bars(data_dir, symbol, interval, df, start_date, end_date, save_csv=False,
+               compact=False, tick_size=None, store_format=PARQUET, codec=DEFAULT_CODEC,
+               row_group_size=None):
+    """
+    Writes `df` into the partitioned store under `data_dir`, one file per
+    calendar year. Returns a catalog entry per written file with paths
+    relative to `data_dir`. Each entry's date range is the requested
+    [start_date, end_date] clipped to its year, so coverage still counts
+    holidays and weekends inside the request as downloaded.
+    """
+    writer = BarWriter(
+        data_dir, symbol, interval, start_date, end_date, save_csv, compact, tick_size,
+        store_format=store_format, codec=codec, row_group_size=row_group_size)
+    writer.write_frame(normalize_dates(df).sort_values("date", ignore_index=True))
+    return writer.close()
+
+
+def _as_timestamp(value, end=False):
+    if isinstance(value, datetime):
+        ts = pd.Timestamp(value)
+    elif isinstance(value, date):
+        ts = pd.Timestamp(datetime.combine(value, time.max if end else time.min))
+    else:
+        ts = pd.Timestamp(value)
+    return ts.tz_localize(MARKET_TZ) if ts.tzinfo is None else ts.tz_convert(MARKET_TZ)
+
+
+def read_bar_file(path, columns=None):
+    """Reads one stored Parquet or Arrow file as a bar DataFrame, decoding compact files."""
+    if path.endswith(".arrow"):
+        table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    else:
+        table = pq.read_table(path)
+    if is_compact(table):
+        table = decode_columns(table)
+    return table.to_pandas() if columns is None else table.select(columns).to_pandas()
+
+
+def _date_bound(ts, compact, lower):
+    if compact:
+        minute = -(-ts.value // NS_PER_MINUTE) if lower else ts.value // NS_PER_MINUTE
+        return ds.field("minute") >= minute if lower else ds.field("minute") <= minute
+    return ds.field("date") >= ts if lower else ds.field("date") <= ts
+
+
+def _bounds_filter(start=None, end=None, compact=False):
+    expr = None
+    for value, lower in ((start, True), (end, False)):
+        if value is not None:
+            bound = _date_bound(_as_timestamp(value, end=not lower), compact, lower)
+            expr = bound if expr is None else expr & bound
+    return expr
+
+
+def _frame_to_table(df, start, end, columns):
+    """Filters a bar DataFrame to [start, end] and `columns` as a typed table."""
+    df = normalize_dates(df)
+    if start is not None:
+        df = df[df["date"] >= _as_timestamp(start)]
+    if end is not None:
+        df = df[df["date"] <= _as_timestamp(end, end=True)]
+    schema = pa.schema([BAR_SCHEMA.field(column) for column in columns])
+    return pa.Table.from_pandas(df[columns], schema=schema, preserve_index=False)
+
+
+def read_entry(data_dir, entry, start=None, end=None, columns=None):
+    """
+    Reads the file behind one catalog entry as an Arrow table in the standard
+    schema, preferring Arrow, then Parquet, then CSV. The [start, end] bounds
+    and `columns` are pushed down to the scan, so only the row groups and
+    columns that match are decoded. Files that predate the typed schema
+    (naive or string dates) are read whole and filtered afterwards. Returns
+    None if none of the entry's files exists.
+    """
+    columns = list(BAR_COLUMNS) if columns is None else list(dict.fromkeys(["date", *columns]))
+    for key, file_format in (("arrow_filename", "ipc"), ("parquet_filename", "parquet")):
+        path = os.path.join(data_dir, entry[key]) if entry.get(key) else None
+        if not path or not os.path.exists(path):
+            continue
+        dataset = ds.dataset(path, format=file_format)
+        if is_compact(dataset.schema):
+            scan_columns = ["minute" if column == "date" else column for column in columns]
+            return decode_columns(dataset.to_table(
+                columns=scan_columns + ["tick_size"], filter=_bounds_filter(start, end, compact=True)))
+        if "date" in dataset.schema.names and dataset.schema.field("date").type == BAR_SCHEMA.field("date").type:
+            return dataset.to_table(columns=columns, filter=_bounds_filter(start, end))
+        return _frame_to_table(read_bar_file(path), start, end, columns)
+    if entry.get("csv_filename"):
+        path = os.path.join(data_dir, entry["csv_filename"])
+        if os.path.exists(path):
+            return _frame_to_table(
+                pd.read_csv(path, usecols=lambda name: name in columns), start, end, columns)
+    return None
+
@@ -0,0 +1,363 @@
+import json
+import os
+import pathlib
+import sqlite3
+import threading
+from datetime import date, datetime
+
+CATALOG_FILENAME = "catalog.sqlite3"
+LEGACY_METADATA_FILENAME = "metadata.json"
+
+# Columns of a catalog entry, in the same shape as the old metadata.json items.
+ENTRY_FIELDS = (
+    "file_id",
+    "base_filename",
+    "symbol",
+    "interval",
+    "start_date",
+    "end_date",
+    "sharding",
+    "shard_name",
+    "csv_filename",
+    "parquet_filename",
+    "arrow_filename",
+)
+# Entry fields that name a stored file, relative to the data directory.
+FILE_KEYS = ("csv_filename", "parquet_filename", "arrow_filename")
+# Counters of the per-symbol ingest quality summary (see lib.datastore.validation).
+QUALITY_FIELDS = (
+    "rows",
+    "unsorted",
+    "duplicates",
+    "invalid_prices",
+    "repaired_bounds",
+    "negative_volume",
+    "spikes",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    file_id TEXT PRIMARY KEY,
+    base_filename TEXT,
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    sharding TEXT,
+    shard_name TEXT,
+    csv_filename TEXT,
+    parquet_filename TEXT,
+    arrow_filename TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_datasets_symbol_interval
+    ON datasets (symbol, interval, start_date);
+CREATE INDEX IF NOT EXISTS idx_datasets_interval
+    ON datasets (interval);
+CREATE TABLE IF NOT EXISTS coverage (
+    file_id TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    day TEXT NOT NULL,
+    bars INTEGER NOT NULL,
+    bitmap BLOB NOT NULL,
+    PRIMARY KEY (file_id, day)
+);
+CREATE INDEX IF NOT EXISTS idx_coverage_symbol_interval
+    ON coverage (symbol, interval, day);
+CREATE TABLE IF NOT EXISTS quality (
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    unsorted INTEGER NOT NULL,
+    duplicates INTEGER NOT NULL,
+    invalid_prices INTEGER NOT NULL,
+    repaired_bounds INTEGER NOT NULL,
+    negative_volume INTEGER NOT NULL,
+    spikes INTEGER NOT NULL,
+    max_spike REAL NOT NULL,
+    checked_at TEXT NOT NULL,
+    PRIMARY KEY (symbol, interval)
+);
+CREATE TABLE IF NOT EXISTS empty_sessions (
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    day TEXT NOT NULL,
+    checked_at TEXT NOT NULL,
+    PRIMARY KEY (symbol, interval, day)
+);
+"""
+
+
+class DatasetCatalog:
+    """
+    An indexed, transactional catalog of downloaded datasets backed by SQLite.
+
+    Each row describes one stored file (or shard) keyed by symbol, interval,
+    date range and file names. Entries may carry a "coverage" list of
+    (day, bars, bitmap) rows (see lib.datastore.coverage), stored per file
+    alongside the entry and dropped with it. Separate tables keep the latest
+    ingest quality summary per symbol and interval, and the days an update
+    fetched that came back without bars, so they are not fetched again.
+    Writes are single-row inserts inside a transaction, so concurrent
+    workers and processes never clobber each other.
+    """
+
+    def __init__(self, path, read_only=False):
+        self.path = path
+        self._lock = threading.Lock()
+        if read_only:
+            # Readers never create the file or touch its schema.
+            uri = f"{pathlib.Path(path).absolute().as_uri()}?mode=ro"
+            self._conn = sqlite3.connect(uri, uri=True, timeout=30, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            return
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._upgrade_schema()
+
+    def _upgrade_schema(self):
+        """Adds entry columns introduced after a catalog file was created."""
+        existing = {row["name"] for row in self._conn.execute("PRAGMA table_info(datasets)")}
+        with self._conn:
+            for key in ENTRY_FIELDS:
+                if key not in existing:
+                    self._conn.execute(f"ALTER TABLE datasets ADD COLUMN {key} TEXT")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _row_to_entry(self, row):
+        return {key: row[key] for key in ENTRY_FIELDS if row[key] is not None}
+
+    def replace(self, new_entries, old_file_ids=()):
+        """Adds `new_entries` and removes `old_file_ids` in one transaction."""
+        created_at = datetime.now().isoformat(timespec="seconds")
+        rows = [
+            tuple(entry.get(key) for key in ENTRY_FIELDS) + (created_at,)
+            for entry in new_entries
+        ]
+        placeholders = ", ".join("?" * (len(ENTRY_FIELDS) + 1))
+        old_ids = [(file_id,) for file_id in old_file_ids]
+        with self._lock, self._conn:
+            if old_ids:
+                self._conn.executemany("DELETE FROM datasets WHERE file_id = ?", old_ids)
+                self._conn.executemany("DELETE FROM coverage WHERE file_id = ?", old_ids)
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO datasets ({', '.join(ENTRY_FIELDS)}, created_at) "
+                f"VALUES ({placeholders})",
+                rows,
+            )
+            for entry in new_entries:
+                if "coverage" in entry:
+                    self._insert_coverage(entry, entry["coverage"])
+
+    def _insert_coverage(self, entry, rows):
+        self._conn.execute("DELETE FROM coverage WHERE file_id = ?", (entry["file_id"],))
+        self._conn.executemany(
+            "INSERT INTO coverage (file_id, symbol, interval, day, bars, bitmap) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (entry["file_id"], entry["symbol"], entry["interval"], day, bars, bitmap)
+                for day, bars, bitmap in rows
+            ],
+        )
+
+    def set_coverage(self, entry, rows):
+        """Replaces the coverage rows of an existing entry."""
+        with self._lock, self._conn:
+            self._insert_coverage(entry, rows)
+
+    def coverage_rows(self, symbols, interval, start=None, end=None):
+        """
+        Returns (symbol, day, bars, bitmap) coverage rows of `symbols` at
+        `interval`, optionally limited to days in [start, end]. A day covered
+        by several files has one row per file.
+        """
+        symbols = list(symbols)
+        clauses = [f"symbol IN ({', '.join('?' * len(symbols))})", "interval = ?"]
+        args = symbols + [interval]
+        if start is not None:
+            clauses.append("day >= ?")
+            args.append(start.isoformat())
+        if end is not None:
+            clauses.append("day <= ?")
+            args.append(end.isoformat())
+        query = (
+            "SELECT symbol, day, bars, bitmap FROM coverage WHERE "
+            + " AND ".join(clauses) + " ORDER BY symbol, day"
+        )
+        with self._lock:
+            rows = self._conn.execute(query, args).fetchall()
+        return [tuple(row) for row in rows]
+
+    def entries_without_coverage(self):
+        """Returns the entries that have no coverage rows, e.g. files written before the index."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM datasets WHERE file_id NOT IN (SELECT DISTINCT file_id FROM coverage) "
+                "ORDER BY symbol, interval, start_date"
+            ).fetchall()
+        return [self._row_to_entry(row) for row in rows]
+
+    def set_quality(self, symbol, interval, report):
+        """Stores the quality summary of the latest ingest of `symbol` at `interval`."""
+        keys = QUALITY_FIELDS + ("max_spike",)
+        row = (symbol, interval) + tuple(report[key] for key in keys) + (
+            datetime.now().isoformat(timespec="seconds"),)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO quality (symbol, interval, {', '.join(keys)}, checked_at) "
+                f"VALUES ({', '.join('?' * len(row))})",
+                row,
+            )
+
+    def quality(self, symbol=None, interval=None):
+        """Returns the stored quality summaries as dicts, optionally for one symbol and/or interval."""
+        clauses, args = [], []
+        if symbol is not None:
+            clauses.append("symbol = ?")
+            args.append(symbol)
+        if interval is not None:
+            clauses.append("interval = ?")
+            args.append(interval)
+        query = "SELECT * FROM quality"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY symbol, interval", args).fetchall()
+        return [dict(row) for row in rows]
+
+    def mark_empty(self, symbol, interval, days):
+        """Records `days` (dates) as fetched for `symbol` at `interval` and found to have no bars."""
+        checked_at = datetime.now().isoformat(timespec="seconds")
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO empty_sessions (symbol, interval, day, checked_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(symbol, interval, day.isoformat(), checked_at) for day in days],
+            )
+
+    def empty_days(self, symbol, interval, start=None, end=None):
+        """Returns the set of days (dates) recorded by `mark_empty`, optionally within [start, end]."""
+        clauses = ["symbol = ?", "interval = ?"]
+        args = [symbol, interval]
+        if start is not None:
+            clauses.append("day >= ?")
+            args.append(start.isoformat())
+        if end is not None:
+            clauses.append("day <= ?")
+            args.append(end.isoformat())
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT day FROM empty_sessions WHERE " + " AND ".join(clauses), args).fetchall()
+        return {date.fromisoformat(row["day"]) for row in rows}
+
+    def add(self, entries):
+        """Appends `entries` to the catalog."""
+        self.replace(entries)
+
+    def remove(self, file_ids):
+        """Deletes the entries with the given file ids."""
+        self.replace([], file_ids)
+
+    def entries(self, symbol=None, interval=None):
+        """Returns catalog entries, optionally restricted to a symbol and/or interval."""
+        clauses, args = [], []
+        if symbol is not None:
+            clauses.append("symbol = ?")
+            args.append(symbol)
+        if interval is not None:
+            clauses.append("interval = ?")
+            args.append(interval)
+        query = "SELECT * FROM datasets"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY symbol, interval, start_date"
+        with self._lock:
+            rows = self._conn.execute(query, args).fetchall()
+        return [self._row_to_entry(row) for row in rows]
+
+    def spans(self):
+        """Returns (symbol, interval, first start_date, last end_date) of every stored series."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT symbol, interval, MIN(start_date), MAX(end_date) FROM datasets "
+                "GROUP BY symbol, interval ORDER BY symbol, interval").fetchall()
+        return [tuple(row) for row in rows]
+
+    def intervals(self):
+        """Returns the sorted list of intervals that have at least one dataset."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT interval FROM datasets ORDER BY interval").fetchall()
+        return [row["interval"] for row in rows]
+
+    def symbols(self, interval=None):
+        """Returns the sorted symbols available, optionally for a single interval."""
+        query = "SELECT DISTINCT symbol FROM datasets"
+        args = []
+        if interval is not None:
+            query += " WHERE interval = ?"
+            args.append(interval)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY symbol", args).fetchall()
+        return [row["symbol"] for row in rows]
+
+
+def remove_entry_files(data_dir, entries):
+    """Deletes the files behind `entries`, e.g. once the catalog no longer lists them."""
+    for entry in entries:
+        for key in FILE_KEYS:
+            if entry.get(key):
+                path = os.path.join(data_dir, entry[key])
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+def import_metadata_json(catalog, metadata_path):
+    """One-shot import of a legacy metadata.json into `catalog`. Returns the number of entries."""
+    with open(metadata_path, "r") as f:
+        metadata = json.load(f)
+    catalog.add(metadata)
+    return len(metadata)
+
+
+def open_catalog(data_dir, read_only=False):
+    """
+    Opens the catalog of `data_dir`, creating it on first use. A fresh catalog
+    is seeded from the directory's legacy metadata.json if there is one.
+    With `read_only`, the catalog must already exist (FileNotFoundError
+    otherwise) and is opened for queries only.
+    """
+    path = os.path.join(data_dir, CATALOG_FILENAME)
+    if read_only:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No dataset catalog in {os.path.abspath(data_dir)}")
+        return DatasetCatalog(path, read_only=True)
+    is_new = not os.path.exists(path)
+    catalog = DatasetCatalog(path)
+    metadata_path = os.path.join(data_dir, LEGACY_METADATA_FILENAME)
+    if is_new and os.path.exists(metadata_path):
+        import_metadata_json(catalog, metadata_path)
+    return catalog
+
+
+if __name__ == "__main__":
+    import sys
+
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else "generated_data"
+    with DatasetCatalog(os.path.join(data_dir, CATALOG_FILENAME)) as catalog:
+        imported = import_metadata_json(
+            catalog, os.path.join(data_dir, LEGACY_METADATA_FILENAME))
+        print(f"Imported {imported} entries into {catalog.path}")
@@ -0,0 +1,132 @@
+"""
+Compact bar encoding: prices as int32 multiples of the instrument's tick size,
+volume as uint64 and timestamps as int32 minutes since the Unix epoch.
+
+In memory a bar shrinks from 48 bytes (datetime64 + 4 x float64 + int64) to
+28. On disk the integer columns are delta encoded, which makes a minute file
+about a quarter of the size of the float version. The files also carry a
+constant `tick_size` column, dictionary encoded to a few bytes per row group,
+so multi-symbol scans can be decoded without a lookup. Decoding is lossless:
+prices are rebuilt as the nearest double to `ticks * tick_size` at 4 decimals,
+which is exactly the float Kite returned.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from lib.datastore.schema import MARKET_TZ, to_bar_table
+
+PRICE_COLUMNS = ["open", "high", "low", "close"]
+# Fallback grid for instruments whose listed tick is missing or does not fit
+# their history (ticks change over time, e.g. 0.05 -> 0.01).
+PAISA = 0.01
+PRICE_DECIMALS = 4
+NS_PER_MINUTE = 60 * 1_000_000_000
+
+COMPACT_SCHEMA = pa.schema([
+    ("minute", pa.int32()),
+    ("open", pa.int32()),
+    ("high", pa.int32()),
+    ("low", pa.int32()),
+    ("close", pa.int32()),
+    ("volume", pa.uint64()),
+    ("tick_size", pa.float64()),
+])
+# Integer ticks and minutes move in small steps bar to bar, so delta encoding
+# stores them in a few bits each; the constant tick column stays dictionary
+# encoded.
+COMPACT_WRITE_OPTIONS = {
+    "use_dictionary": ["tick_size"],
+    "column_encoding": {
+        name: "DELTA_BINARY_PACKED"
+        for name in ("minute", "open", "high", "low", "close", "volume")
+    },
+}
+
+
+def _to_ticks(prices, tick_size):
+    ticks = np.rint(prices / tick_size)
+    exact = np.abs(ticks * tick_size - prices) <= tick_size * 1e-6
+    return ticks, bool(exact.all())
+
+
+def encode_prices(prices, tick_size):
+    """
+    Converts a 2-D float price array to int32 ticks. Falls back to a paisa grid
+    when the prices are not on `tick_size`. Returns (ticks, tick_size_used).
+    """
+    for tick in dict.fromkeys(t for t in (tick_size, PAISA) if t and t > 0):
+        ticks, exact = _to_ticks(prices, tick)
+        if exact:
+            if ticks.size and (ticks.max() > np.iinfo(np.int32).max or ticks.min() < 0):
+                raise ValueError("Prices out of range for int32 ticks.")
+            return ticks.astype(np.int32), tick
+    raise ValueError("Prices are not on the instrument's tick grid.")
+
+
+def encode_table(table, tick_size):
+    """Encodes a table in the standard bar schema into COMPACT_SCHEMA."""
+    dates = pd.DatetimeIndex(table.column("date").to_pandas())
+    if (dates.asi8 % NS_PER_MINUTE).any():
+        raise ValueError("Timestamps are not minute-aligned.")
+    minutes = dates.asi8 // NS_PER_MINUTE
+    prices = np.column_stack([
+        table.column(name).to_numpy(zero_copy_only=False) for name in PRICE_COLUMNS
+    ]) if table.num_rows else np.empty((0, 4))
+    ticks, tick_used = encode_prices(prices, tick_size)
+
+    volume = table.column("volume").to_numpy(zero_copy_only=False)
+    if volume.size and volume.min() < 0:
+        raise ValueError("Negative volume cannot be stored as uint64.")
+
+    return pa.table(
+        [
+            pa.array(minutes.astype(np.int32)),
+            *(pa.array(ticks[:, i]) for i in range(4)),
+            pa.array(volume.astype(np.uint64)),
+            pa.array(np.full(table.num_rows, tick_used)),
+        ],
+        schema=COMPACT_SCHEMA,
+    )
+
+
+def decode_columns(table):
+    """Decodes compact columns of `table` back to float prices and tz-aware dates, in place of the originals."""
+    names = table.column_names
+    tick = table.column("tick_size").to_numpy(zero_copy_only=False)
+    for name in PRICE_COLUMNS:
+        if name in names:
+            prices = np.round(table.column(name).to_numpy(zero_copy_only=False) * tick, PRICE_DECIMALS)
+            table = table.set_column(names.index(name), name, pa.array(prices))
+    if "volume" in names:
+        table = table.set_column(
+            names.index("volume"), "volume", table.column("volume").cast(pa.int64()))
+    if "minute" in names:
+        ns = table.column("minute").to_numpy(zero_copy_only=False).astype(np.int64) * NS_PER_MINUTE
+        dates = pa.array(ns, type=pa.timestamp("ns", tz=MARKET_TZ))
+        table = table.set_column(names.index("minute"), "date", dates)
+    return table.drop_columns(["tick_size"])
+
+
+def is_compact(table_or_schema):
+    schema = getattr(table_or_schema, "schema", table_or_schema)
+    return "minute" in schema.names and "tick_size" in schema.names
+
+
+def to_compact_frame(df, tick_size):
+    """
+    In-memory compact form of a bar DataFrame: int32/uint64 columns only. The
+    tick size used is kept in `attrs["tick_size"]` instead of a column.
+    """
+    table = encode_table(to_bar_table(df), tick_size)
+    tick_used = table.column("tick_size")[0].as_py() if table.num_rows else tick_size
+    compact = table.drop_columns(["tick_size"]).to_pandas()
+    compact.attrs["tick_size"] = tick_used
+    return compact
+
+
+def from_compact_frame(df):
+    """Inverse of `to_compact_frame`: a float bar DataFrame with tz-aware dates."""
+    table = pa.Table.from_pandas(
+        df.assign(tick_size=df.attrs["tick_size"]), schema=COMPACT_SCHEMA, preserve_index=False)
+    return decode_columns(table).to_pandas()
@@ -0,0 +1,192 @@
+"""
+Compacts the stored files of each symbol/interval.
+
+"By Day" and "By Week" sharding leave thousands of tiny files, and repeated
+or overlapping downloads leave several files covering the same days; opening
+them all dominates read time. Compaction groups a series' catalog entries
+into contiguous date blocks and rewrites every block held in more files than
+it has calendar years as one sorted, deduplicated file per year in the
+partitioned store. Where files overlap, rows of the entry that starts later
+win. The new entries replace the old ones in a single catalog transaction, and
+the old files are deleted only after it commits, so a crash at any point
+leaves the catalog pointing at a complete set of files.
+
+Usage: python -m lib.datastore.compaction [data_dir] [--intervals ...] [--symbols ...]
+           [--format parquet] [--codec zstd] [--csv] [--dry-run]
+"""
+import argparse
+import os
+from datetime import datetime
+
+from lib.datastore.bar_store import (
+    COMPACT_STORE_DIRNAME,
+    DEFAULT_CODEC,
+    PARQUET,
+    PARQUET_CODECS,
+    STORE_FORMATS,
+    write_bars,
+)
+from lib.datastore.catalog import FILE_KEYS, open_catalog, remove_entry_files
+from lib.downloader.incremental import DATE_FORMAT, covered_ranges, load_entries
+
+
+def _entry_files(data_dir, entries):
+    paths = [
+        os.path.join(data_dir, entry[key])
+        for entry in entries for key in FILE_KEYS if entry.get(key)
+    ]
+    return [path for path in paths if os.path.exists(path)]
+
+
+def _entry_dates(entry):
+    return (
+        datetime.strptime(entry["start_date"], DATE_FORMAT).date(),
+        datetime.strptime(entry["end_date"], DATE_FORMAT).date(),
+    )
+
+
+def _usage(data_dir, entries):
+    paths = _entry_files(data_dir, entries)
+    return len(paths), sum(os.path.getsize(path) for path in paths)
+
+
+def plan_compaction(entries):
+    """
+    Groups one series' entries into contiguous blocks and returns the
+    [(start, end, entries)] blocks that need rewriting: those held in more
+    files than the calendar years they span.
+    """
+    plan = []
+    for start, end in covered_ranges(entries):
+        block = [
+            entry for entry in entries
+            if start <= _entry_dates(entry)[0] and _entry_dates(entry)[1] <= end
+        ]
+        if len(block) > end.year - start.year + 1:
+            plan.append((start, end, sorted(block, key=_entry_dates)))
+    return plan
+
+
+def compact_series(data_dir, symbol, interval, catalog, dry_run=False, **write_options):
+    """
+    Compacts the files of one symbol/interval. `write_options` go to
+    `write_bars`; unless given, `compact` follows the files being merged when
+    writing Parquet, and a CSV copy is kept when any merged file had one.
+    Returns a report dict with files, bytes and rows before and after.
+    """
+    entries = catalog.entries(symbol, interval)
+    plan = plan_compaction(entries)
+    old_entries = [entry for _, _, block in plan for entry in block]
+    files_before, bytes_before = _usage(data_dir, old_entries)
+    report = {
+        "symbol": symbol,
+        "interval": interval,
+        "blocks": len(plan),
+        "entries_before": len(old_entries),
+        "files_before": files_before,
+        "bytes_before": bytes_before,
+        "rows_before": 0,
+        "entries_after": len(old_entries),
+        "files_after": files_before,
+        "bytes_after": bytes_before,
+        "rows_after": 0,
+    }
+    if dry_run or not plan:
+        return report
+
+    new_entries = []
+    superseded = []
+    try:
+        for start, end, block in plan:
+            df = load_entries(data_dir, block)
+            if df.empty:
+                continue
+            report["rows_before"] += len(df)
+            df = df.drop_duplicates(subset="date", keep="last")
+            report["rows_after"] += len(df)
+            options = dict(write_options)
+            options.setdefault("compact", options.get("store_format", PARQUET) == PARQUET and any(
+                entry.get("parquet_filename", "").startswith(COMPACT_STORE_DIRNAME)
+                for entry in block
+            ))
+            options.setdefault("save_csv", any(entry.get("csv_filename") for entry in block))
+            new_entries += write_bars(data_dir, symbol, interval, df, start, end, **options)
+            superseded += block
+    except Exception:
+        remove_entry_files(data_dir, new_entries)
+        raise
+
+    catalog.replace(new_entries, [entry["file_id"] for entry in superseded])
+    remove_entry_files(data_dir, superseded)
+
+    untouched = [entry for entry in old_entries if entry not in superseded]
+    report["entries_after"] = len(new_entries) + len(untouched)
+    report["files_after"], report["bytes_after"] = _usage(data_dir, new_entries + untouched)
+    return report
+
+
+def compact_store(data_dir, intervals=None, symbols=None, dry_run=False, progress=None,
+                  **write_options):
+    """
+    Compacts every symbol/interval of `data_dir` (or the given subsets).
+    Calls `progress(report)` after each series and returns the reports of
+    the series that had something to compact.
+    """
+    reports = []
+    with open_catalog(data_dir) as catalog:
+        for interval in intervals or catalog.intervals():
+            for symbol in symbols or catalog.symbols(interval):
+                report = compact_series(data_dir, symbol, interval, catalog, dry_run, **write_options)
+                if report["blocks"]:
+                    reports.append(report)
+                    if progress:
+                        progress(report)
+    return reports
+
+
+def _format_report(report, dry_run=False):
+    before = f"{report['files_before']} files / {report['bytes_before'] / 1024:.1f} KB"
+    if dry_run:
+        return f"{report['symbol']} {report['interval']}: {before} in {report['blocks']} block(s) to merge"
+    return (
+        f"{report['symbol']} {report['interval']}: {before} -> "
+        f"{report['files_after']} files / {report['bytes_after'] / 1024:.1f} KB"
+        + (f", {report['rows_before'] - report['rows_after']} duplicate rows dropped"
+           if report["rows_before"] else "")
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge small and overlapping bar files.")
+    parser.add_argument("data_dir", nargs="?", default="generated_data")
+    parser.add_argument("--intervals", nargs="*")
+    parser.add_argument("--symbols", nargs="*")
+    parser.add_argument("--format", dest="store_format", choices=STORE_FORMATS, default=PARQUET)
+    parser.add_argument("--codec", choices=PARQUET_CODECS, default=DEFAULT_CODEC)
+    parser.add_argument("--csv", dest="save_csv", action="store_true",
+                        help="Also write CSV copies of every merged file, not only of "
+                             "those merged from files that had one.")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be merged.")
+    args = parser.parse_args()
+
+    write_options = {"store_format": args.store_format, "codec": args.codec}
+    if args.save_csv:
+        write_options["save_csv"] = True
+    reports = compact_store(
+        args.data_dir, args.intervals, args.symbols, args.dry_run,
+        progress=lambda report: print(_format_report(report, args.dry_run)),
+        **write_options,
+    )
+    if not reports:
+        print(f"Nothing to compact in {args.data_dir}.")
+    elif args.dry_run:
+        print(f"{len(reports)} series would be merged, "
+              f"{sum(report['files_before'] for report in reports)} files in total.")
+    else:
+        totals = {key: sum(report[key] for report in reports)
+                  for key in ("files_before", "bytes_before", "files_after", "bytes_after")}
+        print(
+            f"{len(reports)} series merged: {totals['files_before']} files / "
+            f"{totals['bytes_before'] / 1e6:.2f} MB -> {totals['files_after']} files / "
+            f"{totals['bytes_after'] / 1e6:.2f} MB"
+        )
@@ -0,0 +1,109 @@
+"""
+Per-day completeness index for stored bars.
+
+For every trading day a stored file covers, the catalog keeps a bitmap over
+the session's bar slots (375 bits for minute bars, one for day bars) with a
+bit set where a bar exists. BarWriter builds the bitmaps as it writes (see
+trading_calendar.SessionCoverage), in one vectorized pass per chunk, so
+completeness is known at ingest and queries never reopen data files. Days
+with a row but no bits set are missing sessions; days with no row at all
+have unknown coverage (files written before the index existed;
+`python -m lib.datastore.coverage` backfills them).
+
+Usage: python -m lib.datastore.coverage [data_dir]
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from lib.datastore.catalog import open_catalog
+from lib.datastore.trading_calendar import SessionCoverage, known_sessions, slots_per_day
+from lib.downloader.incremental import DATE_FORMAT, load_entries
+
+
+def unpack_bitmap(bitmap, interval):
+    """Bool array of the session slots set in a stored bitmap."""
+    return np.unpackbits(np.frombuffer(bitmap, dtype=np.uint8), count=slots_per_day(interval)).astype(bool)
+
+
+def day_bars(catalog, symbols, interval, start=None, end=None):
+    """
+    Bars present per symbol and day, with the bitmaps of overlapping files
+    OR-merged. Returns a DataFrame with columns symbol, day (date), bars.
+    """
+    rows = catalog.coverage_rows(symbols, interval, start, end)
+    if not rows:
+        return pd.DataFrame({"symbol": [], "day": [], "bars": []})
+    frame = pd.DataFrame(rows, columns=["symbol", "day", "bars", "bitmap"])
+    repeated = frame.duplicated(["symbol", "day"], keep=False)
+    if repeated.any():
+        group = frame[repeated].sort_values(["symbol", "day"], ignore_index=True)
+        # All bitmaps of one interval have the same width.
+        bits = np.frombuffer(b"".join(group["bitmap"]), dtype=np.uint8).reshape(len(group), -1)
+        starts = np.flatnonzero(~group.duplicated(["symbol", "day"]).to_numpy())
+        merged = np.bitwise_or.reduceat(bits, starts, axis=0)
+        frame = pd.concat([
+            frame[~repeated],
+            pd.DataFrame({
+                "symbol": group["symbol"].to_numpy()[starts],
+                "day": group["day"].to_numpy()[starts],
+                "bars": np.unpackbits(merged, axis=1).sum(axis=1).astype(np.int64),
+                "bitmap": None,
+            }),
+        ], ignore_index=True)
+    frame["day"] = pd.to_datetime(frame["day"]).dt.date
+    return frame[["symbol", "day", "bars"]].sort_values(["symbol", "day"], ignore_index=True)
+
+
+def missing_sessions(catalog, symbol, interval, start, end):
+    """
+    Trading days in [start, end] whose indexed coverage has no bars at all.
+    Days in years without a holiday list are never reported.
+    """
+    bars = day_bars(catalog, [symbol], interval, start, end)
+    open_days = set(known_sessions(start, end).astype(object))
+    return [day for day, count in zip(bars["day"], bars["bars"]) if count == 0 and day in open_days]
+
+
+def coverage_summary(catalog, symbols, interval, start, end):
+    """
+    Completeness of `symbols` over the trading sessions in [start, end]:
+    counts of complete, partial, missing and unknown (never indexed) sessions.
+    Only the years with a holiday list have known sessions.
+    """
+    sessions = known_sessions(start, end).astype(object)
+    expected = slots_per_day(interval)
+    bars = day_bars(catalog, symbols, interval, start, end)
+    bars = bars[bars["day"].isin(set(sessions))]
+    complete = int((bars["bars"] >= expected).sum())
+    missing = int((bars["bars"] == 0).sum())
+    total = len(sessions) * len(symbols)
+    return {
+        "sessions": total,
+        "complete": complete,
+        "partial": len(bars) - complete - missing,
+        "missing": missing,
+        "unknown": total - len(bars),
+    }
+
+
+def backfill_coverage(data_dir):
+    """Indexes the catalogued files that have no coverage rows yet. Returns the number indexed."""
+    indexed = 0
+    with open_catalog(data_dir) as catalog:
+        for entry in catalog.entries_without_coverage():
+            df = load_entries(data_dir, [entry])
+            coverage = SessionCoverage(entry["interval"])
+            if not df.empty:
+                coverage.add(df["date"])
+            start = pd.to_datetime(entry["start_date"], format=DATE_FORMAT).date()
+            end = pd.to_datetime(entry["end_date"], format=DATE_FORMAT).date()
+            catalog.set_coverage(entry, coverage.rows(start, end))
+            indexed += 1
+    return indexed
+
+
+if __name__ == "__main__":
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else "generated_data"
+    print(f"Indexed coverage of {backfill_coverage(data_dir)} file(s) in {data_dir}.")
@@ -0,0 +1,106 @@
+"""
+In-memory index of the date spans stored per symbol and interval.
+
+Built once from the catalog (one grouped query), it keeps, per interval and
+for all intervals together, the sorted symbols with the first and last stored
+day of each as integer day ordinals (`date.toordinal()`). Availability, span
+and overlap queries for a selection are then a binary search plus a few array
+reductions over the selected symbols, with no date parsing and no scan over
+the catalog's entries.
+"""
+from datetime import date
+
+import numpy as np
+
+# Ordinal of the day numpy's datetime64[D] counts from.
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def to_ordinals(days):
+    """Day ordinals of an iterable of dates or 'YYYY-MM-DD' strings."""
+    return np.array(list(days), dtype="datetime64[D]").astype(np.int64) + EPOCH_ORDINAL
+
+
+class DatasetIndex:
+    """
+    Stored date spans keyed by (symbol, interval). `interval=None` in the
+    queries means any interval: a symbol's span is then the union extent of
+    all its intervals.
+    """
+
+    def __init__(self, spans=()):
+        spans = list(spans)
+        self._series = {}
+        if not spans:
+            return
+        symbols, intervals, starts, ends = (np.array(column) for column in zip(*spans))
+        first, last = to_ordinals(starts), to_ordinals(ends)
+        for interval in np.unique(intervals):
+            rows = intervals == interval
+            self._series[str(interval)] = self._build(symbols[rows], first[rows], last[rows])
+        self._series[None] = self._build(symbols, first, last)
+
+    @staticmethod
+    def _build(symbols, first, last):
+        """Sorted unique symbols with the min first and max last day of each."""
+        keys, inverse = np.unique(symbols, return_inverse=True)
+        low = np.full(len(keys), np.iinfo(np.int64).max)
+        high = np.full(len(keys), np.iinfo(np.int64).min)
+        np.minimum.at(low, inverse, first)
+        np.maximum.at(high, inverse, last)
+        return keys, low, high
+
+    @classmethod
+    def from_catalog(cls, catalog):
+        return cls(catalog.spans())
+
+    def __len__(self):
+        return len(self._series[None][0]) if self._series else 0
+
+    def intervals(self):
+        return sorted(interval for interval in self._series if interval is not None)
+
+    def symbols(self, interval=None):
+        """Sorted symbols with data for `interval`."""
+        series = self._series.get(interval)
+        return [] if series is None else series[0].tolist()
+
+    def find(self, symbols, interval=None):
+        """Row of each symbol in the interval's arrays, -1 where it has no data."""
+        series = self._series.get(interval)
+        symbols = np.asarray(list(symbols), dtype=str)
+        if series is None or not len(symbols):
+            return np.full(len(symbols), -1)
+        keys = series[0]
+        index = np.searchsorted(keys, symbols)
+        index[index == len(keys)] = 0
+        return np.where(keys[index] == symbols, index, -1)
+
+    def available(self, symbols, interval=None):
+        """Bool array: which of `symbols` have data for `interval`."""
+        return self.find(symbols, interval) >= 0
+
+    def spans(self, symbols, interval=None):
+        """
+        First and last stored day ordinals of each symbol, as two arrays
+        aligned with `symbols`; -1 in both where a symbol has no data.
+        """
+        index = self.find(symbols, interval)
+        if interval not in self._series:
+            return index.copy(), index.copy()
+        _, first, last = self._series[interval]
+        found = index >= 0
+        return np.where(found, first[index], -1), np.where(found, last[index], -1)
+
+    def intersection(self, symbols, interval=None):
+        """
+        (latest first day, earliest last day) as dates over the symbols that
+        have data, i.e. the days every one of them spans; (None, None) if
+        none has data. The start may fall after the end when they do not
+        overlap.
+        """
+        first, last = self.spans(symbols, interval)
+        found = first >= 0
+        if not found.any():
+            return None, None
+        return date.fromordinal(int(first[found].max())), date.fromordinal(int(last[found].min()))
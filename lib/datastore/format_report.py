@@ -0,0 +1,140 @@
+"""
+Compares the store's output formats on real downloaded bars: bytes on disk,
+write throughput and read throughput for each format and codec.
+
+Every catalogued file of the chosen interval is loaded once, then rewritten
+with each variant into a scratch directory. Timings are the best of
+`--repeat` runs.
+
+Usage: python -m lib.datastore.format_report [data_dir] [--interval minute] [--symbols ...] [--repeat 3]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from lib.datastore.bar_store import ARROW, PARQUET, read_bar_file, write_bars
+from lib.datastore.catalog import open_catalog
+from lib.downloader.incremental import load_entries
+from lib.downloader.instruments import INSTRUMENTS_DIR, InstrumentMaster
+
+FORMAT_VARIANTS = [
+    ("parquet zstd", {"store_format": PARQUET, "codec": "zstd"}),
+    ("parquet snappy", {"store_format": PARQUET, "codec": "snappy"}),
+    ("parquet lz4", {"store_format": PARQUET, "codec": "lz4"}),
+    ("parquet none", {"store_format": PARQUET, "codec": "none"}),
+    ("parquet zstd compact", {"store_format": PARQUET, "codec": "zstd", "compact": True}),
+    ("arrow lz4", {"store_format": ARROW, "codec": "lz4"}),
+    ("arrow zstd", {"store_format": ARROW, "codec": "zstd"}),
+    ("arrow none", {"store_format": ARROW, "codec": "none"}),
+    ("csv", None),
+]
+
+
+def load_sample(data_dir, interval, symbols=None):
+    """Returns {symbol: bar DataFrame} for every catalogued symbol of `interval`."""
+    frames = {}
+    with open_catalog(data_dir) as catalog:
+        for symbol in symbols or catalog.symbols(interval):
+            df = load_entries(data_dir, catalog.entries(symbol, interval))
+            if not df.empty:
+                frames[symbol] = df.drop_duplicates(subset="date").sort_values("date", ignore_index=True)
+    return frames
+
+
+def _directory_bytes(path):
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path) for name in names
+    )
+
+
+def _write_variant(out_dir, interval, frames, options, tick_sizes):
+    paths = []
+    for symbol, df in frames.items():
+        if options is None:
+            path = os.path.join(out_dir, f"{symbol}.csv")
+            df.to_csv(path, index=False)
+            paths.append(path)
+            continue
+        dates = df["date"].dt.date
+        entries = write_bars(
+            out_dir, symbol, interval, df, dates.min(), dates.max(),
+            tick_size=tick_sizes.get(symbol), **options)
+        paths += [
+            os.path.join(out_dir, entry.get("arrow_filename") or entry["parquet_filename"])
+            for entry in entries
+        ]
+    return paths
+
+
+def _read_variant(paths):
+    for path in paths:
+        if path.endswith(".csv"):
+            pd.read_csv(path, parse_dates=["date"])
+        else:
+            read_bar_file(path)
+
+
+def measure(interval, frames, options, repeat=3, tick_sizes=None):
+    """Writes and reads `frames` with one variant. Returns (bytes, best write s, best read s)."""
+    tick_sizes = tick_sizes or {}
+    write_times, read_times, size = [], [], 0
+    for _ in range(repeat):
+        out_dir = tempfile.mkdtemp(prefix="svaha_formats_")
+        try:
+            started = time.perf_counter()
+            paths = _write_variant(out_dir, interval, frames, options, tick_sizes)
+            write_times.append(time.perf_counter() - started)
+            size = _directory_bytes(out_dir)
+            started = time.perf_counter()
+            _read_variant(paths)
+            read_times.append(time.perf_counter() - started)
+        finally:
+            shutil.rmtree(out_dir, ignore_errors=True)
+    return size, min(write_times), min(read_times)
+
+
+def format_report(data_dir, interval="minute", symbols=None, repeat=3,
+                  instruments_dir=INSTRUMENTS_DIR):
+    """Measures every FORMAT_VARIANTS entry on the data of `data_dir`. Returns a DataFrame."""
+    frames = load_sample(data_dir, interval, symbols)
+    if not frames:
+        raise ValueError(f"No '{interval}' data found in {data_dir}.")
+    rows = sum(len(df) for df in frames.values())
+    master = InstrumentMaster.open(instruments_dir)
+    tick_sizes = master.tick_sizes() if master is not None else {}
+
+    results = []
+    for name, options in FORMAT_VARIANTS:
+        size, write_s, read_s = measure(interval, frames, options, repeat, tick_sizes)
+        results.append({
+            "format": name,
+            "KB": round(size / 1024, 1),
+            "write rows/s": int(rows / write_s),
+            "write MB/s": round(size / 1e6 / write_s, 1),
+            "read rows/s": int(rows / read_s),
+        })
+    report = pd.DataFrame(results)
+    csv_size = report.loc[report["format"] == "csv", "KB"].iloc[0]
+    report["vs csv"] = (report["KB"] / csv_size).round(2)
+    report.attrs["symbols"] = len(frames)
+    report.attrs["rows"] = rows
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare storage formats on downloaded bars.")
+    parser.add_argument("data_dir", nargs="?", default="generated_data")
+    parser.add_argument("--interval", default="minute")
+    parser.add_argument("--symbols", nargs="*")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    report = format_report(args.data_dir, args.interval, args.symbols, args.repeat)
+    print(f"{report.attrs['symbols']} symbols, {report.attrs['rows']} {args.interval} bars "
+          f"from {args.data_dir}")
+    print(report.to_string(index=False))
@@ -0,0 +1,74 @@
+"""
+Converts the flat `<uuid>.csv` / `<uuid>.parquet` files of a data directory
+into the partitioned bar store and re-points the catalog at the new files.
+
+Usage: python -m lib.datastore.migrate [data_dir] [--workers N] [--delete-legacy]
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from lib.datastore.bar_store import PARTITIONED, write_bars
+from lib.datastore.catalog import open_catalog, remove_entry_files
+from lib.downloader.incremental import DATE_FORMAT, load_entries
+
+
+def migrate_group(data_dir, symbol, interval, entries):
+    """Rewrites one symbol/interval's legacy files into the store. Runs in a worker process."""
+    df = load_entries(data_dir, entries)
+    if df.empty:
+        return []
+    df = df.drop_duplicates(subset="date", keep="last")
+    start_date = min(datetime.strptime(e["start_date"], DATE_FORMAT).date() for e in entries)
+    end_date = max(datetime.strptime(e["end_date"], DATE_FORMAT).date() for e in entries)
+    return write_bars(data_dir, symbol, interval, df, start_date, end_date)
+
+
+def legacy_groups(catalog):
+    """Groups catalog entries that are not yet in the partitioned store by (symbol, interval)."""
+    groups = {}
+    for entry in catalog.entries():
+        if entry.get("sharding") != PARTITIONED:
+            groups.setdefault((entry["symbol"], entry["interval"]), []).append(entry)
+    return groups
+
+
+def migrate(data_dir, workers=None, delete_legacy=False):
+    """Migrates every legacy dataset in `data_dir` in parallel. Returns (groups, files written)."""
+    with open_catalog(data_dir) as catalog:
+        groups = legacy_groups(catalog)
+        written = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(migrate_group, data_dir, symbol, interval, entries): (symbol, interval)
+                for (symbol, interval), entries in groups.items()
+            }
+            for future in as_completed(futures):
+                symbol, interval = futures[future]
+                old_entries = groups[(symbol, interval)]
+                try:
+                    new_entries = future.result()
+                except Exception as e:
+                    print(f"FAILED {symbol} [{interval}]: {e}")
+                    continue
+                if not new_entries:
+                    print(f"SKIP {symbol} [{interval}]: no readable files")
+                    continue
+                catalog.replace(new_entries, [e["file_id"] for e in old_entries])
+                written += len(new_entries)
+                print(f"MIGRATED {symbol} [{interval}]: {len(old_entries)} -> {len(new_entries)} file(s)")
+
+                if delete_legacy:
+                    remove_entry_files(data_dir, old_entries)
+    return len(groups), written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate UUID files into the partitioned bar store.")
+    parser.add_argument("data_dir", nargs="?", default="generated_data")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--delete-legacy", action="store_true",
+                        help="Remove the old UUID files once their data is migrated.")
+    args = parser.parse_args()
+    groups, written = migrate(args.data_dir, args.workers, args.delete_legacy)
+    print(f"Migrated {groups} dataset(s) into {written} partition file(s).")
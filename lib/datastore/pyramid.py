@@ -0,0 +1,134 @@
+"""
+Builds coarser intervals locally from stored minute bars, so a multi-interval
+dataset costs a single minute-level pull of the historical API.
+
+Bars are bucketed the way Kite builds them: buckets are anchored at the 09:15
+session open, never span two trading days (the last bucket of a day may be
+short, e.g. the 15:15 60minute bar), and day bars are stamped at midnight IST.
+OHLCV aggregation is exact: first open, max high, min low, last close, summed
+volume.
+
+Usage: python -m lib.datastore.pyramid [data_dir] [--symbols ...] [--intervals ...]
+"""
+import argparse
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from lib.datastore.bar_store import COMPACT_STORE_DIRNAME, write_bars
+from lib.datastore.catalog import open_catalog, remove_entry_files
+from lib.datastore.schema import BAR_COLUMNS, MARKET_TZ, normalize_dates
+from lib.datastore.trading_calendar import (
+    INTERVAL_MINUTES,
+    MINUTES_PER_DAY,
+    SESSION_OPEN_MINUTE,
+    wall_minutes,
+)
+from lib.downloader.incremental import DATE_FORMAT, covered_ranges, load_entries
+
+SOURCE_INTERVAL = "minute"
+DERIVED_INTERVALS = {
+    interval: step for interval, step in INTERVAL_MINUTES.items() if interval != SOURCE_INTERVAL
+}
+
+
+def aggregate_bars(df, interval):
+    """Aggregates sorted minute bars into `interval` bars in one vectorized pass."""
+    if interval not in DERIVED_INTERVALS:
+        raise ValueError(f"Cannot derive interval '{interval}' from minute bars.")
+    if df.empty:
+        return pd.DataFrame(columns=BAR_COLUMNS)
+
+    df = normalize_dates(df).sort_values("date", ignore_index=True)
+    # Minutes since the epoch on the IST wall clock, so integer division by a
+    # day lands exactly on trading-day boundaries.
+    minutes = wall_minutes(df["date"])
+    day_start = (minutes // MINUTES_PER_DAY) * MINUTES_PER_DAY
+
+    step = DERIVED_INTERVALS[interval]
+    if step is None:
+        bucket_start = day_start
+    else:
+        offset = minutes - day_start - SESSION_OPEN_MINUTE
+        bucket_start = day_start + SESSION_OPEN_MINUTE + (offset // step) * step
+
+    starts = np.flatnonzero(np.r_[True, bucket_start[1:] != bucket_start[:-1]])
+    ends = np.r_[starts[1:], len(df)] - 1
+
+    dates = pd.to_datetime(bucket_start[starts], unit="m").tz_localize(MARKET_TZ)
+    return pd.DataFrame({
+        "date": dates,
+        "open": df["open"].to_numpy()[starts],
+        "high": np.maximum.reduceat(df["high"].to_numpy(), starts),
+        "low": np.minimum.reduceat(df["low"].to_numpy(), starts),
+        "close": df["close"].to_numpy()[ends],
+        "volume": np.add.reduceat(df["volume"].to_numpy(), starts),
+    })
+
+
+def build_pyramid(data_dir, symbol, intervals=None, catalog=None, **write_options):
+    """
+    Derives `intervals` for `symbol` from its catalogued minute data and
+    registers them in the catalog. Existing entries of a derived interval that
+    fall entirely inside the minute coverage are replaced. `write_options` go
+    to `write_bars`; unless given, `compact` follows the minute files. Returns
+    {interval: rows written}.
+    """
+    intervals = list(intervals or DERIVED_INTERVALS)
+    owns_catalog = catalog is None
+    catalog = catalog or open_catalog(data_dir)
+    try:
+        minute_entries = catalog.entries(symbol, SOURCE_INTERVAL)
+        if not minute_entries:
+            return {}
+        blocks = covered_ranges(minute_entries)
+        minutes = load_entries(data_dir, minute_entries)
+        if minutes.empty:
+            return {}
+        minutes = minutes.drop_duplicates(subset="date", keep="last")
+        write_options.setdefault("compact", any(
+            entry.get("parquet_filename", "").startswith(COMPACT_STORE_DIRNAME)
+            for entry in minute_entries
+        ))
+
+        written = {}
+        for interval in intervals:
+            derived = aggregate_bars(minutes, interval)
+            new_entries = []
+            for start, end in blocks:
+                in_block = derived["date"].dt.date.between(start, end)
+                if in_block.any():
+                    new_entries += write_bars(
+                        data_dir, symbol, interval, derived[in_block], start, end,
+                        **write_options,
+                    )
+            superseded = [
+                entry for entry in catalog.entries(symbol, interval)
+                if any(
+                    start <= datetime.strptime(entry["start_date"], DATE_FORMAT).date()
+                    and datetime.strptime(entry["end_date"], DATE_FORMAT).date() <= end
+                    for start, end in blocks
+                )
+            ]
+            catalog.replace(new_entries, [entry["file_id"] for entry in superseded])
+            remove_entry_files(data_dir, superseded)
+            written[interval] = len(derived)
+        return written
+    finally:
+        if owns_catalog:
+            catalog.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Derive coarser intervals from stored minute bars.")
+    parser.add_argument("data_dir", nargs="?", default="generated_data")
+    parser.add_argument("--symbols", nargs="*", help="Defaults to every symbol with minute data.")
+    parser.add_argument("--intervals", nargs="*", choices=list(DERIVED_INTERVALS))
+    args = parser.parse_args()
+
+    with open_catalog(args.data_dir) as catalog:
+        symbols = args.symbols or catalog.symbols(SOURCE_INTERVAL)
+        for symbol in symbols:
+            written = build_pyramid(args.data_dir, symbol, args.intervals, catalog)
+            print(f"{symbol}: " + ", ".join(f"{k}={v}" for k, v in written.items()))
@@ -0,0 +1,170 @@
+"""
+Reads stored bars back for analysis and training.
+
+`load_bars` looks up each symbol's files in the catalog, skips those outside
+the requested dates, and reads the rest with the date bounds and column
+selection pushed down to the Parquet/Arrow scan (see bar_store.read_entry),
+so only matching row groups and columns are decoded. Symbols are read in a
+thread pool; Arrow releases the GIL while it decodes. Where stored files
+overlap, rows of the file that starts later win, as in compaction.
+
+The result is either one long DataFrame with a categorical `symbol` column,
+converted from Arrow once at the end, or per-symbol blocks of NumPy columns
+taken from the Arrow buffers without a pandas round trip.
+
+Unless told otherwise, reads go through the process-wide BAR_CACHE
+(lib.datastore.bar_cache), so repeated and narrower requests skip decoding
+until the catalog's files of the series change.
+
+`count_bars` answers how many bars a selection holds without reading any:
+from the catalog's coverage index, and for files stored before the index
+existed from their Parquet footers.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from lib.datastore.bar_cache import BAR_CACHE
+from lib.datastore.bar_store import _as_timestamp, read_entry
+from lib.datastore.catalog import open_catalog
+from lib.datastore.coverage import day_bars
+from lib.datastore.schema import BAR_COLUMNS
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "generated_data")
+DEFAULT_THREADS = 8
+
+
+def _as_bound(value):
+    """Plain 'YYYY-MM-DD' strings mean whole days, like dates."""
+    return date.fromisoformat(value) if isinstance(value, str) and len(value) == 10 else value
+
+
+def _day(value):
+    return None if value is None else pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+def _overlapping(entries, start, end):
+    start, end = _day(start), _day(end)
+    return [
+        entry for entry in entries
+        if (start is None or entry["end_date"] >= start) and (end is None or entry["start_date"] <= end)
+    ]
+
+
+def overlapping_entries(catalog, symbol, interval, start=None, end=None):
+    """Catalog entries of `symbol`/`interval` whose date range meets [start, end]."""
+    return _overlapping(catalog.entries(symbol, interval), start, end)
+
+
+def _read_series(data_dir, entries, start, end, columns):
+    """One symbol's bars from its entries as a single date-sorted table without repeats."""
+    tables = [
+        table for table in (read_entry(data_dir, entry, start, end, columns) for entry in entries)
+        if table is not None and table.num_rows
+    ]
+    if not tables:
+        return None
+    table = pa.concat_tables(tables) if len(tables) > 1 else tables[0]
+    dates = table.column("date").to_numpy().view(np.int64)
+    if len(tables) == 1 and (np.diff(dates) > 0).all():
+        return table
+    # Stable, so rows of later entries (catalog order is by start date) follow
+    # earlier ones at the same time and the last of each run is kept.
+    order = np.argsort(dates, kind="stable")
+    ordered = dates[order]
+    keep = np.append(ordered[1:] != ordered[:-1], True)
+    return table.take(order[keep])
+
+
+def _read_cached(cache, data_dir, symbol, interval, series_entries, start, end, columns):
+    """`_read_series` through `cache`; `series_entries` are all the catalog entries of the series."""
+    start_ns = None if start is None else _as_timestamp(start).value
+    end_ns = None if end is None else _as_timestamp(end, end=True).value
+    file_ids = [entry["file_id"] for entry in series_entries]
+    table = cache.get(data_dir, symbol, interval, start_ns, end_ns, columns, file_ids)
+    if table is None:
+        table = _read_series(data_dir, _overlapping(series_entries, start, end), start, end, columns)
+        if table is not None:
+            cache.put(data_dir, symbol, interval, start_ns, end_ns, table, file_ids)
+    return table if table is None or table.num_rows else None
+
+
+def load_bars(symbols, interval, start=None, end=None, columns=None, data_dir=DATA_DIR,
+              as_arrays=False, max_workers=DEFAULT_THREADS, cache=BAR_CACHE):
+    """
+    Reads the stored bars of `symbols` at `interval` between `start` and `end`
+    (dates, datetimes or strings; either may be None for open-ended). `columns`
+    picks the bar columns to read; `date` is always included.
+
+    Returns a long DataFrame (symbol, date, ...), by symbol in the order given
+    and sorted by date within each, or
+    with `as_arrays=True` a dict {symbol: {column: ndarray}} where `date` is
+    datetime64[ns] in UTC. Symbols with no stored bars in the range are left
+    out. Pass `cache=None` to bypass the shared bar cache.
+
+    `data_dir` defaults to the project's generated_data. Its catalog is only
+    read; FileNotFoundError if it has none.
+    """
+    columns = list(BAR_COLUMNS) if columns is None else list(dict.fromkeys(["date", *columns]))
+    symbols = list(dict.fromkeys(symbols))
+    start, end = _as_bound(start), _as_bound(end)
+    with open_catalog(data_dir, read_only=True) as catalog:
+        entries = {symbol: catalog.entries(symbol, interval) for symbol in symbols}
+
+    def read(symbol):
+        if cache is None:
+            return _read_series(data_dir, _overlapping(entries[symbol], start, end), start, end, columns)
+        return _read_cached(cache, data_dir, symbol, interval, entries[symbol], start, end, columns)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(symbols)))) as executor:
+        tables = dict(zip(symbols, executor.map(read, symbols)))
+    tables = {symbol: table for symbol, table in tables.items() if table is not None}
+
+    if as_arrays:
+        return {
+            symbol: {column: table.column(column).to_numpy() for column in columns}
+            for symbol, table in tables.items()
+        }
+    if not tables:
+        return pd.DataFrame(columns=["symbol", *columns])
+    labelled = [
+        table.add_column(0, "symbol", pa.DictionaryArray.from_arrays(
+            pa.array(np.zeros(table.num_rows, dtype=np.int32)), pa.array([symbol])))
+        for symbol, table in tables.items()
+    ]
+    return pa.concat_tables(labelled).to_pandas()
+
+
+def _footer_rows(data_dir, entry):
+    """Rows of an entry's Parquet file, read from its footer; 0 without one."""
+    path = os.path.join(data_dir, entry["parquet_filename"]) if entry.get("parquet_filename") else None
+    if not path or not os.path.exists(path):
+        return 0
+    return pq.ParquetFile(path).metadata.num_rows
+
+
+def count_bars(symbols, interval, start=None, end=None, data_dir=DATA_DIR):
+    """
+    Stored bars of `symbols` at `interval` between `start` and `end`, as
+    {symbol: count}, without decoding any. Indexed files count the session
+    bars of the days in range; files without coverage rows count all rows
+    in their Parquet footer, so their share can exceed the range. Symbols
+    with no bars are left out.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    start, end = (None if value is None else pd.Timestamp(value).date() for value in (start, end))
+    with open_catalog(data_dir, read_only=True) as catalog:
+        bars = day_bars(catalog, symbols, interval, start, end)
+        unindexed = [
+            entry for entry in catalog.entries_without_coverage()
+            if entry["interval"] == interval and entry["symbol"] in set(symbols)
+        ]
+    counts = {symbol: int(total) for symbol, total in bars.groupby("symbol")["bars"].sum().items()}
+    for entry in _overlapping(unindexed, start, end):
+        counts[entry["symbol"]] = counts.get(entry["symbol"], 0) + _footer_rows(data_dir, entry)
+    return {symbol: counts[symbol] for symbol in symbols if counts.get(symbol)}
@@ -0,0 +1,33 @@
+import pandas as pd
+import pyarrow as pa
+
+MARKET_TZ = "Asia/Kolkata"
+
+BAR_COLUMNS = ["date", "open", "high", "low", "close", "volume"]
+BAR_SCHEMA = pa.schema([
+    ("date", pa.timestamp("ns", tz=MARKET_TZ)),
+    ("open", pa.float64()),
+    ("high", pa.float64()),
+    ("low", pa.float64()),
+    ("close", pa.float64()),
+    ("volume", pa.int64()),
+])
+
+
+def normalize_dates(df):
+    """Returns `df` with a tz-aware (Asia/Kolkata) `date` column, whatever shape it was saved in."""
+    if "date" not in df.columns:
+        df = df.reset_index()
+    dates = pd.to_datetime(df["date"])
+    # Sharded files store naive local times; everything else carries +05:30.
+    if dates.dt.tz is None:
+        dates = dates.dt.tz_localize(MARKET_TZ)
+    else:
+        dates = dates.dt.tz_convert(MARKET_TZ)
+    return df.assign(date=dates)
+
+
+def to_bar_table(df):
+    """Converts a bar DataFrame to an Arrow table with the store's typed schema."""
+    df = normalize_dates(df)
+    return pa.Table.from_pandas(df[BAR_COLUMNS], schema=BAR_SCHEMA, preserve_index=False)
@@ -0,0 +1,103 @@
+"""
+Precomputed filters over the instrument master catalog.
+
+The symbol pickers filter source_data/master_catalog_enriched.csv by
+sector, index membership and a search term on every keystroke. This index
+parses the catalog once: each sector and each index (split out of the
+comma-joined `Indices` column, so "NIFTY 50" no longer also matches
+"NIFTY 500") gets a boolean mask over the sorted symbols, and every 1-, 2-
+and 3-character substring of a symbol gets a posting list of the rows that
+contain it. A filter is then a few mask ANDs plus a posting-list
+intersection; longer search terms intersect the postings of their trigrams
+and check the few candidates left.
+"""
+import numpy as np
+
+# Longest substring with its own posting list; longer terms combine these.
+GRAM_SIZE = 3
+
+
+def _grams(text, size):
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class SymbolIndex:
+    """Sector, index and substring filters over a fixed list of symbols."""
+
+    def __init__(self, symbols, sectors=None, indices=None):
+        """
+        `symbols` with, aligned to them, each one's sector (or None) and list
+        of index names.
+        """
+        symbols = list(symbols)
+        sectors = list(sectors) if sectors is not None else [None] * len(symbols)
+        indices = list(indices) if indices is not None else [[]] * len(symbols)
+        order = sorted(range(len(symbols)), key=lambda row: symbols[row])
+        self.symbols = np.array([symbols[row] for row in order], dtype=str)
+        self._sectors = self._masks([[sectors[row]] if sectors[row] else [] for row in order])
+        self._indices = self._masks([indices[row] for row in order])
+
+        postings = {}
+        for row, symbol in enumerate(self.symbols.tolist()):
+            for size in range(1, GRAM_SIZE + 1):
+                for gram in _grams(symbol.upper(), size):
+                    postings.setdefault(gram, []).append(row)
+        self._postings = {gram: np.array(rows) for gram, rows in postings.items()}
+
+    def _masks(self, labels):
+        masks = {}
+        for row, names in enumerate(labels):
+            for name in names:
+                if name not in masks:
+                    masks[name] = np.zeros(len(self.symbols), dtype=bool)
+                masks[name][row] = True
+        return masks
+
+    @classmethod
+    def from_frame(cls, df):
+        """Builds the index from a master catalog frame (Symbol, Industry, Indices)."""
+        sectors = [sector if isinstance(sector, str) else None for sector in df["Industry"]]
+        indices = [
+            [name.strip() for name in value.split(",")] if isinstance(value, str) else []
+            for value in df["Indices"]
+        ]
+        return cls(df["Symbol"].astype(str), sectors, indices)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def sectors(self):
+        return sorted(self._sectors)
+
+    def indices(self):
+        return sorted(self._indices)
+
+    def search_rows(self, term):
+        """Sorted rows whose symbol contains `term` (case-insensitive)."""
+        term = term.upper()
+        if len(term) <= GRAM_SIZE:
+            return self._postings.get(term, np.array([], dtype=int))
+        rows = None
+        for gram in _grams(term, GRAM_SIZE):
+            posting = self._postings.get(gram)
+            if posting is None:
+                return np.array([], dtype=int)
+            rows = posting if rows is None else np.intersect1d(rows, posting, assume_unique=True)
+        return np.array([row for row in rows.tolist() if term in self.symbols[row].upper()], dtype=int)
+
+    def mask(self, search="", sector=None, index=None):
+        """
+        Bool mask over `symbols` of the rows matching every given filter:
+        a substring of the symbol, a sector and an index name.
+        """
+        mask = np.ones(len(self.symbols), dtype=bool)
+        for masks, name in ((self._sectors, sector), (self._indices, index)):
+            if name:
+                if name not in masks:
+                    return np.zeros(len(self.symbols), dtype=bool)
+                mask &= masks[name]
+        if search:
+            found = np.zeros(len(self.symbols), dtype=bool)
+            found[self.search_rows(search)] = True
+            mask &= found
+        return mask
@@ -0,0 +1,160 @@
+"""
+NSE cash-market calendar: the regular session (09:15 to 15:30 IST), exchange
+holidays, and the bar slots each Kite interval has within a session.
+
+The holiday list follows the exchange's yearly circulars and has to be
+extended when NSE publishes the next year's list. Weekend special sessions
+(e.g. a Budget-day Saturday) are listed separately. Outside the years the
+list covers, holidays cannot be told from sessions, so `known_sessions`
+leaves those years out and completeness checks treat them as unknown.
+"""
+from datetime import date, time
+
+import numpy as np
+import pandas as pd
+
+from lib.datastore.schema import MARKET_TZ
+
+SESSION_OPEN = time(9, 15)
+SESSION_CLOSE = time(15, 30)
+SESSION_OPEN_MINUTE = SESSION_OPEN.hour * 60 + SESSION_OPEN.minute
+# Minute bars of a full session: 09:15 through 15:29.
+SESSION_MINUTES = SESSION_CLOSE.hour * 60 + SESSION_CLOSE.minute - SESSION_OPEN_MINUTE
+MINUTES_PER_DAY = 24 * 60
+
+# Bar length in minutes for each Kite interval; day bars have one slot.
+INTERVAL_MINUTES = {
+    "minute": 1,
+    "3minute": 3,
+    "5minute": 5,
+    "10minute": 10,
+    "15minute": 15,
+    "30minute": 30,
+    "60minute": 60,
+    "day": None,
+}
+
+NSE_HOLIDAYS = frozenset(date.fromisoformat(day) for day in (
+    # 2023
+    "2023-01-26", "2023-03-07", "2023-03-30", "2023-04-04", "2023-04-07",
+    "2023-04-14", "2023-05-01", "2023-06-29", "2023-08-15", "2023-09-19",
+    "2023-10-02", "2023-10-24", "2023-11-14", "2023-11-27", "2023-12-25",
+    # 2024
+    "2024-01-22", "2024-01-26", "2024-03-08", "2024-03-25", "2024-03-29",
+    "2024-04-11", "2024-04-17", "2024-05-01", "2024-05-20", "2024-06-17",
+    "2024-07-17", "2024-08-15", "2024-10-02", "2024-11-01", "2024-11-15",
+    "2024-11-20", "2024-12-25",
+    # 2025
+    "2025-02-26", "2025-03-14", "2025-03-31", "2025-04-10", "2025-04-14",
+    "2025-04-18", "2025-05-01", "2025-08-15", "2025-08-27", "2025-10-02",
+    "2025-10-21", "2025-10-22", "2025-11-05", "2025-12-25",
+    # 2026
+    "2026-01-15", "2026-01-26", "2026-03-03", "2026-03-26", "2026-03-31",
+    "2026-04-03", "2026-04-14", "2026-05-01", "2026-05-28", "2026-06-26",
+    "2026-09-14", "2026-10-02", "2026-10-20", "2026-11-10", "2026-11-24",
+    "2026-12-25",
+))
+
+# First and last year NSE_HOLIDAYS lists.
+HOLIDAY_YEARS = (
+    min(day.year for day in NSE_HOLIDAYS),
+    max(day.year for day in NSE_HOLIDAYS),
+)
+
+# Full sessions held on a weekend.
+SPECIAL_SESSIONS = frozenset(date.fromisoformat(day) for day in (
+    "2024-01-20",
+    "2025-02-01",
+))
+
+
+def trading_days(start, end, holidays=NSE_HOLIDAYS, special_sessions=SPECIAL_SESSIONS):
+    """Trading days in [start, end] as a sorted datetime64[D] array."""
+    days = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+    open_days = np.is_busday(days, holidays=sorted(holidays))
+    if special_sessions:
+        open_days |= np.isin(days, np.array(sorted(special_sessions), dtype="datetime64[D]"))
+    return days[open_days]
+
+
+def known_sessions(start, end):
+    """
+    `trading_days` of [start, end] clipped to HOLIDAY_YEARS, the only
+    years whose holidays are known.
+    """
+    first, last = HOLIDAY_YEARS
+    start = max(np.datetime64(start, "D"), np.datetime64(f"{first}-01-01"))
+    end = min(np.datetime64(end, "D"), np.datetime64(f"{last}-12-31"))
+    return trading_days(start, end)
+
+
+def slots_per_day(interval):
+    """Number of bars a complete session has at `interval`."""
+    step = INTERVAL_MINUTES[interval]
+    return 1 if step is None else -(-SESSION_MINUTES // step)
+
+
+def wall_minutes(dates):
+    """Minutes since the epoch on the IST wall clock for tz-aware or naive IST `dates`."""
+    dates = pd.DatetimeIndex(dates)
+    if dates.tz is not None:
+        dates = dates.tz_convert(MARKET_TZ).tz_localize(None)
+    return dates.values.astype("datetime64[m]").astype(np.int64)
+
+
+def bar_slots(dates, interval):
+    """
+    Maps bar timestamps to (day, slot): the trading day as datetime64[D] and
+    the bar's index within that day's session. Bars outside the regular
+    session (e.g. Muhurat trading) get slot -1.
+    """
+    minutes = wall_minutes(dates)
+    day_index = minutes // MINUTES_PER_DAY
+    days = day_index.astype("datetime64[D]")
+    step = INTERVAL_MINUTES[interval]
+    if step is None:
+        return days, np.zeros(len(minutes), dtype=np.int64)
+    offset = minutes - day_index * MINUTES_PER_DAY - SESSION_OPEN_MINUTE
+    slots = offset // step
+    slots[(offset < 0) | (slots >= slots_per_day(interval))] = -1
+    return days, slots
+
+
+class SessionCoverage:
+    """Accumulates the coverage bitmaps of one symbol/interval while its bars are written."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.slots = slots_per_day(interval)
+        self._bits = {}
+
+    def add(self, dates):
+        """Marks the session slots of `dates` (bar timestamps) as present."""
+        days, slots = bar_slots(dates, self.interval)
+        in_session = slots >= 0
+        days, slots = days[in_session], slots[in_session]
+        if not len(days):
+            return
+        unique_days, day_index = np.unique(days, return_inverse=True)
+        bits = np.zeros((len(unique_days), self.slots), dtype=bool)
+        bits[day_index, slots] = True
+        for day, row in zip(unique_days.astype(object), bits):
+            if day in self._bits:
+                self._bits[day] |= row
+            else:
+                self._bits[day] = row
+
+    def rows(self, start, end):
+        """
+        Coverage rows (day, bars, bitmap) for every known trading day in
+        [start, end], including sessions without any bar, plus any other
+        day in the range that has bars.
+        """
+        days = set(known_sessions(start, end).astype(object))
+        days.update(day for day in self._bits if start <= day <= end)
+        empty = np.zeros(self.slots, dtype=bool)
+        rows = []
+        for day in sorted(days):
+            bits = self._bits.get(day, empty)
+            rows.append((day.isoformat(), int(bits.sum()), np.packbits(bits).tobytes()))
+        return rows
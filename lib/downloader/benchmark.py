@@ -0,0 +1,118 @@
+"""
+Measures DownloadWorker throughput against the offline StubKite.
+
+Run from the project root (symbols come from source_data/master_catalog_enriched.csv):
+
+    python -m lib.downloader.benchmark --symbols 20 --days 120 --concurrency 1 2 4 8
+"""
+import argparse
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+from lib.downloader.download_worker import DownloadWorker
+from lib.downloader.headless import HeadlessScreen
+from lib.downloader.journal import COMPLETED, FAILED
+from lib.downloader.kite_stub import StubKite
+from lib.downloader.rate_limiter import KITE_HISTORICAL_RATE
+
+
+def default_symbols(count):
+    master = pd.read_csv("source_data/master_catalog_enriched.csv", usecols=["Symbol"])
+    return master["Symbol"].head(count).tolist()
+
+
+def run_once(symbols, start_date, end_date, interval, concurrency, chunk_concurrency,
+             kite_options, params_overrides=None):
+    """Runs one download into a throwaway directory. Returns a result row."""
+    output_dir = tempfile.mkdtemp(prefix="svaha_bench_")
+    kite = StubKite(symbols, **kite_options)
+    params = {
+        "resume_mode": False,
+        "symbols": symbols,
+        "start_date": start_date,
+        "end_date": end_date,
+        "interval": interval,
+        "output_dir": output_dir,
+        "save_csv": False,
+        "save_parquet": True,
+        "sharding": "Partitioned",
+        "concurrency": concurrency,
+        "chunk_concurrency": chunk_concurrency,
+        # The stub stands apart from the real API key: its instruments and
+        # calls stay out of the shared master and quota.
+        "instruments_dir": output_dir,
+        "quota_path": None,
+        **(params_overrides or {}),
+    }
+    try:
+        worker = DownloadWorker(params, HeadlessScreen(), kite)
+        started = time.perf_counter()
+        worker.run()
+        elapsed = time.perf_counter() - started
+        completed = len(worker.journal.symbols_in(COMPLETED)) if worker.journal else 0
+        failed = len(worker.journal.symbols_in(FAILED)) if worker.journal else len(symbols)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    return {
+        "concurrency": concurrency,
+        "chunks": chunk_concurrency,
+        "seconds": round(elapsed, 2),
+        "completed": completed,
+        "failed": failed,
+        "symbols/min": round(completed / elapsed * 60, 1),
+        "records/s": round(kite.records_served / elapsed),
+        "api calls": kite.calls,
+        "throttled": kite.throttled,
+        "errors": kite.errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DownloadWorker against a local Kite stand-in.")
+    parser.add_argument("--symbols", type=int, default=10)
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--interval", default="minute")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--chunk-concurrency", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds per API call.")
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=KITE_HISTORICAL_RATE,
+                        help="Requests/second the stand-in accepts before answering 429.")
+    parser.add_argument("--requests-per-second", type=float, default=KITE_HISTORICAL_RATE,
+                        help="Client-side limiter budget.")
+    args = parser.parse_args()
+
+    symbols = default_symbols(args.symbols)
+    end_date = date.today()
+    start_date = end_date - timedelta(days=args.days - 1)
+    kite_options = {
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "error_rate": args.error_rate,
+        "rate_limit": args.rate_limit,
+    }
+
+    rows = []
+    for concurrency in args.concurrency:
+        row = run_once(
+            symbols, start_date, end_date, args.interval, concurrency,
+            args.chunk_concurrency, kite_options,
+            {"requests_per_second": args.requests_per_second},
+        )
+        rows.append(row)
+        print(row)
+
+    print()
+    print(f"{len(symbols)} symbols, {args.days} days of {args.interval} bars, "
+          f"latency {args.latency}s +{args.jitter}s, error rate {args.error_rate}")
+    print(pd.DataFrame(rows).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
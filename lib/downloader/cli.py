@@ -0,0 +1,206 @@
+"""
+Runs the downloader without the GUI, e.g. on a headless box or from cron.
+
+The same DownloadWorker the UI uses runs in the foreground with a
+HeadlessScreen, so nothing here imports PySide6 or starts an event loop.
+A job comes from a JSON spec (the worker's parameters: symbols, start_date,
+end_date, interval, output_dir, ...), from flags, or from a session manifest
+to resume; flags override the spec.
+
+    python -m lib.downloader.cli --symbols RELIANCE TCS --start 2024-01-01 --end 2024-06-30
+    python -m lib.downloader.cli --job nightly.json --concurrency 4
+    python -m lib.downloader.cli --index "NIFTY 50" --start 2024-01-01 --update
+    python -m lib.downloader.cli --manifest generated_data/session_manifest.json
+
+The Kite session is the one saved by the GUI login, or the access token in
+--access-token / $KITE_ACCESS_TOKEN. Exits with 1 if any symbol failed.
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import date
+
+from lib.datastore.bar_store import DEFAULT_CODEC, PARQUET, PARQUET_CODECS, PARTITIONED, STORE_FORMATS
+from lib.downloader.download_worker import DownloadWorker
+from lib.downloader.headless import HeadlessScreen
+from lib.downloader.journal import DATE_KEYS, FAILED, DownloadJournal
+from lib.downloader.scheduler import load_index_membership
+
+ACCESS_TOKEN_ENV = "KITE_ACCESS_TOKEN"
+
+# Job settings of the GUI's new-job form, for anything the spec leaves out.
+DEFAULT_JOB = {
+    "interval": "minute",
+    "output_dir": "generated_data",
+    "sharding": PARTITIONED,
+    "save_parquet": True,
+    "save_csv": False,
+    "store_format": PARQUET,
+    "compression": DEFAULT_CODEC,
+    "concurrency": 3,
+    "chunk_concurrency": 1,
+}
+
+# Log lines shown without --verbose; per-chunk chatter is left to the log file.
+SUMMARY_PREFIXES = (
+    "Worker", "Resuming", "Processing", "SCHEDULE", "SAVE", "UPDATE", "UP-TO-DATE",
+    "SKIP", "WARN", "ERROR", "FATAL", "QUALITY", "DERIVED", "RETRY", "DEFERRED", "No pending",
+)
+
+
+class ProgressPrinter:
+    """Prints the worker's progress as compact `[ 42%] message` lines."""
+
+    def __init__(self, verbose=False, stream=None):
+        self.verbose = verbose
+        self.stream = stream or sys.stdout
+        self.percent = 0
+        self.fatal = False
+
+    def log(self, message):
+        if message.startswith("FATAL"):
+            self.fatal = True
+        if self.verbose or message.startswith(SUMMARY_PREFIXES):
+            print(f"[{self.percent:3d}%] {message}", file=self.stream, flush=True)
+
+    def progress(self, percent):
+        self.percent = percent
+
+    def screen(self):
+        return HeadlessScreen(on_log=self.log, on_progress=self.progress)
+
+
+def read_symbols_file(path):
+    """Symbols from a text file (one per line) or a CSV with a Symbol column."""
+    with open(path, "r") as f:
+        lines = [line.strip() for line in f if line.strip()]
+    if lines and lines[0].split(",")[0] == "Symbol":
+        return [line.split(",")[0] for line in lines[1:]]
+    return lines
+
+
+def build_params(args):
+    """Merges the spec file, the flags and the defaults into worker parameters."""
+    if args.manifest:
+        # The job's own settings come from the manifest.
+        params = {
+            "resume_mode": True,
+            "manifest_path": args.manifest,
+            "concurrency": DEFAULT_JOB["concurrency"],
+            "chunk_concurrency": DEFAULT_JOB["chunk_concurrency"],
+        }
+    else:
+        spec = {}
+        if args.job:
+            with open(args.job, "r") as f:
+                spec = json.load(f)
+        params = {**DEFAULT_JOB, **spec, "resume_mode": False}
+
+    symbols = list(args.symbols or [])
+    if args.symbols_file:
+        symbols += read_symbols_file(args.symbols_file)
+    if args.index:
+        membership = load_index_membership()
+        symbols += [symbol for symbol, indices in membership.items() if args.index in indices]
+    if symbols:
+        params["symbols"] = list(dict.fromkeys(symbols))
+
+    overrides = {
+        "start_date": args.start,
+        "end_date": args.end,
+        "interval": args.interval,
+        "output_dir": args.output_dir,
+        "concurrency": args.concurrency,
+        "chunk_concurrency": args.chunk_concurrency,
+        "store_format": args.store_format,
+        "compression": args.codec,
+        "update_mode": args.update or None,
+        "save_csv": args.csv or None,
+        "derive_intervals": args.derive or None,
+        "prioritize": False if args.no_prioritize else None,
+        "daily_calls": args.daily_calls,
+    }
+    params.update({key: value for key, value in overrides.items() if value is not None})
+
+    for key in DATE_KEYS:
+        if isinstance(params.get(key), str):
+            params[key] = date.fromisoformat(params[key])
+    if not params["resume_mode"]:
+        params.setdefault("end_date", date.today())
+        missing = [key for key in ("symbols", "start_date") if not params.get(key)]
+        if missing:
+            raise SystemExit(f"Missing {' and '.join(missing)}: pass them as flags or in --job.")
+    return params
+
+
+def kite_session(args, params):
+    """Returns an authenticated KiteConnect, or the offline stub with --stub."""
+    if args.stub:
+        from lib.downloader.kite_stub import StubKite
+
+        symbols = params.get("symbols")
+        if params["resume_mode"]:
+            symbols = list(DownloadJournal.load(params["manifest_path"]).states)
+        # Like the benchmark, stub runs stay out of the real instrument
+        # master and API quota.
+        params.setdefault("instruments_dir", params.get("output_dir") or os.path.dirname(params["manifest_path"]))
+        params.setdefault("quota_path", None)
+        return StubKite(symbols)
+    # Imported here: the client needs config.py, which --stub runs do not.
+    from api.kite.client import kite_api
+
+    token = args.access_token or os.environ.get(ACCESS_TOKEN_ENV)
+    if token:
+        kite_api.set_access_token(token)
+    elif not kite_api.load_session():
+        raise SystemExit(
+            f"No Kite session: log in once through the app, or pass --access-token / ${ACCESS_TOKEN_ENV}.")
+    return kite_api.kite
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Download historical bars without the GUI.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--job", help="JSON job spec with the worker's parameters.")
+    source.add_argument("--manifest", help="Session manifest of a job to resume.")
+    parser.add_argument("--symbols", nargs="*")
+    parser.add_argument("--symbols-file", help="Text file with one symbol per line, or a CSV with a Symbol column.")
+    parser.add_argument("--index", help="Add every symbol of this index, e.g. 'NIFTY 50'.")
+    parser.add_argument("--start", help="YYYY-MM-DD")
+    parser.add_argument("--end", help="YYYY-MM-DD, defaults to today")
+    parser.add_argument("--interval")
+    parser.add_argument("--output-dir")
+    parser.add_argument("--concurrency", type=int, help="Parallel fetchers.")
+    parser.add_argument("--chunk-concurrency", type=int, help="Chunks in flight per symbol.")
+    parser.add_argument("--format", dest="store_format", choices=STORE_FORMATS)
+    parser.add_argument("--codec", choices=PARQUET_CODECS)
+    parser.add_argument("--update", action="store_true", help="Fetch only data not already on disk.")
+    parser.add_argument("--csv", action="store_true", help="Also write CSV copies.")
+    parser.add_argument("--derive", action="store_true", help="Derive coarser intervals from minute bars.")
+    parser.add_argument("--no-prioritize", action="store_true", help="Keep the given symbol order.")
+    parser.add_argument("--daily-calls", type=int,
+                        help="Historical calls allowed per day; the symbols that fit go first.")
+    parser.add_argument("--access-token", help=f"Kite access token (default: ${ACCESS_TOKEN_ENV} or the saved session).")
+    parser.add_argument("--stub", action="store_true", help="Use the offline StubKite instead of Kite.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print every log line.")
+    args = parser.parse_args(argv)
+
+    params = build_params(args)
+    kite = kite_session(args, params)
+    printer = ProgressPrinter(args.verbose)
+    worker = DownloadWorker(params, printer.screen(), kite)
+    # Runs in this thread; there is no event loop to keep responsive.
+    worker.run()
+
+    failed = worker.journal.symbols_in(FAILED) if worker.journal is not None else []
+    if failed:
+        print(f"Failed: {', '.join(failed)}", file=sys.stderr)
+    pending = worker.journal.pending() if worker.journal is not None else []
+    if pending:
+        print(f"Pending until the next resume: {', '.join(pending)}", file=sys.stderr)
+    return 1 if failed or printer.fatal else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
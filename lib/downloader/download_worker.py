@@ -1,14 +1,72 @@
-import json
 import logging
 import os
 import time
 import uuid
-from datetime import datetime, timedelta
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
 from threading import Thread
 
 import pandas as pd
 from kiteconnect import KiteConnect
 
+from lib.datastore.bar_store import DEFAULT_CODEC, PARQUET, PARTITIONED, write_bars
+from lib.datastore.catalog import open_catalog, remove_entry_files
+from lib.datastore.pyramid import SOURCE_INTERVAL, build_pyramid
+from lib.datastore.validation import SPIKE_THRESHOLD, quality_issues, validate_frame
+from lib.downloader import incremental
+from lib.downloader.instruments import INSTRUMENTS_DIR, InstrumentMaster, refresh_master
+from lib.downloader.journal import COMPLETED, FAILED, PENDING, DownloadJournal
+from lib.downloader.pipeline import DEFAULT_QUEUE_SIZE, DownloadPipeline
+from lib.downloader.quota import (
+    DEFAULT,
+    HISTORICAL,
+    QUOTA_PATH,
+    THROTTLE_PAUSE,
+    QuotaAccountant,
+    QuotaExhausted,
+    with_daily_limit,
+)
+from lib.downloader.rate_limiter import KITE_HISTORICAL_RATE, AdaptiveRateLimiter
+from lib.downloader.retry import DEFAULT_MAX_RETRIES, backoff_delay, is_retryable, is_throttle
+from lib.downloader.scheduler import (
+    INDEX_WEIGHTS,
+    chunk_windows,
+    load_index_membership,
+    pack_windows,
+    plan_downloads,
+    plan_gaps,
+    schedule,
+)
+
+
+# Longest wait for the quota, when the job has a daily budget, before the
+# symbol is left pending (waiting would otherwise block until the next day).
+QUOTA_MAX_WAIT = 60
+
+
+def join_chunks(chunks):
+    """
+    Concatenates per-window record lists in window order.
+
+    Each chunk is sorted by date, so any overlap with the previous chunk shows
+    up as a run of leading rows whose date is not after the last date already
+    kept. Those rows are dropped. Returns (records, dropped_count).
+    """
+    all_data = []
+    dropped = 0
+    last_date = None
+    for records in chunks:
+        start = 0
+        if last_date is not None:
+            while start < len(records) and records[start]["date"] <= last_date:
+                start += 1
+        dropped += start
+        if start < len(records):
+            all_data.extend(records[start:] if start else records)
+            last_date = records[-1]["date"]
+    return all_data, dropped
+
 
 class DownloadWorker(Thread):
     """
@@ -21,8 +79,28 @@ class DownloadWorker(Thread):
         self.screen = screen
         # Use the authenticated KiteConnect session passed from the main app
         self.kite = kite_session
-        self.instrument_map = {}
+        self.instruments = None
         self.logger = self.setup_logger()
+        # One bucket for every fetcher so the session as a whole stays within
+        # the historical-API quota, however many fetchers are running. It
+        # slows down when Kite throttles and recovers as calls succeed.
+        self.rate_limiter = AdaptiveRateLimiter(
+            params.get("requests_per_second", KITE_HISTORICAL_RATE))
+        # The machine-wide budget shared with the dashboard and any other
+        # downloader using the same API key; a falsy `quota_path` opts out.
+        quota_path = params.get("quota_path", QUOTA_PATH)
+        self.quota = QuotaAccountant(quota_path) if quota_path else None
+        self.quota_max_wait = None
+        self.max_retries = int(params.get("max_retries", DEFAULT_MAX_RETRIES))
+        self.concurrency = max(1, int(params.get("concurrency", 1)))
+        self.chunk_concurrency = max(1, int(params.get("chunk_concurrency", 1)))
+        # Processes the pipeline's writer uses for CSV formatting and interval
+        # derivation; they are only started once there is work for them.
+        self.writer_processes = max(0, int(params.get("writer_processes", 2)))
+        self.catalog = None
+        self.journal = None
+        # plan_gaps results of update mode, computed while prioritizing.
+        self.gap_plans = {}
 
     def run(self):
         """The main entry point for the thread."""
@@ -38,6 +116,12 @@ class DownloadWorker(Thread):
         except Exception as e:
             self.log_and_add_to_screen(f"FATAL ERROR: {e}", level="error")
         finally:
+            if self.journal is not None:
+                self.journal.close()
+            if self.catalog is not None:
+                self.catalog.close()
+            if self.quota is not None:
+                self.quota.close()
             self.log_and_add_to_screen("Worker finished.")
             self.screen.comm.finish_signal.emit()
 
@@ -65,138 +149,390 @@ class DownloadWorker(Thread):
         self.screen.comm.log_signal.emit(message)
 
     def prepare_instruments(self):
-        """Fetches instruments and creates a Symbol -> Token map."""
+        """
+        Opens the cached instrument master, refreshing it from Kite once per
+        trading day. A stale copy is still used if the refresh fails.
+        """
         self.log_and_add_to_screen("Fetching instrument list...")
         try:
-            # Basic caching mechanism
-            instruments_file = "source_data/instruments.csv"
-            if os.path.exists(instruments_file):
-                instruments = pd.read_csv(instruments_file)
+            instruments_dir = self.params.get("instruments_dir", INSTRUMENTS_DIR)
+            master = InstrumentMaster.open(instruments_dir)
+            if master is not None and not master.is_stale():
                 self.log_and_add_to_screen("Loaded instruments from cache.")
             else:
-                instruments_data = self.kite.instruments("NSE")
-                instruments = pd.DataFrame(instruments_data)
-                instruments.to_csv(instruments_file, index=False)
-                self.log_and_add_to_screen("Fetched and cached instruments.")
-
-            # Filter for Equity and create the map
-            eq_df = instruments[instruments["instrument_type"] == "EQ"]
-            self.instrument_map = pd.Series(
-                eq_df.instrument_token.values, index=eq_df.tradingsymbol
-            ).to_dict()
-            self.log_and_add_to_screen("Instrument map created.")
+                try:
+                    self.book_call(DEFAULT)
+                    master = refresh_master(self.kite, instruments_dir)
+                    self.log_and_add_to_screen("Fetched and cached instruments.")
+                except Exception as e:
+                    if master is None:
+                        raise
+                    self.log_and_add_to_screen(
+                        f"WARN: Could not refresh instruments ({e}); using the list fetched "
+                        f"{master.fetched_at:%Y-%m-%d %H:%M}.",
+                        level="warning",
+                    )
+            self.instruments = master
+            self.log_and_add_to_screen(f"Instrument master ready ({len(master)} instruments).")
 
         except Exception as e:
             raise Exception(f"Failed to prepare instruments: {e}")
 
     def run_normal_mode(self):
         """Handles a standard download task from the UI queue."""
-        symbols = self.params["symbols"]
-        manifest = {"pending": symbols, "completed": [], "failed": []}
-        self.process_symbols(manifest)
+        manifest_path = os.path.join(self.params["output_dir"], "session_manifest.json")
+        os.makedirs(self.params["output_dir"], exist_ok=True)
+        self.journal = DownloadJournal.create(
+            manifest_path, self.params, self.params["symbols"])
+        self.process_symbols()
 
     def run_resume_mode(self):
-        """Handles a download task based on a manifest file."""
+        """Handles a download task based on a manifest file and its journal."""
         manifest_path = self.params["manifest_path"]
         self.log_and_add_to_screen(
             f"Resuming from {os.path.basename(manifest_path)}")
-        with open(manifest_path, "r") as f:
-            manifest = json.load(f)
-
-        if not manifest.get("pending"):
+        self.journal = DownloadJournal.load(manifest_path)
+        # Settings from the UI win; the rest come from the original job.
+        self.params = {**self.journal.job, **self.params}
+        self.params.setdefault("output_dir", os.path.dirname(manifest_path))
+        # Journals written before the job recorded its layout.
+        self.params.setdefault("sharding", PARTITIONED)
+        self.params.setdefault("save_parquet", True)
+
+        if not self.journal.pending():
             self.log_and_add_to_screen(
                 "No pending symbols in manifest. Nothing to do.")
             return
 
-        self.process_symbols(manifest)
-
-    def process_symbols(self, manifest):
-        """Iterates through symbols, downloads data, and updates the manifest."""
-        pending = manifest["pending"][:]  # Work on a copy
+        self.process_symbols()
+
+    def apply_daily_budget(self):
+        """
+        Kite sets no daily limit on historical calls, but a job can set one
+        (`daily_calls`, journaled with the job) to spread a large backfill
+        over several days. Once it is spent, the remaining symbols stay
+        pending for a resume.
+        """
+        daily_calls = self.params.get("daily_calls")
+        if self.quota is None or not daily_calls:
+            return
+        self.quota.budgets.update(with_daily_limit(HISTORICAL, int(daily_calls)))
+        self.quota_max_wait = QUOTA_MAX_WAIT
+
+    def process_symbols(self):
+        """
+        Downloads all pending symbols, journaling each outcome. Fresh downloads
+        into the partitioned store run through the staged pipeline; updates and
+        the legacy layouts use a pool of fetchers that each save their symbol.
+        Symbols cut off by the daily quota are journaled as still pending.
+        """
+        self.catalog = open_catalog(self.params["output_dir"])
+        self.apply_daily_budget()
+        pending = self.prioritize(self.journal.pending())
         total_symbols = len(pending)
-        output_dir = self.params["output_dir"]
-        manifest_path = os.path.join(output_dir, "session_manifest.json")
+        self.log_and_add_to_screen(
+            f"Processing {total_symbols} symbols with {self.concurrency} fetcher(s).")
+
+        if self.params["sharding"] == PARTITIONED and not self.params.get("update_mode"):
+            DownloadPipeline(
+                self, pending,
+                queue_size=self.params.get("queue_size", DEFAULT_QUEUE_SIZE),
+                processes=self.writer_processes,
+            ).run()
+            self.screen.comm.progress_signal.emit(100)
+            return
 
-        for i, symbol in enumerate(pending):
-            self.screen.comm.progress_signal.emit(
-                int((i / total_symbols) * 100))
-            token = self.instrument_map.get(symbol)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {
+                executor.submit(self.process_symbol, symbol, i, total_symbols): symbol
+                for i, symbol in enumerate(pending)
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                try:
+                    symbol, succeeded = future.result()
+                    state = COMPLETED if succeeded else FAILED
+                except QuotaExhausted as e:
+                    symbol, state = futures[future], PENDING
+                    self.log_deferred(symbol, e)
+                self.journal.record(symbol, state)
+                self.screen.comm.progress_signal.emit(
+                    int((done / total_symbols) * 100))
 
-            if not token:
-                self.log_and_add_to_screen(
-                    f"SKIP: No token found for {symbol}", level="warning"
-                )
-                manifest["pending"].remove(symbol)
-                manifest["failed"].append(symbol)
-                continue
+        self.screen.comm.progress_signal.emit(100)
 
-            try:
-                self.log_and_add_to_screen(
-                    f"FETCH: {symbol} ({i+1}/{total_symbols})")
-                df = self.fetch_paginated_data(token)
+    def prioritize(self, symbols):
+        """
+        Orders `symbols` so the highest-priority data is fetched first (see
+        lib.downloader.scheduler), unless the job turns prioritizing off.
+        """
+        if not self.params.get("prioritize", True) or len(symbols) < 2:
+            return symbols
+        try:
+            membership = load_index_membership()
+        except (OSError, ValueError) as e:
+            self.log_and_add_to_screen(
+                f"WARN: No index membership for prioritizing ({e})", level="warning")
+            membership = {}
+        plans = plan_downloads(
+            symbols, self.params["interval"], self.params["start_date"], self.params["end_date"],
+            catalog=self.catalog if self.params.get("update_mode") else None,
+            membership=membership,
+            weights=self.params.get("index_weights", INDEX_WEIGHTS),
+        )
+        self.gap_plans = {plan["symbol"]: plan["update"] for plan in plans if "update" in plan}
+        budget = self.quota.remaining_today(HISTORICAL) if self.quota is not None else None
+        ordered, fitting = schedule(plans, budget)
+        message = (
+            f"SCHEDULE: {sum(plan['calls'] for plan in plans)} call(s) planned; "
+            f"first: {', '.join(ordered[:5])}"
+        )
+        if budget is not None:
+            message += f"; {fitting} of {len(ordered)} symbols fit today's remaining {budget} call(s)"
+        self.log_and_add_to_screen(message)
+        return ordered
+
+    def process_symbol(self, symbol, index, total_symbols):
+        """Downloads and saves a single symbol. Returns (symbol, succeeded)."""
+        symbol, succeeded = self.download_symbol(symbol, index, total_symbols)
+        if (succeeded and self.params.get("derive_intervals")
+                and self.params["interval"] == SOURCE_INTERVAL):
+            self.derive_intervals(symbol)
+        return symbol, succeeded
+
+    def derive_intervals(self, symbol):
+        """Builds the coarser intervals of `symbol` from its minute bars instead of fetching them."""
+        try:
+            written = build_pyramid(
+                self.params["output_dir"], symbol, catalog=self.catalog,
+                **self.store_options(symbol),
+            )
+            self.log_and_add_to_screen(
+                f"DERIVED: {symbol} " + ", ".join(f"{k}={v}" for k, v in written.items()))
+        except Exception as e:
+            self.log_and_add_to_screen(
+                f"ERROR deriving intervals for {symbol}: {e}", level="error"
+            )
 
-                if df.empty:
-                    self.log_and_add_to_screen(
-                        f"WARN: No data returned for {symbol}", level="warning"
-                    )
-                    manifest["pending"].remove(symbol)
-                    manifest["failed"].append(symbol)
-                else:
-                    self.save_data(df, symbol)
-                    manifest["pending"].remove(symbol)
-                    manifest["completed"].append(symbol)
+    def download_symbol(self, symbol, index, total_symbols):
+        token = self.instruments.token(symbol)
 
-            except Exception as e:
+        if not token:
+            self.log_and_add_to_screen(
+                f"SKIP: No token found for {symbol}", level="warning"
+            )
+            return symbol, False
+
+        try:
+            if self.params.get("update_mode"):
+                return symbol, self.update_symbol(symbol, token, index, total_symbols)
+
+            self.log_and_add_to_screen(
+                f"FETCH: {symbol} ({index+1}/{total_symbols})")
+
+            df = self.fetch_paginated_data(token)
+
+            if df.empty:
                 self.log_and_add_to_screen(
-                    f"ERROR fetching {symbol}: {e}", level="error"
+                    f"WARN: No data returned for {symbol}", level="warning"
                 )
-                manifest["pending"].remove(symbol)
-                manifest["failed"].append(symbol)
-            finally:
-                # Save manifest after each symbol
-                with open(manifest_path, "w") as f:
-                    json.dump(manifest, f, indent=4)
-                time.sleep(0.5)  # API rate limiting
+                return symbol, False
 
-        self.screen.comm.progress_signal.emit(100)
+            self.save_data(df, symbol)
+            return symbol, True
 
-    def fetch_paginated_data(self, token):
-        """Fetches data in 60-day chunks for minute-level intervals."""
-        from_date = self.params["start_date"]
-        to_date = self.params["end_date"]
+        except QuotaExhausted:
+            raise
+        except Exception as e:
+            self.log_and_add_to_screen(
+                f"ERROR fetching {symbol}: {e}", level="error"
+            )
+            return symbol, False
+
+    def update_symbol(self, symbol, token, index, total_symbols):
+        """
+        Fetches only the dates of the requested range not already on disk,
+        plus sessions the coverage index shows as empty, and merges them into
+        the stored series. Nearby gaps share one fetch window (and call).
+        Past days of the gaps that come back without bars are recorded in the
+        catalog, so later updates do not fetch them again. Returns True on success.
+        """
+        start_date = self.params["start_date"]
+        end_date = self.params["end_date"]
+        interval = self.params["interval"]
+        output_dir = self.params["output_dir"]
+
+        planned = self.gap_plans.pop(symbol, None)
+        touching, covered, gaps = planned or plan_gaps(
+            self.catalog, symbol, interval, start_date, end_date)
+
+        if not gaps:
+            self.log_and_add_to_screen(
+                f"UP-TO-DATE: {symbol} ({index+1}/{total_symbols})")
+            return True
+
+        gap_days = sum((gap_end - gap_start).days + 1 for gap_start, gap_end in gaps)
+        windows = pack_windows(gaps)
+        self.log_and_add_to_screen(
+            f"UPDATE: {symbol} ({index+1}/{total_symbols}) fetching {gap_days} missing day(s) "
+            f"in {len(gaps)} gap(s) with {len(windows)} call(s)")
+        new_frames = [
+            self.fetch_paginated_data(token, window_start, window_end)
+            for window_start, window_end in windows
+        ]
+        new_frames = [df for df in new_frames if not df.empty]
+        self.record_empty_days(symbol, gaps, new_frames)
+
+        if not new_frames:
+            self.log_and_add_to_screen(
+                f"WARN: No new data returned for {symbol}", level="warning")
+            return bool(touching)
+
+        existing = incremental.load_entries(output_dir, touching)
+        merged = incremental.merge_series(existing, pd.concat(new_frames, ignore_index=True))
+        merged_start = min([start_date] + [span[0] for span in covered])
+        merged_end = max([end_date] + [span[1] for span in covered])
+        self.save_data(merged, symbol, merged_start, merged_end, replaces=touching)
+        return True
+
+    def record_empty_days(self, symbol, gaps, frames):
+        """
+        Marks the days of `gaps` before today that have no bars in the fetched
+        `frames` as checked and empty (today's session may still be filling).
+        """
+        fetched = set()
+        for df in frames:
+            fetched.update(pd.to_datetime(df["date"]).dt.date)
+        today = date.today()
+        empty = [
+            day
+            for gap_start, gap_end in gaps
+            for day in pd.date_range(gap_start, min(gap_end, today - timedelta(days=1))).date
+            if day not in fetched
+        ]
+        if empty:
+            self.catalog.mark_empty(symbol, self.params["interval"], empty)
+
+    def fetch_paginated_data(self, token, from_date=None, to_date=None):
+        """Fetches data in 60-day chunks, several chunks at a time, and joins them in order."""
+        from_date = from_date or self.params["start_date"]
+        to_date = to_date or self.params["end_date"]
         interval = self.params["interval"]
         self.log_and_add_to_screen(
             f"Fetching data for token {token} from {from_date} to {to_date} with interval {interval}"
         )
-        all_data = []
-
-        while from_date <= to_date:
-            chunk_to_date = min(from_date + timedelta(days=59), to_date)
+        chunks = list(self.iter_chunks(token, from_date, to_date, interval))
+        all_data, dropped = join_chunks(chunks)
+        if dropped:
             self.log_and_add_to_screen(
-                f"Fetching chunk from {from_date} to {chunk_to_date}"
-            )
-            records = self.kite.historical_data(
-                token, from_date, chunk_to_date, interval
+                f"WARN: Dropped {dropped} overlapping rows at chunk boundaries for token {token}",
+                level="warning",
             )
+        return pd.DataFrame(all_data)
+
+    def iter_chunks(self, token, from_date, to_date, interval):
+        """
+        Yields the record lists of each 60-day window in date order. With
+        chunk concurrency, at most `chunk_concurrency` windows are in flight,
+        so a slow consumer never lets fetched chunks pile up in memory.
+        """
+        windows = chunk_windows(from_date, to_date)
+
+        if self.chunk_concurrency <= 1 or len(windows) <= 1:
+            for window in windows:
+                yield self.fetch_chunk(token, *window, interval)
+            return
+
+        with ThreadPoolExecutor(max_workers=self.chunk_concurrency) as executor:
+            in_flight = deque()
+            for window in windows:
+                in_flight.append(executor.submit(self.fetch_chunk, token, *window, interval))
+                if len(in_flight) >= self.chunk_concurrency:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+
+    def log_deferred(self, symbol, error):
+        self.log_and_add_to_screen(
+            f"DEFERRED: {symbol} stays pending for a resume ({error})", level="warning")
+
+    def book_call(self, endpoint):
+        """
+        Waits for room in the machine-wide quota of `endpoint`, if one is in
+        use. Raises QuotaExhausted once a daily budget is spent.
+        """
+        if self.quota is not None:
+            self.quota.acquire(endpoint, max_wait=self.quota_max_wait)
+
+    def fetch_chunk(self, token, from_date, to_date, interval):
+        """
+        Fetches a single chunk window, waiting on the session's rate limiter
+        and the machine-wide quota first. Transient failures are retried for
+        this chunk alone, with exponential backoff and jitter; throttling also
+        lowers the shared request rate and briefly pauses every process.
+        """
+        self.log_and_add_to_screen(
+            f"Fetching chunk from {from_date} to {to_date}"
+        )
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            self.book_call(HISTORICAL)
+            try:
+                records = self.kite.historical_data(token, from_date, to_date, interval)
+            except Exception as e:
+                if not is_retryable(e) or attempt == self.max_retries:
+                    raise
+                if is_throttle(e):
+                    self.rate_limiter.on_throttle()
+                    if self.quota is not None:
+                        self.quota.pause(HISTORICAL, THROTTLE_PAUSE)
+                delay = backoff_delay(attempt)
+                self.log_and_add_to_screen(
+                    f"RETRY {attempt+1}/{self.max_retries}: chunk {from_date} to {to_date} "
+                    f"for token {token} in {delay:.1f}s ({e})",
+                    level="warning",
+                )
+                time.sleep(delay)
+                continue
+            self.rate_limiter.on_success()
             self.log_and_add_to_screen(f"Got {len(records)} records in chunk.")
-            all_data.extend(records)
-            from_date = chunk_to_date + timedelta(days=1)
+            return records
+
+    def store_options(self, symbol):
+        """Keyword arguments for the bar store writers, from the job's output settings."""
+        return {
+            "save_csv": self.params.get("save_csv", False),
+            "compact": self.params.get("compact_storage", False),
+            "tick_size": self.instruments.tick_size(symbol),
+            "store_format": self.params.get("store_format", PARQUET),
+            "codec": self.params.get("compression", DEFAULT_CODEC),
+            "row_group_size": self.params.get("row_group_size") or None,
+        }
 
-        return pd.DataFrame(all_data)
+    def validation_options(self):
+        return {"spike_threshold": self.params.get("spike_threshold", SPIKE_THRESHOLD)}
 
-    def save_data(self, df, symbol):
-        """Saves the DataFrame with metadata and sharding."""
+    def record_quality(self, symbol, report):
+        """Stores a symbol's ingest quality summary in the catalog and reports any issues."""
+        self.catalog.set_quality(symbol, self.params["interval"], report)
+        issues = quality_issues(report)
+        if issues:
+            self.log_and_add_to_screen(
+                f"QUALITY: {symbol} {issues} (of {report['rows']} rows)", level="warning")
+
+    def save_data(self, df, symbol, start_date=None, end_date=None, replaces=()):
+        """
+        Validates and repairs the DataFrame, saves it with sharding and records
+        it in the catalog. Entries listed in `replaces` are superseded by the
+        new files: they are dropped from the catalog and their files are deleted.
+        """
+        df, report = validate_frame(df, **self.validation_options())
         output_dir = self.params["output_dir"]
         sharding = self.params["sharding"]
-        start_date = self.params["start_date"]
-        end_date = self.params["end_date"]
+        start_date = start_date or self.params["start_date"]
+        end_date = end_date or self.params["end_date"]
         interval = self.params["interval"]
 
-        metadata_path = os.path.join(output_dir, "metadata.json")
         metadata = []
-        if os.path.exists(metadata_path):
-            with open(metadata_path, "r") as f:
-                metadata = json.load(f)
 
         sharding_map = {
             "By Day": "D",
@@ -207,7 +543,12 @@ class DownloadWorker(Thread):
         }
         freq = sharding_map.get(sharding)
 
-        if freq:
+        if sharding == PARTITIONED:
+            metadata = write_bars(
+                output_dir, symbol, interval, df, start_date, end_date,
+                **self.store_options(symbol),
+            )
+        elif freq:
             df["date"] = pd.to_datetime(df["date"]).dt.tz_localize(None)
             df.set_index("date", inplace=True)
             for name, group in df.groupby(pd.Grouper(freq=freq)):
@@ -263,7 +604,9 @@ class DownloadWorker(Thread):
             
             metadata.append(file_info)
 
-        with open(metadata_path, "w") as f:
-            json.dump(metadata, f, indent=4)
+        self.catalog.replace(metadata, [item["file_id"] for item in replaces])
+        self.record_quality(symbol, report)
+
+        remove_entry_files(output_dir, replaces)
 
         self.log_and_add_to_screen(f"SAVE: {symbol} data saved.")
\ No newline at end of file
@@ -0,0 +1,26 @@
+class Signal:
+    """Drop-in for a Qt signal: `emit` calls the connected callback, if any."""
+
+    def __init__(self, callback=None):
+        self.callback = callback
+
+    def emit(self, *args):
+        if self.callback is not None:
+            self.callback(*args)
+
+
+class Communicate:
+    def __init__(self, on_log=None, on_progress=None, on_finish=None):
+        self.log_signal = Signal(on_log)
+        self.progress_signal = Signal(on_progress)
+        self.finish_signal = Signal(on_finish)
+
+
+class HeadlessScreen:
+    """
+    Stands in for DownloaderScreen so DownloadWorker can run without Qt. The
+    worker only talks to `screen.comm`, so plain callbacks are enough.
+    """
+
+    def __init__(self, on_log=None, on_progress=None, on_finish=None):
+        self.comm = Communicate(on_log, on_progress, on_finish)
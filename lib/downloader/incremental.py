@@ -0,0 +1,94 @@
+import os
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from lib.datastore.bar_store import normalize_dates, read_bar_file
+
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def covered_ranges(entries):
+    """Merges the date ranges of `entries` into a sorted list of disjoint (start, end) dates."""
+    return merge_ranges(
+        (
+            datetime.strptime(item["start_date"], DATE_FORMAT).date(),
+            datetime.strptime(item["end_date"], DATE_FORMAT).date(),
+        )
+        for item in entries
+    )
+
+
+def merge_ranges(ranges):
+    """Merges overlapping or adjoining inclusive (start, end) date ranges, in date order."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def missing_ranges(covered, start_date, end_date):
+    """Returns the inclusive (start, end) date gaps of [start_date, end_date] not in `covered`."""
+    gaps = []
+    cursor = start_date
+    for start, end in covered:
+        if end < cursor:
+            continue
+        if start > end_date:
+            break
+        if start > cursor:
+            gaps.append((cursor, min(start - timedelta(days=1), end_date)))
+        cursor = max(cursor, end + timedelta(days=1))
+        if cursor > end_date:
+            break
+    if cursor <= end_date:
+        gaps.append((cursor, end_date))
+    return gaps
+
+
+def exclude_days(ranges, days):
+    """Splits the sorted inclusive (start, end) date `ranges` around the dates in `days`."""
+    kept = []
+    for start, end in ranges:
+        for day in sorted(day for day in days if start <= day <= end):
+            if day > start:
+                kept.append((start, day - timedelta(days=1)))
+            start = day + timedelta(days=1)
+        if start <= end:
+            kept.append((start, end))
+    return kept
+
+
+def load_entries(output_dir, entries):
+    """Reads the files behind `entries` into one frame, preferring Arrow, then Parquet, then CSV."""
+    frames = []
+    for item in entries:
+        path = next(
+            (os.path.join(output_dir, item[key]) for key in ("arrow_filename", "parquet_filename")
+             if item.get(key) and os.path.exists(os.path.join(output_dir, item[key]))),
+            None,
+        )
+        if path:
+            frames.append(normalize_dates(read_bar_file(path)))
+            continue
+        if item.get("csv_filename"):
+            path = os.path.join(output_dir, item["csv_filename"])
+            if os.path.exists(path):
+                frames.append(normalize_dates(pd.read_csv(path)))
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def merge_series(existing, new):
+    """Combines two bar frames, keeping the newest row for any repeated timestamp."""
+    frames = [normalize_dates(df) for df in (existing, new) if not df.empty]
+    if not frames:
+        return pd.DataFrame()
+    merged = pd.concat(frames, ignore_index=True)
+    merged = merged.drop_duplicates(subset="date", keep="last")
+    return merged.sort_values("date", ignore_index=True)
@@ -0,0 +1,155 @@
+"""
+Binary cache of the NSE instrument master.
+
+Kite's instrument dump (about 8,600 NSE rows) is kept as a NumPy structured
+array sorted by tradingsymbol (`instruments.npy`) and opened memory-mapped,
+so loading it costs a page-in instead of a CSV parse, and every process that
+opens it shares the same pages of the OS cache. Symbol lookups are binary
+searches over the sorted column.
+
+Kite publishes a fresh dump every trading morning. `instruments.json`
+records when the cached copy was fetched; the copy is stale once a
+publication time has passed since then, so it is refreshed at most once per
+trading day. A missing master is built from the legacy `instruments.csv`
+when that exists.
+"""
+import json
+import os
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from lib.datastore.schema import MARKET_TZ
+from lib.datastore.trading_calendar import trading_days
+
+INSTRUMENTS_DIR = "source_data"
+MASTER_FILENAME = "instruments.npy"
+META_FILENAME = "instruments.json"
+LEGACY_CSV_FILENAME = "instruments.csv"
+# Kite's daily dump is ready well before the 09:00 pre-open.
+PUBLISH_TIME = "08:30"
+
+TEXT_FIELDS = ("tradingsymbol", "name", "segment")
+NUMERIC_FIELDS = (
+    ("instrument_token", np.int64),
+    ("exchange_token", np.int64),
+    ("tick_size", np.float64),
+    ("lot_size", np.int32),
+)
+
+
+def last_publication(now=None):
+    """The latest daily dump publication time at or before `now` (IST)."""
+    now = pd.Timestamp.now(tz=MARKET_TZ) if now is None else pd.Timestamp(now).tz_convert(MARKET_TZ)
+    for day in trading_days(now.date() - timedelta(days=14), now.date())[::-1].astype(object):
+        published = pd.Timestamp(f"{day} {PUBLISH_TIME}", tz=MARKET_TZ)
+        if published <= now:
+            return published
+    return None
+
+
+def build_records(instruments):
+    """
+    Converts Kite instrument rows (a list of dicts or a DataFrame) to the
+    master's structured array: NSE equities only, one row per
+    tradingsymbol, sorted by it.
+    """
+    df = pd.DataFrame(instruments)
+    df = df[df["instrument_type"] == "EQ"].drop_duplicates(subset="tradingsymbol")
+    df = df.sort_values("tradingsymbol", ignore_index=True)
+    text = {field: df[field].fillna("").astype(str).str.encode("utf-8") for field in TEXT_FIELDS}
+    dtype = [(field, f"S{max(1, values.str.len().max() or 1)}") for field, values in text.items()]
+    dtype += list(NUMERIC_FIELDS)
+    records = np.zeros(len(df), dtype=dtype)
+    for field, values in text.items():
+        records[field] = values.to_numpy()
+    for field, kind in NUMERIC_FIELDS:
+        records[field] = df[field].fillna(0).to_numpy(dtype=kind)
+    return records
+
+
+class InstrumentMaster:
+    """Read-only view of a cached instrument master."""
+
+    def __init__(self, records, fetched_at):
+        self.records = records
+        self.fetched_at = fetched_at
+        self._symbols = records["tradingsymbol"]
+
+    def __len__(self):
+        return len(self.records)
+
+    @classmethod
+    def open(cls, directory=INSTRUMENTS_DIR):
+        """Opens the master in `directory`, importing the legacy CSV if needed. None if neither exists."""
+        path = os.path.join(directory, MASTER_FILENAME)
+        meta_path = os.path.join(directory, META_FILENAME)
+        if os.path.exists(path) and os.path.exists(meta_path):
+            with open(meta_path, "r") as f:
+                fetched_at = pd.Timestamp(json.load(f)["fetched_at"])
+            return cls(np.load(path, mmap_mode="r"), fetched_at)
+        csv_path = os.path.join(directory, LEGACY_CSV_FILENAME)
+        if os.path.exists(csv_path):
+            fetched_at = pd.Timestamp(os.path.getmtime(csv_path), unit="s", tz=MARKET_TZ)
+            return cls.save(directory, pd.read_csv(csv_path), fetched_at)
+        return None
+
+    @classmethod
+    def save(cls, directory, instruments, fetched_at=None):
+        """Writes a new master from Kite instrument rows and opens it."""
+        fetched_at = pd.Timestamp.now(tz=MARKET_TZ) if fetched_at is None else fetched_at
+        os.makedirs(directory, exist_ok=True)
+        records = build_records(instruments)
+        # Written under temporary names and swapped in, so processes that
+        # already mapped the old file keep reading a complete copy.
+        suffix = f".{os.getpid()}.tmp"
+        path = os.path.join(directory, MASTER_FILENAME)
+        meta_path = os.path.join(directory, META_FILENAME)
+        with open(path + suffix, "wb") as f:
+            np.save(f, records)
+        with open(meta_path + suffix, "w") as f:
+            json.dump({"fetched_at": fetched_at.isoformat(), "rows": len(records)}, f)
+        os.replace(path + suffix, path)
+        os.replace(meta_path + suffix, meta_path)
+        return cls(np.load(path, mmap_mode="r"), fetched_at)
+
+    def is_stale(self, now=None):
+        """True once a daily dump has been published since this copy was fetched."""
+        published = last_publication(now)
+        return published is not None and self.fetched_at < published
+
+    def find(self, symbols):
+        """Row index of each symbol in `symbols`, -1 where it is unknown."""
+        encoded = [symbol.encode("utf-8") for symbol in symbols]
+        if not len(self.records):
+            return np.full(len(encoded), -1)
+        # Keys longer than the column would be truncated into false matches.
+        fits = np.array([len(key) <= self._symbols.dtype.itemsize for key in encoded], dtype=bool)
+        keys = np.array(encoded, dtype=self._symbols.dtype)
+        index = np.searchsorted(self._symbols, keys)
+        index[index == len(self._symbols)] = 0
+        return np.where(fits & (self._symbols[index] == keys), index, -1)
+
+    def _value(self, symbol, field):
+        index = self.find([symbol])[0]
+        return None if index < 0 else self.records[field][index].item()
+
+    def token(self, symbol):
+        """Instrument token of `symbol`, or None if it is not in the master."""
+        return self._value(symbol, "instrument_token")
+
+    def tick_size(self, symbol):
+        """Tick size of `symbol`, or None if it is unknown or not positive."""
+        tick = self._value(symbol, "tick_size")
+        return tick if tick and tick > 0 else None
+
+    def tick_sizes(self):
+        """Returns {symbol: tick size} for every instrument with a positive tick."""
+        ticked = self.records[self.records["tick_size"] > 0]
+        return dict(zip(np.char.decode(ticked["tradingsymbol"]).tolist(), ticked["tick_size"].tolist()))
+
+
+def refresh_master(kite, directory=INSTRUMENTS_DIR):
+    """Fetches the NSE dump from Kite and replaces the cached master."""
+    return InstrumentMaster.save(directory, kite.instruments("NSE"))
@@ -0,0 +1,144 @@
+import json
+import os
+from datetime import date
+
+PENDING = "pending"
+COMPLETED = "completed"
+FAILED = "failed"
+STATES = (PENDING, COMPLETED, FAILED)
+
+# Job parameters persisted with the manifest so a resumed run downloads the
+# same range into the same place.
+JOB_KEYS = (
+    "start_date",
+    "end_date",
+    "interval",
+    "output_dir",
+    "sharding",
+    "save_csv",
+    "save_parquet",
+    "update_mode",
+    "compact_storage",
+    "derive_intervals",
+    "store_format",
+    "compression",
+    "row_group_size",
+    "prioritize",
+    "daily_calls",
+)
+DATE_KEYS = ("start_date", "end_date")
+
+
+def journal_path_for(manifest_path):
+    return os.path.splitext(manifest_path)[0] + ".journal"
+
+
+def atomic_write_json(path, data):
+    """Writes `data` to a temp file and renames it over `path`, so readers never see a torn file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class DownloadJournal:
+    """
+    Crash-safe record of per-symbol download state.
+
+    The manifest JSON is a snapshot written only on compaction, via atomic
+    rename. Between snapshots every state transition is appended as one JSON
+    line to a sidecar `.journal` file. Loading replays the journal on top of
+    the snapshot in a single linear pass; a torn trailing line from a crash is
+    ignored, which simply leaves that symbol pending.
+    """
+
+    def __init__(self, manifest_path, job=None, states=None, compact_every=500):
+        self.manifest_path = manifest_path
+        self.journal_path = journal_path_for(manifest_path)
+        self.job = job or {}
+        self.states = states if states is not None else {}
+        self.compact_every = compact_every
+        self._appended = 0
+        self._journal_file = None
+
+    @classmethod
+    def create(cls, manifest_path, params, symbols, **kwargs):
+        """Starts a new journal with every symbol pending, replacing any previous one."""
+        job = {key: params[key] for key in JOB_KEYS if key in params}
+        states = dict.fromkeys(symbols, PENDING)
+        journal = cls(manifest_path, job, states, **kwargs)
+        journal.compact()
+        return journal
+
+    @classmethod
+    def load(cls, manifest_path, **kwargs):
+        """Rebuilds state from the manifest snapshot plus the journal appended after it."""
+        with open(manifest_path, "r") as f:
+            snapshot = json.load(f)
+
+        job = snapshot.get("job", {})
+        for key in DATE_KEYS:
+            if isinstance(job.get(key), str):
+                job[key] = date.fromisoformat(job[key])
+
+        states = {}
+        for state in STATES:
+            for symbol in snapshot.get(state, []):
+                states[symbol] = state
+
+        journal_path = journal_path_for(manifest_path)
+        if os.path.exists(journal_path):
+            with open(journal_path, "r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Torn write from a crash
+                    if entry.get("state") in STATES:
+                        states[entry["symbol"]] = entry["state"]
+
+        journal = cls(manifest_path, job, states, **kwargs)
+        # Fold the replayed lines into a fresh snapshot so new appends never
+        # land after a torn line.
+        journal.compact()
+        return journal
+
+    def symbols_in(self, state):
+        return [symbol for symbol, current in self.states.items() if current == state]
+
+    def pending(self):
+        return self.symbols_in(PENDING)
+
+    def record(self, symbol, state):
+        """Appends a state transition, compacting once enough lines have built up."""
+        self.states[symbol] = state
+        if self._journal_file is None:
+            self._journal_file = open(self.journal_path, "a")
+        self._journal_file.write(json.dumps({"symbol": symbol, "state": state}) + "\n")
+        self._journal_file.flush()
+        self._appended += 1
+        if self._appended >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """Writes a fresh snapshot atomically and truncates the journal."""
+        snapshot = {"job": {
+            key: value.isoformat() if isinstance(value, date) else value
+            for key, value in self.job.items()
+        }}
+        for state in STATES:
+            snapshot[state] = self.symbols_in(state)
+        atomic_write_json(self.manifest_path, snapshot)
+
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._appended = 0
+
+    def close(self):
+        """Folds the journal into the snapshot and releases the journal file."""
+        self.compact()
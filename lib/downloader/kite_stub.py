@@ -0,0 +1,156 @@
+"""
+An in-process stand-in for the parts of KiteConnect the downloader uses.
+
+`StubKite.historical_data` returns deterministic synthetic OHLCV for any token
+and date range: the bars of a given (token, day) are always the same, however
+the range is chunked. Latency, random failures and Kite's 429 throttling are
+configurable so DownloadWorker can be benchmarked and regression-tested
+offline.
+"""
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from kiteconnect.exceptions import InputException, NetworkException
+
+from lib.downloader.rate_limiter import KITE_HISTORICAL_RATE
+
+IST = timezone(timedelta(hours=5, minutes=30))
+SESSION_OPEN = (9, 15)
+SESSION_MINUTES = 375  # 09:15 to 15:29 inclusive
+INTERVAL_MINUTES = {
+    "minute": 1,
+    "3minute": 3,
+    "5minute": 5,
+    "10minute": 10,
+    "15minute": 15,
+    "30minute": 30,
+    "60minute": 60,
+}
+TICK_SIZE = 0.05
+
+
+def _to_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+class StubKite:
+    """
+    Mimics `KiteConnect.historical_data` and `KiteConnect.instruments`.
+
+    latency: base seconds per call, plus up to `jitter` extra.
+    error_rate: probability that a call fails with a NetworkException.
+    rate_limit: calls per second accepted before answering 429, like Kite.
+    """
+
+    def __init__(self, symbols=(), latency=0.0, jitter=0.0, error_rate=0.0,
+                 rate_limit=KITE_HISTORICAL_RATE, seed=0):
+        self.symbols = list(symbols)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recent_calls = deque()
+        self.calls = 0
+        self.throttled = 0
+        self.errors = 0
+        self.records_served = 0
+
+    def instruments(self, exchange=None):
+        """Returns NSE equity instruments for the configured symbols, with stable tokens."""
+        return [
+            {
+                "instrument_token": 100000 + i,
+                "exchange_token": 1000 + i,
+                "tradingsymbol": symbol,
+                "name": symbol,
+                "last_price": 0.0,
+                "expiry": "",
+                "strike": 0.0,
+                "tick_size": TICK_SIZE,
+                "lot_size": 1,
+                "instrument_type": "EQ",
+                "segment": "NSE",
+                "exchange": "NSE",
+            }
+            for i, symbol in enumerate(sorted(self.symbols))
+        ]
+
+    def historical_data(self, instrument_token, from_date, to_date, interval,
+                        continuous=False, oi=False):
+        self._admit()
+        if interval != "day" and interval not in INTERVAL_MINUTES:
+            raise InputException(f"invalid interval: {interval}")
+
+        records = []
+        day = _to_date(from_date)
+        last_day = _to_date(to_date)
+        while day <= last_day:
+            if day.weekday() < 5:
+                records.extend(self._day_bars(instrument_token, day, interval))
+            day += timedelta(days=1)
+
+        with self._lock:
+            self.records_served += len(records)
+        return records
+
+    def _admit(self):
+        """Applies latency, throttling and random failures for one call."""
+        with self._lock:
+            self.calls += 1
+            now = time.monotonic()
+            while self._recent_calls and now - self._recent_calls[0] >= 1.0:
+                self._recent_calls.popleft()
+            throttled = len(self._recent_calls) >= self.rate_limit
+            if not throttled:
+                self._recent_calls.append(now)
+            failed = not throttled and self._rng.random() < self.error_rate
+            delay = self.latency + self._rng.random() * self.jitter
+            if throttled:
+                self.throttled += 1
+            if failed:
+                self.errors += 1
+
+        if delay:
+            time.sleep(delay)
+        if throttled:
+            raise NetworkException("Too many requests", code=429)
+        if failed:
+            raise NetworkException("Gateway timed out", code=504)
+
+    def _day_bars(self, token, day, interval):
+        rng = random.Random(token * 1_000_003 + day.toordinal())
+        base = 50 + (token % 4000)
+        price = round(base * (1 + 0.2 * rng.uniform(-1, 1)) / TICK_SIZE) * TICK_SIZE
+
+        if interval == "day":
+            return [self._bar(rng, datetime(day.year, day.month, day.day, tzinfo=IST), price, SESSION_MINUTES)]
+
+        step = INTERVAL_MINUTES[interval]
+        session_start = datetime(day.year, day.month, day.day, *SESSION_OPEN, tzinfo=IST)
+        bars = []
+        for offset in range(0, SESSION_MINUTES, step):
+            bar = self._bar(rng, session_start + timedelta(minutes=offset), price, step)
+            price = bar["close"]
+            bars.append(bar)
+        return bars
+
+    @staticmethod
+    def _bar(rng, when, open_price, minutes):
+        ticks = [round(open_price / TICK_SIZE)]
+        for _ in range(3):
+            ticks.append(max(1, ticks[-1] + rng.randint(-4, 4) * max(1, minutes // 5)))
+        open_, close = ticks[0], ticks[-1]
+        return {
+            "date": when,
+            "open": round(open_ * TICK_SIZE, 2),
+            "high": round(max(ticks) * TICK_SIZE, 2),
+            "low": round(min(ticks) * TICK_SIZE, 2),
+            "close": round(close * TICK_SIZE, 2),
+            "volume": rng.randint(0, 5000) * minutes,
+        }
+
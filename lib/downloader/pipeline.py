@@ -0,0 +1,218 @@
+"""
+Staged download pipeline for the partitioned bar store.
+
+    fetch threads -> [fetched queue] -> transform -> [table queue] -> writer (+ process pool)
+
+Fetchers only talk to the API: each pulls a symbol's chunks in date order and
+hands the raw records on. The transform stage turns records into typed Arrow
+tables and runs them through the vectorized validation and repair pass
+(lib.datastore.validation). The writer owns one BarWriter per open symbol,
+appends each table as a row group, commits finished symbols to the catalog
+and journal, and sends CSV formatting and interval derivation to a process
+pool. Both queues are bounded, so a slow writer blocks the fetchers instead
+of letting chunks pile up in memory, and a steady pipeline runs at the API
+limit rather than at the sum of the stage latencies.
+"""
+import multiprocessing
+import queue
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from threading import Thread
+
+from lib.datastore.bar_store import BarWriter, records_to_table
+from lib.datastore.catalog import remove_entry_files
+from lib.datastore.pyramid import SOURCE_INTERVAL, build_pyramid
+from lib.datastore.validation import empty_quality, merge_quality, validate_table
+from lib.downloader.journal import COMPLETED, FAILED, PENDING
+from lib.downloader.quota import QuotaExhausted
+
+DEFAULT_QUEUE_SIZE = 8
+
+CHUNK = "chunk"
+FAIL = "fail"
+END = "end"
+_STOP = object()
+
+
+class DownloadPipeline:
+    """
+    Runs the pending symbols of a DownloadWorker through the staged pipeline.
+
+    queue_size: chunks each queue holds before its producers block.
+    processes: size of the writer's process pool; 0 keeps all encoding on the
+        writer thread.
+    """
+
+    def __init__(self, worker, symbols, queue_size=DEFAULT_QUEUE_SIZE, processes=0):
+        self.worker = worker
+        self.params = worker.params
+        self.symbols = list(symbols)
+        self.processes = processes
+        self.fetched = queue.Queue(maxsize=queue_size)
+        self.tables = queue.Queue(maxsize=queue_size)
+        self.pool = None
+        self.done = 0
+
+    def run(self):
+        if self.processes:
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.processes, mp_context=multiprocessing.get_context("spawn"))
+        transform = Thread(target=self._transform, name="download-transform")
+        writer = Thread(target=self._write, name="download-writer")
+        transform.start()
+        writer.start()
+        try:
+            with ThreadPoolExecutor(max_workers=self.worker.concurrency) as executor:
+                list(executor.map(self._fetch, self.symbols, range(len(self.symbols))))
+        finally:
+            self.fetched.put(_STOP)
+            transform.join()
+            writer.join()
+            if self.pool is not None:
+                # Waits for interval derivations still running in the pool.
+                self.pool.shutdown(wait=True)
+
+    # --- Stage 1: fetch ---
+    def _fetch(self, symbol, index):
+        token = self.worker.instruments.token(symbol)
+        if not token:
+            self.worker.log_and_add_to_screen(
+                f"SKIP: No token found for {symbol}", level="warning")
+            self.fetched.put((END, symbol, None))
+            return
+        self.worker.log_and_add_to_screen(
+            f"FETCH: {symbol} ({index+1}/{len(self.symbols)})")
+        try:
+            for records in self.worker.iter_chunks(
+                    token, self.params["start_date"], self.params["end_date"], self.params["interval"]):
+                if records:
+                    self.fetched.put((CHUNK, symbol, records))
+        except Exception as e:
+            self.fetched.put((FAIL, symbol, e))
+        self.fetched.put((END, symbol, None))
+
+    # --- Stage 2: transform ---
+    def _transform(self):
+        options = self.worker.validation_options()
+        while True:
+            item = self.fetched.get()
+            if item is _STOP:
+                self.tables.put(_STOP)
+                return
+            kind, symbol, payload = item
+            if kind == CHUNK:
+                try:
+                    item = (CHUNK, symbol, validate_table(records_to_table(payload), **options))
+                except Exception as e:
+                    item = (FAIL, symbol, e)
+            self.tables.put(item)
+
+    # --- Stage 3: write ---
+    def _write(self):
+        writers = {}
+        reports = {}
+        failed = {}
+        while True:
+            item = self.tables.get()
+            if item is _STOP:
+                return
+            kind, symbol, payload = item
+            if kind == END:
+                # The writer must outlive any one symbol, or blocked fetchers
+                # would wait on a full queue forever.
+                try:
+                    self._finish(symbol, writers.pop(symbol, None), reports.pop(symbol, None),
+                                 failed.pop(symbol, None))
+                except Exception as e:
+                    self.worker.log_and_add_to_screen(
+                        f"ERROR saving {symbol}: {e}", level="error")
+            elif symbol in failed:
+                continue
+            elif kind == FAIL:
+                failed[symbol] = payload
+            else:
+                table, report = payload
+                try:
+                    if symbol not in writers:
+                        writers[symbol] = self._open_writer(symbol)
+                        reports[symbol] = empty_quality()
+                    writers[symbol].write_table(table)
+                    reports[symbol] = merge_quality(reports[symbol], report)
+                except Exception as e:
+                    failed[symbol] = e
+
+    def _open_writer(self, symbol):
+        return BarWriter(
+            self.params["output_dir"], symbol, self.params["interval"],
+            self.params["start_date"], self.params["end_date"],
+            csv_encoder=self.pool,
+            **self.worker.store_options(symbol),
+        )
+
+    def _finish(self, symbol, writer, report, error):
+        """Commits or discards one symbol's files and records the outcome."""
+        worker = self.worker
+        entries = []
+        try:
+            if error is not None:
+                raise error
+            if writer is not None:
+                entries = writer.close()
+        except Exception as e:
+            if writer is not None:
+                writer.abort()
+            if isinstance(e, QuotaExhausted):
+                worker.log_deferred(symbol, e)
+                self._record(symbol, PENDING)
+                return
+            worker.log_and_add_to_screen(f"ERROR fetching {symbol}: {e}", level="error")
+            self._record(symbol, FAILED)
+            return
+
+        if not entries:
+            if worker.instruments.token(symbol):
+                worker.log_and_add_to_screen(
+                    f"WARN: No data returned for {symbol}", level="warning")
+            self._record(symbol, FAILED)
+            return
+
+        added = False
+        try:
+            worker.catalog.add(entries)
+            added = True
+            # Rows repeated across chunk boundaries are duplicates too.
+            report["duplicates"] += writer.dropped
+            worker.record_quality(symbol, report)
+        except Exception as e:
+            # Neither the catalog nor the data directory keeps a half-recorded symbol.
+            if added:
+                worker.catalog.remove([entry["file_id"] for entry in entries])
+            remove_entry_files(self.params["output_dir"], entries)
+            worker.log_and_add_to_screen(f"ERROR saving {symbol}: {e}", level="error")
+            self._record(symbol, FAILED)
+            return
+        worker.log_and_add_to_screen(f"SAVE: {symbol} data saved.")
+        self._record(symbol, COMPLETED)
+
+        if self.params.get("derive_intervals") and self.params["interval"] == SOURCE_INTERVAL:
+            if self.pool is None:
+                worker.derive_intervals(symbol)
+            else:
+                future = self.pool.submit(
+                    build_pyramid, self.params["output_dir"], symbol,
+                    **worker.store_options(symbol))
+                future.add_done_callback(lambda f, s=symbol: self._derived(s, f))
+
+    def _derived(self, symbol, future):
+        try:
+            written = future.result()
+        except Exception as e:
+            self.worker.log_and_add_to_screen(
+                f"ERROR deriving intervals for {symbol}: {e}", level="error")
+            return
+        self.worker.log_and_add_to_screen(
+            f"DERIVED: {symbol} " + ", ".join(f"{k}={v}" for k, v in written.items()))
+
+    def _record(self, symbol, state):
+        self.worker.journal.record(symbol, state)
+        self.done += 1
+        self.worker.screen.comm.progress_signal.emit(int((self.done / len(self.symbols)) * 100))
@@ -0,0 +1,185 @@
+"""
+Machine-wide accounting of Kite Connect API calls.
+
+Kite's rate limits apply per API key, however many processes share it: a
+downloader, a dashboard refresh and a second downloader all draw on the same
+budget. Every caller books its calls in one SQLite file (WAL mode, the same
+pattern as the dataset catalog), and each booking is a short
+`BEGIN IMMEDIATE` transaction, so processes on a machine serialize on the
+file lock and never overbook. Budgets are kept per endpoint class over
+sliding one-second and one-minute windows and per calendar day (IST). A 429
+seen by any process pauses the whole class for every process.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+QUOTA_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "..", "generated_data", "kite_quota.sqlite3")
+
+HISTORICAL = "historical"
+QUOTE = "quote"
+ORDER = "order"
+DEFAULT = "default"
+
+# Per endpoint class: (per second, per minute, per day); None is unlimited.
+# From Kite Connect's published limits.
+KITE_BUDGETS = {
+    HISTORICAL: (3, None, None),
+    QUOTE: (1, None, None),
+    ORDER: (10, 200, 3000),
+    DEFAULT: (10, None, None),
+}
+
+# How long a 429 holds back every process's calls of that class.
+THROTTLE_PAUSE = 1.0
+
+# IST has no daylight saving, so its days start at a fixed UTC offset.
+IST_OFFSET = 5 * 3600 + 30 * 60
+DAY_SECONDS = 24 * 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    endpoint TEXT NOT NULL,
+    at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_calls_endpoint_at ON calls (endpoint, at);
+CREATE TABLE IF NOT EXISTS pauses (
+    endpoint TEXT PRIMARY KEY,
+    until REAL NOT NULL
+);
+"""
+
+
+def with_daily_limit(endpoint, per_day, budgets=KITE_BUDGETS):
+    """Budget override for `QuotaAccountant` capping `endpoint` at `per_day` calls a day."""
+    per_second, per_minute, _ = budgets[endpoint]
+    return {endpoint: (per_second, per_minute, per_day)}
+
+
+class QuotaExhausted(Exception):
+    """Raised when a call could not be booked within the caller's `max_wait`."""
+
+
+def _day_start(now):
+    """Epoch seconds of the IST midnight starting the day of `now`."""
+    return now - (now + IST_OFFSET) % DAY_SECONDS
+
+
+class QuotaAccountant:
+    """
+    Books API calls against per-class budgets shared by every process that
+    opens the same file.
+
+    `try_acquire` books a call if every window of its class has room and
+    returns 0, or returns the seconds until one would. `acquire` waits and
+    retries until the call is booked.
+    """
+
+    def __init__(self, path=QUOTA_PATH, budgets=None):
+        self.path = path
+        self.budgets = {**KITE_BUDGETS, **(budgets or {})}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _windows(self, endpoint, now):
+        """(start, budget, time a booked call opens room again) of each limited window of the class."""
+        per_second, per_minute, per_day = self.budgets.get(endpoint, self.budgets[DEFAULT])
+        day_start = _day_start(now)
+        windows = [
+            (now - 1, per_second, lambda oldest: oldest + 1),
+            (now - 60, per_minute, lambda oldest: oldest + 60),
+            (day_start, per_day, lambda oldest: day_start + DAY_SECONDS),
+        ]
+        return [window for window in windows if window[1] is not None]
+
+    def try_acquire(self, endpoint=DEFAULT):
+        """Books one call of `endpoint` if the budget allows. Returns 0, or the seconds to wait."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute(
+                    "SELECT until FROM pauses WHERE endpoint = ?", (endpoint,)).fetchone()
+                if row and row[0] > now:
+                    return row[0] - now
+                wait = 0.0
+                for start, budget, reopens in self._windows(endpoint, now):
+                    used = self._conn.execute(
+                        "SELECT COUNT(*) FROM calls WHERE endpoint = ? AND at > ?",
+                        (endpoint, start)).fetchone()[0]
+                    if used >= budget:
+                        # Room opens when the oldest call that fills the budget leaves the window.
+                        oldest = self._conn.execute(
+                            "SELECT at FROM calls WHERE endpoint = ? AND at > ? "
+                            "ORDER BY at LIMIT 1 OFFSET ?",
+                            (endpoint, start, used - budget)).fetchone()[0]
+                        wait = max(wait, reopens(oldest) - now)
+                if wait > 0:
+                    return wait
+                self._conn.execute("INSERT INTO calls (endpoint, at) VALUES (?, ?)", (endpoint, now))
+                self._conn.execute(
+                    "DELETE FROM calls WHERE endpoint = ? AND at < ?",
+                    (endpoint, min(now - 60, _day_start(now))))
+                return 0.0
+            finally:
+                self._conn.execute("COMMIT")
+
+    def acquire(self, endpoint=DEFAULT, max_wait=None):
+        """
+        Blocks until a call of `endpoint` is booked. With `max_wait`, raises
+        QuotaExhausted instead of waiting longer than that many seconds
+        (e.g. once a daily budget is spent).
+        """
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(endpoint)
+            if not wait:
+                return
+            if max_wait is not None and waited + wait > max_wait:
+                raise QuotaExhausted(
+                    f"Kite '{endpoint}' quota exhausted; next call allowed in {wait:.0f}s.")
+            time.sleep(wait)
+            waited += wait
+
+    def pause(self, endpoint, seconds):
+        """Holds back every process's calls of `endpoint` for `seconds`, e.g. after a 429."""
+        until = time.time() + seconds
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO pauses (endpoint, until) VALUES (?, ?) "
+                "ON CONFLICT(endpoint) DO UPDATE SET until = MAX(until, excluded.until)",
+                (endpoint, until))
+
+    def remaining_today(self, endpoint):
+        """Calls of `endpoint` left in today's budget, or None if the class has no daily limit."""
+        per_day = self.budgets.get(endpoint, self.budgets[DEFAULT])[2]
+        if per_day is None:
+            return None
+        return max(0, per_day - self.usage(endpoint)[2])
+
+    def usage(self, endpoint):
+        """Calls of `endpoint` booked in the last second, the last minute and today."""
+        now = time.time()
+        with self._lock:
+            return tuple(
+                self._conn.execute(
+                    "SELECT COUNT(*) FROM calls WHERE endpoint = ? AND at > ?",
+                    (endpoint, start)).fetchone()[0]
+                for start in (now - 1, now - 60, _day_start(now))
+            )
@@ -0,0 +1,83 @@
+import threading
+import time
+
+# Kite Connect allows 3 historical-data requests per second per API key.
+KITE_HISTORICAL_RATE = 3
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket shared by every fetcher of a download session.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. Callers
+    block in `acquire` until a token is available, so the combined request
+    rate of all fetchers never exceeds the configured budget. The default
+    capacity of one token paces calls evenly; a larger capacity allows bursts,
+    which can put more than `rate` calls inside a single one-second window.
+    """
+
+    def __init__(self, rate=KITE_HISTORICAL_RATE, capacity=1):
+        if rate <= 0:
+            raise ValueError("Rate must be positive.")
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._last_refill = now
+
+    def try_acquire(self, tokens=1):
+        """Takes `tokens` if available right now. Returns True on success."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens=1):
+        """Blocks until `tokens` are available, then takes them."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    """
+    A TokenBucket whose rate follows the server's responses (AIMD).
+
+    Each throttled call halves the rate, down to `min_rate`; each successful
+    call adds back a small step, up to the configured `max_rate`. After a burst
+    of 429s the session slows down at once and then climbs back to the full
+    budget over a few seconds of clean calls.
+    """
+
+    def __init__(self, rate=KITE_HISTORICAL_RATE, capacity=1, min_rate=0.25,
+                 recovery_step=0.1):
+        super().__init__(rate, capacity)
+        self.max_rate = self.rate
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.recovery_step = recovery_step
+
+    def on_throttle(self):
+        with self._lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+            # Drop any banked token so the next call waits a full new interval.
+            self._tokens = min(self._tokens, 0.0)
+
+    def on_success(self):
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill()
+                self.rate = min(self.max_rate, self.rate + self.recovery_step)
@@ -0,0 +1,26 @@
+import random
+
+from kiteconnect.exceptions import DataException, NetworkException
+from requests.exceptions import ConnectionError, Timeout
+
+# Failures worth another attempt: Kite's 429/5xx surface as NetworkException,
+# malformed gateway responses as DataException, and dropped sockets as
+# requests errors. Token, input and permission errors will not go away.
+RETRYABLE_EXCEPTIONS = (NetworkException, DataException, ConnectionError, Timeout)
+DEFAULT_MAX_RETRIES = 5
+BASE_DELAY = 0.5
+MAX_DELAY = 30.0
+
+
+def is_retryable(exc):
+    return isinstance(exc, RETRYABLE_EXCEPTIONS)
+
+
+def is_throttle(exc):
+    """True for Kite's 'Too many requests' (HTTP 429)."""
+    return isinstance(exc, NetworkException) and getattr(exc, "code", None) == 429
+
+
+def backoff_delay(attempt, base=BASE_DELAY, cap=MAX_DELAY, rng=random):
+    """Exponential backoff with full jitter: uniform in [0, min(cap, base * 2**attempt)]."""
+    return rng.uniform(0, min(cap, base * (2 ** attempt)))
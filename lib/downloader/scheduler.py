@@ -0,0 +1,165 @@
+"""
+Orders a download queue so the most valuable data lands first.
+
+Each symbol's weight comes from its index membership (the `Indices` column of
+source_data/master_catalog_enriched.csv): the weight of the most important
+index it belongs to. Its cost is the number of historical calls still needed,
+after the days already on disk are taken out and the remaining gaps are
+packed into as few 60-day windows as possible. Symbols are ordered by
+weight tier, and within a tier by missing bars per call, so a NIFTY 50 name
+with a small gap always comes before a small-cap with a large one even
+though the small-cap would fill more bars per call. When the quota left for
+the day is known (a daily budget set with the job's `daily_calls`), the
+symbols that fit it, picked greedily in that order, go first, so a run cut
+short by the quota has completed the high-priority names rather than
+whatever came first in the UI.
+"""
+from datetime import timedelta
+
+import pandas as pd
+
+from lib.datastore.coverage import missing_sessions
+from lib.datastore.trading_calendar import slots_per_day, trading_days
+from lib.downloader import incremental
+
+# Kite caps minute-level historical requests at 60 days per call.
+CHUNK_DAYS = 60
+
+MASTER_CATALOG_PATH = "source_data/master_catalog_enriched.csv"
+
+# Relative value of a symbol by the most important index it belongs to.
+INDEX_WEIGHTS = {
+    "NIFTY 50": 100,
+    "NIFTY NEXT 50": 60,
+    "NIFTY 100": 50,
+    "NIFTY MIDCAP 150": 30,
+    "NIFTY 200": 25,
+    "NIFTY SMALLCAP 250": 10,
+    "NIFTY 500": 5,
+}
+# Weight of symbols in no weighted index (sectoral indices only, or unlisted).
+DEFAULT_WEIGHT = 1
+# Stored size of one bar in the default Parquet/zstd store, for estimates.
+BYTES_PER_BAR = 18
+
+
+def chunk_windows(from_date, to_date, days=CHUNK_DAYS):
+    """Splits [from_date, to_date] into consecutive inclusive windows of at most `days` days."""
+    windows = []
+    while from_date <= to_date:
+        chunk_to_date = min(from_date + timedelta(days=days - 1), to_date)
+        windows.append((from_date, chunk_to_date))
+        from_date = chunk_to_date + timedelta(days=1)
+    return windows
+
+
+def pack_windows(gaps, days=CHUNK_DAYS):
+    """
+    Covers the sorted, disjoint `gaps` with as few fetch windows of at most
+    `days` days as possible. Gaps close together share one window and one
+    call; the days between them are refetched, which costs nothing extra.
+    """
+    windows = []
+    for gap_start, gap_end in gaps:
+        if windows and gap_end - windows[-1][0] < timedelta(days=days):
+            windows[-1] = (windows[-1][0], gap_end)
+            continue
+        windows += chunk_windows(gap_start, gap_end, days)
+    return windows
+
+
+def load_index_membership(path=MASTER_CATALOG_PATH):
+    """Returns {symbol: [index names]} from the enriched master catalog."""
+    master = pd.read_csv(path, usecols=["Symbol", "Indices"])
+    return {
+        symbol: [name.strip() for name in indices.split(",")] if isinstance(indices, str) else []
+        for symbol, indices in zip(master["Symbol"], master["Indices"])
+    }
+
+
+def symbol_weight(indices, weights=INDEX_WEIGHTS):
+    return max((weights.get(name, DEFAULT_WEIGHT) for name in indices), default=DEFAULT_WEIGHT)
+
+
+def plan_gaps(catalog, symbol, interval, start_date, end_date):
+    """
+    What an update of `symbol` has to fetch: returns (touching, covered, gaps)
+    with the catalog entries overlapping or adjoining [start_date, end_date],
+    their merged date ranges, and the date ranges still to fetch, which include
+    sessions the coverage index shows as empty. Days an earlier update already
+    fetched and found empty (DatasetCatalog.mark_empty) are left out.
+    """
+    # Only entries overlapping or adjoining the requested range are merged,
+    # so the merged file always covers one contiguous span.
+    touching = [
+        item for item in catalog.entries(symbol, interval)
+        if item["start_date"] <= (end_date + timedelta(days=1)).strftime(incremental.DATE_FORMAT)
+        and item["end_date"] >= (start_date - timedelta(days=1)).strftime(incremental.DATE_FORMAT)
+    ]
+    covered = incremental.covered_ranges(touching)
+    gaps = incremental.missing_ranges(covered, start_date, end_date)
+    empty_sessions = missing_sessions(catalog, symbol, interval, start_date, end_date)
+    gaps = incremental.merge_ranges(gaps + [(day, day) for day in empty_sessions])
+    checked = catalog.empty_days(symbol, interval, start_date, end_date)
+    return touching, covered, incremental.exclude_days(gaps, checked)
+
+
+def plan_symbol(symbol, weight, gaps, interval):
+    """Cost and value of fetching `gaps` for one symbol."""
+    sessions = sum(len(trading_days(gap_start, gap_end)) for gap_start, gap_end in gaps)
+    bars = sessions * slots_per_day(interval)
+    return {
+        "symbol": symbol,
+        "weight": weight,
+        "calls": len(pack_windows(gaps)),
+        "missing_bars": bars,
+        "missing_bytes": bars * BYTES_PER_BAR,
+    }
+
+
+def plan_downloads(symbols, interval, start_date, end_date, catalog=None, membership=None,
+                   weights=INDEX_WEIGHTS):
+    """
+    Plans every symbol of a job. With a catalog (update mode) only the data
+    not on disk counts, and each plan keeps the `plan_gaps` result under
+    "update" for the fetch itself; without one the whole range does.
+    """
+    membership = membership or {}
+    plans = []
+    for symbol in symbols:
+        update = None
+        if catalog is not None:
+            update = plan_gaps(catalog, symbol, interval, start_date, end_date)
+            gaps = update[2]
+        else:
+            gaps = [(start_date, end_date)]
+        weight = symbol_weight(membership.get(symbol, []), weights)
+        plan = plan_symbol(symbol, weight, gaps, interval)
+        if update is not None:
+            plan["update"] = update
+        plans.append(plan)
+    return plans
+
+
+def _density(plan):
+    return plan["missing_bars"] / max(plan["calls"], 1)
+
+
+def schedule(plans, call_budget=None):
+    """
+    Orders `plans` by weight, highest first, and by missing bars per call
+    within a weight. With a `call_budget`, the plans that fit it are chosen
+    greedily in that order and placed ahead of the rest. Returns (ordered
+    symbols, count in budget).
+    """
+    ranked = sorted(plans, key=lambda plan: (-plan["weight"], -_density(plan), plan["symbol"]))
+    if call_budget is None:
+        return [plan["symbol"] for plan in ranked], len(ranked)
+    chosen, deferred, left = [], [], call_budget
+    for plan in ranked:
+        if plan["calls"] <= left:
+            chosen.append(plan)
+            left -= plan["calls"]
+        else:
+            deferred.append(plan)
+    return [plan["symbol"] for plan in chosen + deferred], len(chosen)
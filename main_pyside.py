@@ -3,6 +3,7 @@ from PySide6.QtWidgets import QApplication, QMainWindow, QStackedWidget
 from ui_pyside6.main_screen import MainScreen
 from ui_pyside6.session_manager import SessionManager
 from api.kite.client import kite_api
+from lib.downloader.quota import QuotaAccountant
 from ui_pyside6.user_screen import UserScreen
 from ui_pyside6.widgets.tooltip_system import TooltipManager, TooltipEventFilter
 
@@ -12,6 +13,8 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.setWindowTitle("Svaha - PySide6")
 
+        # Dashboard calls share the downloaders' machine-wide Kite quota.
+        kite_api.set_quota(QuotaAccountant())
         self.session_manager = SessionManager(kite_api=kite_api)
 
         self.stacked_widget = QStackedWidget()
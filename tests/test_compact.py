@@ -0,0 +1,69 @@
+"""Lossless round trips through the compact integer-tick bar encoding."""
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lib.datastore.bar_store import COMPACT_STORE_DIRNAME, read_bar_file, write_bars
+from lib.datastore.compact import encode_prices, from_compact_frame, to_compact_frame
+
+
+def make_bars(periods, tick_size, seed=0):
+    """Minute bars whose prices lie on the `tick_size` grid, as Kite returns them."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2024-01-01 09:15", periods=periods, freq="min", tz="Asia/Kolkata")
+    ticks = 20000 + np.cumsum(rng.integers(-3, 4, periods))
+    close = np.round(ticks * tick_size, 4)
+    return pd.DataFrame({
+        "date": dates,
+        "open": np.round((ticks + 1) * tick_size, 4),
+        "high": np.round((ticks + 4) * tick_size, 4),
+        "low": np.round((ticks - 4) * tick_size, 4),
+        "close": close,
+        "volume": rng.integers(0, 1_000_000, periods),
+    })
+
+
+@pytest.mark.parametrize("tick_size", [0.05, 0.01, 0.1])
+def test_compact_frame_round_trip_is_exact(tick_size):
+    df = make_bars(500, tick_size)
+    compact = to_compact_frame(df, tick_size)
+
+    assert compact.attrs["tick_size"] == tick_size
+    assert {str(dtype) for dtype in compact.dtypes} <= {"int32", "uint64"}
+    pd.testing.assert_frame_equal(from_compact_frame(compact), df, check_dtype=False)
+
+
+def test_volume_above_uint32_round_trips(tmp_path):
+    """Index and liquid-stock daily volumes run past 2**32."""
+    df = make_bars(3, 0.05)
+    df["volume"] = [2**32 + 5, 12_000_000_000, 0]
+
+    assert from_compact_frame(to_compact_frame(df, 0.05))["volume"].tolist() == df["volume"].tolist()
+    entries = write_bars(str(tmp_path), "S0", "day", df, date(2024, 1, 1), date(2024, 1, 1),
+                         compact=True, tick_size=0.05)
+    stored = read_bar_file(os.path.join(str(tmp_path), entries[0]["parquet_filename"]))
+    assert stored["volume"].tolist() == df["volume"].tolist()
+
+
+def test_prices_off_the_listed_tick_fall_back_to_paisa():
+    """History from before a tick change is stored on the paisa grid."""
+    prices = np.array([[101.01, 101.02, 100.99, 101.0]])
+    ticks, tick_used = encode_prices(prices, 0.05)
+
+    assert tick_used == 0.01
+    assert ticks.tolist() == [[10101, 10102, 10099, 10100]]
+    with pytest.raises(ValueError):
+        encode_prices(np.array([[101.005, 101.0, 101.0, 101.0]]), 0.05)
+
+
+def test_compact_store_files_read_back_exactly(tmp_path):
+    df = make_bars(2000, 0.05, seed=1)
+    entries = write_bars(str(tmp_path), "S0", "minute", df, date(2024, 1, 1), date(2024, 1, 2),
+                         compact=True, tick_size=0.05)
+
+    assert [entry["parquet_filename"].split(os.sep)[0] for entry in entries] == [COMPACT_STORE_DIRNAME]
+    stored = read_bar_file(os.path.join(str(tmp_path), entries[0]["parquet_filename"]))
+    pd.testing.assert_frame_equal(stored, df, check_dtype=False)
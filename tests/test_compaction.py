@@ -0,0 +1,71 @@
+"""Compaction of many small and overlapping files into one file per year."""
+import os
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from lib.datastore.bar_store import write_bars
+from lib.datastore.catalog import open_catalog
+from lib.datastore.compaction import compact_series, plan_compaction
+from lib.downloader.incremental import load_entries
+
+
+def day_bars(day, close):
+    dates = pd.date_range(f"{day} 09:15", periods=375, freq="min", tz="Asia/Kolkata")
+    prices = np.full(375, float(close))
+    return pd.DataFrame({"date": dates, "open": prices, "high": prices + 1, "low": prices - 1,
+                         "close": prices, "volume": np.arange(375, dtype=np.int64)})
+
+
+def store_days(data_dir, catalog, days, close):
+    for day in days:
+        catalog.add(write_bars(data_dir, "S0", "minute", day_bars(day, close), day, day))
+
+
+def test_compaction_merges_daily_files_and_keeps_later_rows(tmp_path):
+    data_dir = str(tmp_path)
+    days = [date(2024, 1, 1) + timedelta(days=i) for i in range(10)]
+    with open_catalog(data_dir) as catalog:
+        store_days(data_dir, catalog, days, close=100)
+        # A later download of three of the days with different prices.
+        store_days(data_dir, catalog, days[3:6], close=200)
+        old_files = [entry["parquet_filename"] for entry in catalog.entries("S0", "minute")]
+
+        report = compact_series(data_dir, "S0", "minute", catalog)
+        entries = catalog.entries("S0", "minute")
+
+    assert report["blocks"] == 1
+    assert (report["files_before"], report["files_after"]) == (13, 1)
+    assert report["rows_before"] - report["rows_after"] == 3 * 375
+    assert [(entry["start_date"], entry["end_date"]) for entry in entries] == [("2024-01-01", "2024-01-10")]
+    assert not any(os.path.exists(os.path.join(data_dir, path)) for path in old_files)
+
+    bars = load_entries(data_dir, entries)
+    assert len(bars) == 10 * 375
+    closes = bars.groupby(bars["date"].dt.date)["close"].first()
+    assert closes.tolist() == [100] * 3 + [200] * 3 + [100] * 4
+
+
+def test_csv_copies_survive_compaction(tmp_path):
+    data_dir = str(tmp_path)
+    days = [date(2024, 1, 1), date(2024, 1, 2)]
+    with open_catalog(data_dir) as catalog:
+        store_days(data_dir, catalog, days[:1], close=100)
+        catalog.add(write_bars(data_dir, "S0", "minute", day_bars(days[1], 100), days[1], days[1],
+                               save_csv=True))
+        compact_series(data_dir, "S0", "minute", catalog)
+        [entry] = catalog.entries("S0", "minute")
+
+    csv = pd.read_csv(os.path.join(data_dir, entry["csv_filename"]))
+    assert len(csv) == 2 * 375
+
+
+def test_series_with_one_file_per_year_is_left_alone(tmp_path):
+    data_dir = str(tmp_path)
+    bars = pd.concat([day_bars(date(2023, 12, 29), 100), day_bars(date(2024, 1, 1), 100)])
+    with open_catalog(data_dir) as catalog:
+        catalog.add(write_bars(data_dir, "S0", "minute", bars, date(2023, 12, 29), date(2024, 1, 1)))
+        assert plan_compaction(catalog.entries("S0", "minute")) == []
+        report = compact_series(data_dir, "S0", "minute", catalog)
+    assert report["blocks"] == 0
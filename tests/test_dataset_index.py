@@ -0,0 +1,53 @@
+"""Stored date spans per symbol and interval."""
+from datetime import date
+
+from lib.datastore.catalog import open_catalog
+from lib.datastore.dataset_index import DatasetIndex
+
+SPANS = [
+    ("INFY", "minute", "2024-01-01", "2024-03-31"),
+    ("INFY", "day", "2020-01-01", "2024-06-30"),
+    ("TCS", "minute", "2024-02-01", "2024-05-31"),
+    ("ABB", "day", "2023-01-01", "2023-12-31"),
+]
+
+
+def test_queries_per_interval_and_across_intervals():
+    index = DatasetIndex(SPANS)
+
+    assert len(index) == 3
+    assert index.intervals() == ["day", "minute"]
+    assert index.symbols("minute") == ["INFY", "TCS"]
+    assert index.available(["TCS", "ABB", "XYZ"], "minute").tolist() == [True, False, False]
+    assert index.available(["TCS", "ABB", "XYZ"]).tolist() == [True, True, False]
+
+    first, last = index.spans(["INFY", "XYZ"])
+    assert (date.fromordinal(int(first[0])), date.fromordinal(int(last[0]))) == (
+        date(2020, 1, 1), date(2024, 6, 30))
+    assert (first[1], last[1]) == (-1, -1)
+
+
+def test_intersection_is_the_days_every_symbol_spans():
+    index = DatasetIndex(SPANS)
+
+    assert index.intersection(["INFY", "TCS"], "minute") == (date(2024, 2, 1), date(2024, 3, 31))
+    # Symbols without data are left out; no symbol with data gives no span.
+    assert index.intersection(["INFY", "ABB"], "minute") == (date(2024, 1, 1), date(2024, 3, 31))
+    assert index.intersection(["XYZ"], "minute") == (None, None)
+    assert index.intersection(["ABB"], "weekly") == (None, None)
+    assert DatasetIndex().intersection(["INFY"]) == (None, None)
+
+
+def test_index_is_built_from_the_catalog_entries(tmp_path):
+    entries = [
+        {"file_id": f"f{i}", "symbol": symbol, "interval": interval,
+         "start_date": start, "end_date": end}
+        for i, (symbol, interval, start, end) in enumerate(
+            SPANS + [("INFY", "minute", "2024-04-01", "2024-04-30")])
+    ]
+    with open_catalog(str(tmp_path)) as catalog:
+        catalog.add(entries)
+        index = DatasetIndex.from_catalog(catalog)
+
+    assert index.intersection(["INFY"], "minute") == (date(2024, 1, 1), date(2024, 4, 30))
+    assert index.symbols() == ["ABB", "INFY", "TCS"]
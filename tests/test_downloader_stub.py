@@ -0,0 +1,262 @@
+"""
+Regression tests of the downloader and the bar store, run offline against
+StubKite (lib.downloader.kite_stub) in a temporary directory.
+"""
+import json
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lib.datastore.bar_cache import BarCache
+from lib.datastore.catalog import open_catalog
+from lib.datastore.coverage import coverage_summary, missing_sessions
+from lib.datastore.reader import count_bars, load_bars
+from lib.downloader import download_worker
+from lib.downloader.download_worker import DownloadWorker
+from lib.downloader.headless import HeadlessScreen
+from lib.downloader.journal import COMPLETED, PENDING, DownloadJournal, journal_path_for
+from lib.downloader.kite_stub import SESSION_MINUTES, StubKite
+
+SYMBOLS = ["S0", "S1", "S2", "S3"]
+
+
+@pytest.fixture(autouse=True)
+def in_tmp_path(tmp_path, monkeypatch):
+    """The worker writes its session log under ./logs."""
+    monkeypatch.chdir(tmp_path)
+
+
+def job_params(output_dir, symbols, start_date, end_date, **overrides):
+    return {
+        "resume_mode": False,
+        "symbols": symbols,
+        "start_date": start_date,
+        "end_date": end_date,
+        "interval": "minute",
+        "output_dir": str(output_dir),
+        "save_csv": False,
+        "save_parquet": True,
+        "sharding": "Partitioned",
+        "writer_processes": 0,
+        "instruments_dir": str(output_dir),
+        "quota_path": None,
+        **overrides,
+    }
+
+
+def run_worker(params, kite):
+    worker = DownloadWorker(params, HeadlessScreen(), kite)
+    worker.run()
+    return worker
+
+
+def weekdays(start_date, end_date):
+    return int(np.busday_count(start_date, np.datetime64(end_date) + 1))
+
+
+def stored_bars(output_dir, symbols, interval="minute"):
+    return load_bars(symbols, interval, data_dir=str(output_dir), cache=None)
+
+
+def test_throttling_and_errors_are_absorbed(tmp_path, monkeypatch):
+    """Every symbol completes although the stub throttles and fails calls."""
+    monkeypatch.setattr(download_worker, "backoff_delay", lambda attempt: 0.01)
+    kite = StubKite(SYMBOLS, error_rate=0.3, rate_limit=2, seed=7)
+    worker = run_worker(
+        job_params(tmp_path, SYMBOLS, date(2024, 1, 1), date(2024, 3, 31),
+                   concurrency=4, chunk_concurrency=2, requests_per_second=20, max_retries=20),
+        kite,
+    )
+
+    assert sorted(worker.journal.symbols_in(COMPLETED)) == SYMBOLS
+    assert kite.throttled > 0 and kite.errors > 0
+    bars = stored_bars(tmp_path, SYMBOLS)
+    expected = weekdays(date(2024, 1, 1), date(2024, 3, 31)) * SESSION_MINUTES
+    assert bars.groupby("symbol", observed=True).size().to_dict() == dict.fromkeys(SYMBOLS, expected)
+
+
+def test_symbol_that_cannot_be_recorded_leaves_no_files(tmp_path, monkeypatch):
+    """A failure after the files are written fails the symbol and removes its files."""
+    record_quality = DownloadWorker.record_quality
+
+    def failing(worker, symbol, report):
+        if symbol == "S1":
+            raise OSError("disk full")
+        record_quality(worker, symbol, report)
+
+    monkeypatch.setattr(DownloadWorker, "record_quality", failing)
+    symbols = SYMBOLS[:2]
+    worker = run_worker(job_params(tmp_path, symbols, date(2024, 1, 1), date(2024, 1, 31)), StubKite(symbols))
+
+    assert worker.journal.symbols_in(COMPLETED) == ["S0"]
+    with open_catalog(str(tmp_path)) as catalog:
+        assert catalog.symbols() == ["S0"]
+        stored = {entry["parquet_filename"] for entry in catalog.entries()}
+    written = {path.relative_to(tmp_path).as_posix() for path in tmp_path.rglob("*.parquet")}
+    assert written == stored
+
+
+def test_resume_fetches_only_unfinished_symbols(tmp_path):
+    """A resumed job skips completed symbols, survives a torn journal line and keeps its settings."""
+    start_date, end_date = date(2024, 1, 1), date(2024, 1, 31)
+    first = run_worker(job_params(tmp_path, SYMBOLS[:1], start_date, end_date), StubKite(SYMBOLS))
+    manifest_path = first.journal.manifest_path
+
+    # The state of a run interrupted after its first symbol.
+    journal = DownloadJournal.create(
+        manifest_path, job_params(tmp_path, SYMBOLS, start_date, end_date), SYMBOLS)
+    journal.record(SYMBOLS[0], COMPLETED)
+    journal.close()
+    with open(journal_path_for(manifest_path), "a") as f:
+        f.write(json.dumps({"symbol": SYMBOLS[1], "state": COMPLETED})[:20])
+
+    kite = StubKite(SYMBOLS)
+    resumed = run_worker({"resume_mode": True, "manifest_path": manifest_path}, kite)
+
+    assert sorted(resumed.journal.symbols_in(COMPLETED)) == SYMBOLS
+    assert resumed.params["sharding"] == "Partitioned"
+    # One 60-day chunk for each of the three unfinished symbols.
+    assert kite.calls == 3
+    expected = weekdays(start_date, end_date) * SESSION_MINUTES
+    counts = stored_bars(tmp_path, SYMBOLS).groupby("symbol", observed=True).size()
+    assert counts.to_dict() == dict.fromkeys(SYMBOLS, expected)
+
+
+def test_symbols_over_the_daily_budget_stay_pending_for_a_resume(tmp_path):
+    """A job cut short by its daily call budget finishes on a resume the next day."""
+    start_date, end_date = date(2024, 1, 1), date(2024, 1, 31)
+    params = job_params(tmp_path, SYMBOLS, start_date, end_date, prioritize=False,
+                        quota_path=str(tmp_path / "quota.sqlite3"), daily_calls=3)
+    kite = StubKite(SYMBOLS)
+    first = run_worker(params, kite)
+    assert kite.calls == 3
+    assert first.journal.symbols_in(PENDING) == ["S3"]
+    manifest_path = first.journal.manifest_path
+
+    # Today's budget is spent: nothing is fetched and S3 is still pending.
+    kite = StubKite(SYMBOLS)
+    again = run_worker({"resume_mode": True, "manifest_path": manifest_path,
+                        "quota_path": params["quota_path"]}, kite)
+    assert kite.calls == 0
+    assert again.params["daily_calls"] == 3
+    assert again.journal.symbols_in(PENDING) == ["S3"]
+
+    # A fresh quota file stands in for the next day.
+    kite = StubKite(SYMBOLS)
+    resumed = run_worker({"resume_mode": True, "manifest_path": manifest_path,
+                          "quota_path": str(tmp_path / "next_day.sqlite3")}, kite)
+    assert kite.calls == 1
+    assert sorted(resumed.journal.symbols_in(COMPLETED)) == SYMBOLS
+    counts = stored_bars(tmp_path, SYMBOLS).groupby("symbol", observed=True).size()
+    assert counts.to_dict() == dict.fromkeys(SYMBOLS, weekdays(start_date, end_date) * SESSION_MINUTES)
+
+
+def test_update_fills_gaps_without_duplicates(tmp_path):
+    """An update fetches only missing days, merges them once, and then has nothing left to fetch."""
+    symbols = SYMBOLS[:2]
+    run_worker(job_params(tmp_path, symbols, date(2024, 1, 1), date(2024, 1, 15)), StubKite(symbols))
+
+    update = job_params(tmp_path, symbols, date(2024, 1, 1), date(2024, 1, 31), update_mode=True)
+    kite = StubKite(symbols)
+    worker = run_worker(update, kite)
+    assert sorted(worker.journal.symbols_in(COMPLETED)) == symbols
+    assert kite.calls == len(symbols)
+
+    bars = stored_bars(tmp_path, symbols)
+    assert not bars.duplicated(["symbol", "date"]).any()
+    expected = weekdays(date(2024, 1, 1), date(2024, 1, 31)) * SESSION_MINUTES
+    assert bars.groupby("symbol", observed=True).size().to_dict() == dict.fromkeys(symbols, expected)
+    token = StubKite(symbols).instruments()[0]["instrument_token"]
+    reference = StubKite(symbols).historical_data(token, date(2024, 1, 1), date(2024, 1, 31), "minute")
+    assert np.allclose(bars[bars["symbol"] == "S0"]["close"], [bar["close"] for bar in reference])
+
+    # The special session the calendar expects on Saturday 2024-01-20 has no
+    # bars; it was fetched once and is not fetched again.
+    kite = StubKite(symbols)
+    run_worker(update, kite)
+    assert kite.calls == 0
+
+
+@pytest.mark.parametrize("interval, rule", [("5minute", "5min"), ("60minute", "60min"), ("day", "D")])
+def test_pyramid_matches_pandas_resample(tmp_path, interval, rule):
+    """Derived intervals equal a pandas resample of the minute bars anchored at the session open."""
+    run_worker(
+        job_params(tmp_path, ["S0"], date(2024, 1, 1), date(2024, 1, 31), derive_intervals=True),
+        StubKite(["S0"]),
+    )
+    minute = stored_bars(tmp_path, ["S0"]).drop(columns="symbol").set_index("date")
+    # Intraday buckets start at the 09:15 open; day bars at midnight.
+    anchor = {} if rule == "D" else {"origin": "start_day", "offset": "9h15min"}
+    expected = (
+        minute.resample(rule, **anchor)
+        .agg({"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"})
+        .dropna(subset=["open"])
+        .reset_index()
+    )
+    derived = stored_bars(tmp_path, ["S0"], interval).drop(columns="symbol")
+
+    pd.testing.assert_frame_equal(derived, expected[derived.columns], check_dtype=False)
+
+
+def test_load_bars_pushdown_and_cache_staleness(tmp_path):
+    """Range and column reads match a filtered full read; the cache drops series whose files changed."""
+    symbols = SYMBOLS[:2]
+    run_worker(job_params(tmp_path, symbols, date(2024, 1, 1), date(2024, 3, 31)), StubKite(symbols))
+    data_dir = str(tmp_path)
+
+    full = stored_bars(tmp_path, symbols)
+    narrow = load_bars(symbols, "minute", "2024-02-05", "2024-02-09", columns=["close"],
+                       data_dir=data_dir, cache=None)
+    days = full["date"].dt.strftime("%Y-%m-%d")
+    expected = full[(days >= "2024-02-05") & (days <= "2024-02-09")][["symbol", "date", "close"]]
+    pd.testing.assert_frame_equal(narrow, expected.reset_index(drop=True))
+
+    cache = BarCache()
+    cached = load_bars(symbols, "minute", data_dir=data_dir, cache=cache)
+    pd.testing.assert_frame_equal(cached, full)
+    sliced = load_bars(symbols, "minute", "2024-02-05", "2024-02-09", columns=["close"],
+                       data_dir=data_dir, cache=cache)
+    pd.testing.assert_frame_equal(sliced, narrow)
+    assert cache.stats()["hits"] == 2
+
+    # A file dropped without a replacement must not be served from the cache.
+    with open_catalog(data_dir) as catalog:
+        catalog.remove([entry["file_id"] for entry in catalog.entries("S1", "minute")])
+    after = load_bars(symbols, "minute", data_dir=data_dir, cache=cache)
+    assert after["symbol"].unique().tolist() == ["S0"]
+    assert cache.stats()["entries"] == 1
+
+
+def test_count_bars_reads_no_bars(tmp_path):
+    """Counts come from the coverage index, or from the Parquet footer of unindexed files."""
+    symbols = SYMBOLS[:2]
+    run_worker(job_params(tmp_path, symbols, date(2024, 1, 1), date(2024, 3, 31)), StubKite(symbols))
+    data_dir = str(tmp_path)
+
+    counts = count_bars(symbols, "minute", "2024-02-05", "2024-02-09", data_dir=data_dir)
+    assert counts == dict.fromkeys(symbols, 5 * SESSION_MINUTES)
+    full = stored_bars(tmp_path, symbols).groupby("symbol", observed=True).size().to_dict()
+    assert count_bars(symbols, "minute", data_dir=data_dir) == full
+
+    # A file stored before the coverage index existed.
+    legacy = stored_bars(tmp_path, ["S0"]).drop(columns="symbol").head(100)
+    legacy.to_parquet(tmp_path / "legacy.parquet", index=False)
+    with open_catalog(data_dir) as catalog:
+        catalog.add([{"file_id": "legacy", "symbol": "S9", "interval": "minute",
+                      "start_date": "2024-01-01", "end_date": "2024-01-01",
+                      "parquet_filename": "legacy.parquet"}])
+    assert count_bars(["S9", "S1"], "minute", date(2024, 1, 1), date(2024, 1, 1), data_dir=data_dir) == {
+        "S9": 100, "S1": SESSION_MINUTES}
+
+
+def test_days_before_the_holiday_table_are_not_judged(tmp_path):
+    """Without a holiday list for 2022 its weekdays are neither sessions nor gaps."""
+    run_worker(job_params(tmp_path, ["S0"], date(2022, 12, 26), date(2023, 1, 6)), StubKite(["S0"]))
+
+    with open_catalog(str(tmp_path)) as catalog:
+        assert missing_sessions(catalog, "S0", "minute", date(2022, 1, 1), date(2023, 1, 6)) == []
+        summary = coverage_summary(catalog, ["S0"], "minute", date(2022, 1, 1), date(2023, 1, 6))
+    assert (summary["sessions"], summary["complete"], summary["unknown"]) == (5, 5, 0)
+    assert stored_bars(tmp_path, ["S0"])["date"].dt.year.value_counts()[2022] == 5 * SESSION_MINUTES
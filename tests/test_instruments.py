@@ -0,0 +1,57 @@
+"""The memory-mapped instrument master and its daily refresh."""
+import os
+
+import numpy as np
+import pandas as pd
+
+from lib.downloader.instruments import LEGACY_CSV_FILENAME, MASTER_FILENAME, InstrumentMaster
+
+ROWS = [
+    {"instrument_token": 3, "exchange_token": 30, "tradingsymbol": "TCS", "name": "TCS",
+     "segment": "NSE", "instrument_type": "EQ", "tick_size": 0.05, "lot_size": 1},
+    {"instrument_token": 1, "exchange_token": 10, "tradingsymbol": "ABB", "name": "ABB INDIA",
+     "segment": "NSE", "instrument_type": "EQ", "tick_size": 0.1, "lot_size": 1},
+    {"instrument_token": 2, "exchange_token": 20, "tradingsymbol": "INFY", "name": "INFOSYS",
+     "segment": "NSE", "instrument_type": "EQ", "tick_size": 0.0, "lot_size": 1},
+    {"instrument_token": 9, "exchange_token": 90, "tradingsymbol": "NIFTY 50", "name": "NIFTY 50",
+     "segment": "INDICES", "instrument_type": "INDEX", "tick_size": 0.0, "lot_size": 0},
+]
+FETCHED_AT = pd.Timestamp("2024-03-04 10:00", tz="Asia/Kolkata")
+
+
+def test_master_is_sorted_and_looks_symbols_up(tmp_path):
+    master = InstrumentMaster.save(str(tmp_path), ROWS, FETCHED_AT)
+
+    assert len(master) == 3
+    assert isinstance(master.records, np.memmap)
+    assert master.find(["TCS", "ABB", "MISSING", "INFYX", "INF"]).tolist() == [2, 0, -1, -1, -1]
+    assert master.token("INFY") == 2
+    assert master.token("NIFTY 50") is None
+    assert master.tick_size("TCS") == 0.05
+    assert master.tick_size("INFY") is None
+    assert master.tick_sizes() == {"ABB": 0.1, "TCS": 0.05}
+
+    reopened = InstrumentMaster.open(str(tmp_path))
+    assert reopened.fetched_at == FETCHED_AT
+    assert reopened.token("ABB") == 1
+
+
+def test_master_goes_stale_after_the_next_publication(tmp_path):
+    master = InstrumentMaster.save(str(tmp_path), ROWS, FETCHED_AT)
+
+    assert not master.is_stale(pd.Timestamp("2024-03-05 08:00", tz="Asia/Kolkata"))
+    assert master.is_stale(pd.Timestamp("2024-03-05 09:00", tz="Asia/Kolkata"))
+    # Nothing is published on the weekend.
+    friday = InstrumentMaster.save(str(tmp_path), ROWS, pd.Timestamp("2024-03-15 12:00", tz="Asia/Kolkata"))
+    assert not friday.is_stale(pd.Timestamp("2024-03-17 20:00", tz="Asia/Kolkata"))
+
+
+def test_missing_master_is_imported_from_the_legacy_csv(tmp_path):
+    directory = str(tmp_path)
+    assert InstrumentMaster.open(directory) is None
+
+    pd.DataFrame(ROWS).to_csv(os.path.join(directory, LEGACY_CSV_FILENAME), index=False)
+    master = InstrumentMaster.open(directory)
+
+    assert os.path.exists(os.path.join(directory, MASTER_FILENAME))
+    assert master.token("TCS") == 3
@@ -0,0 +1,68 @@
+"""Migration of flat UUID files into the partitioned bar store."""
+import os
+
+import numpy as np
+import pandas as pd
+
+from lib.datastore.bar_store import PARTITIONED
+from lib.datastore.catalog import open_catalog
+from lib.datastore.migrate import migrate
+from lib.downloader.incremental import load_entries
+
+
+def make_bars(start, periods):
+    dates = pd.date_range(start, periods=periods, freq="D", tz="Asia/Kolkata")
+    close = 100 + np.arange(periods, dtype=float)
+    return pd.DataFrame({
+        "date": dates,
+        "open": close,
+        "high": close + 1,
+        "low": close - 1,
+        "close": close,
+        "volume": np.arange(periods, dtype=np.int64) * 10,
+    })
+
+
+def legacy_entry(data_dir, file_id, df, as_csv):
+    entry = {
+        "file_id": file_id,
+        "base_filename": f"S0_day_{file_id}",
+        "symbol": "S0",
+        "interval": "day",
+        "start_date": df["date"].iloc[0].strftime("%Y-%m-%d"),
+        "end_date": df["date"].iloc[-1].strftime("%Y-%m-%d"),
+        "sharding": "None",
+    }
+    if as_csv:
+        entry["csv_filename"] = f"{file_id}.csv"
+        df.to_csv(os.path.join(data_dir, entry["csv_filename"]), index=False)
+    else:
+        entry["parquet_filename"] = f"{file_id}.parquet"
+        df.to_parquet(os.path.join(data_dir, entry["parquet_filename"]), index=False)
+    return entry
+
+
+def test_migrate_rewrites_legacy_files_per_year(tmp_path):
+    """Overlapping CSV and Parquet files become one deduplicated partition per year."""
+    data_dir = str(tmp_path)
+    first, second = make_bars("2023-12-01", 40), make_bars("2023-12-21", 30)
+    entries = [
+        legacy_entry(data_dir, "a" * 8, first, as_csv=True),
+        legacy_entry(data_dir, "b" * 8, second, as_csv=False),
+    ]
+    with open_catalog(data_dir) as catalog:
+        catalog.add(entries)
+
+    groups, written = migrate(data_dir, workers=1, delete_legacy=True)
+
+    assert (groups, written) == (1, 2)
+    with open_catalog(data_dir) as catalog:
+        migrated = catalog.entries("S0", "day")
+    assert [entry["sharding"] for entry in migrated] == [PARTITIONED] * 2
+    assert [(entry["start_date"], entry["end_date"]) for entry in migrated] == [
+        ("2023-12-01", "2023-12-31"), ("2024-01-01", "2024-01-19")]
+    assert not any(name.endswith((".csv", ".parquet")) for name in os.listdir(data_dir))
+
+    expected = pd.concat([first, second]).drop_duplicates(subset="date", keep="last")
+    stored = load_entries(data_dir, migrated).sort_values("date", ignore_index=True)
+    pd.testing.assert_frame_equal(stored, expected.reset_index(drop=True), check_dtype=False)
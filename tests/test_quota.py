@@ -0,0 +1,46 @@
+"""Machine-wide booking of Kite API calls in the shared quota file."""
+import pytest
+
+from lib.downloader.quota import HISTORICAL, ORDER, QuotaAccountant, QuotaExhausted, with_daily_limit
+
+
+@pytest.fixture
+def quota_path(tmp_path):
+    return str(tmp_path / "quota.sqlite3")
+
+
+def test_per_second_budget_is_shared_between_accountants(quota_path):
+    """Two accountants on one file (two processes) draw on the same budget."""
+    with QuotaAccountant(quota_path) as first, QuotaAccountant(quota_path) as second:
+        assert [first.try_acquire(HISTORICAL) for _ in range(2)] == [0, 0]
+        assert second.try_acquire(HISTORICAL) == 0
+        wait = second.try_acquire(HISTORICAL)
+        assert 0 < wait <= 1
+        assert first.usage(HISTORICAL)[0] == 3
+
+
+def test_daily_budget_raises_once_spent(quota_path):
+    with QuotaAccountant(quota_path, budgets={HISTORICAL: (None, None, 2)}) as quota:
+        quota.acquire(HISTORICAL, max_wait=0)
+        quota.acquire(HISTORICAL, max_wait=0)
+        with pytest.raises(QuotaExhausted):
+            quota.acquire(HISTORICAL, max_wait=60)
+        assert quota.usage(HISTORICAL)[2] == 2
+
+
+def test_pause_holds_back_every_process(quota_path):
+    with QuotaAccountant(quota_path) as first, QuotaAccountant(quota_path) as second:
+        first.pause(ORDER, 5)
+        assert 4 < second.try_acquire(ORDER) <= 5
+        # Other endpoint classes are not affected.
+        assert second.try_acquire(HISTORICAL) == 0
+
+
+def test_daily_limit_override_keeps_the_rate_limits(quota_path):
+    budgets = with_daily_limit(HISTORICAL, 2)
+    assert budgets == {HISTORICAL: (3, None, 2)}
+    with QuotaAccountant(quota_path, budgets=budgets) as quota:
+        assert quota.remaining_today(HISTORICAL) == 2
+        quota.acquire(HISTORICAL)
+        assert quota.remaining_today(HISTORICAL) == 1
+        assert quota.remaining_today(ORDER) == 3000
@@ -0,0 +1,66 @@
+"""Download planning: fetch windows, symbol weights and queue order."""
+from datetime import date
+
+from lib.downloader.scheduler import (
+    DEFAULT_WEIGHT,
+    pack_windows,
+    plan_downloads,
+    plan_symbol,
+    schedule,
+    symbol_weight,
+)
+
+
+def test_nearby_gaps_share_one_window():
+    gaps = [(date(2024, 1, 2), date(2024, 1, 3)), (date(2024, 1, 20), date(2024, 1, 22)),
+            (date(2024, 2, 25), date(2024, 2, 27))]
+    assert pack_windows(gaps) == [(date(2024, 1, 2), date(2024, 2, 27))]
+    assert pack_windows([(date(2024, 1, 1), date(2024, 1, 2)), (date(2024, 3, 1), date(2024, 3, 1))]) == [
+        (date(2024, 1, 1), date(2024, 1, 2)), (date(2024, 3, 1), date(2024, 3, 1))]
+    # A long gap still needs one call per 60 days.
+    assert len(pack_windows([(date(2024, 1, 1), date(2024, 12, 31))])) == 7
+
+
+def test_weight_is_the_most_important_index():
+    assert symbol_weight(["NIFTY 500", "NIFTY 50", "NIFTY BANK"]) == 100
+    assert symbol_weight(["NIFTY BANK"]) == DEFAULT_WEIGHT
+    assert symbol_weight([]) == DEFAULT_WEIGHT
+
+
+def test_plan_counts_sessions_and_calls():
+    # 2024-01-22 and 2024-01-26 are exchange holidays.
+    plan = plan_symbol("S0", 5, [(date(2024, 1, 22), date(2024, 1, 26))], "minute")
+    assert (plan["calls"], plan["missing_bars"]) == (1, 3 * 375)
+
+
+def test_schedule_ranks_by_weight_tier_then_bars_per_call():
+    """A NIFTY 50 name with a small gap comes before a small-cap with a large one."""
+    plans = [
+        plan_symbol("SMALL", 10, [(date(2024, 1, 1), date(2024, 2, 29))], "minute"),
+        plan_symbol("LARGE", 100, [(date(2024, 1, 2), date(2024, 1, 2))], "minute"),
+        plan_symbol("OTHER", 10, [(date(2024, 1, 2), date(2024, 1, 2))], "minute"),
+    ]
+    assert schedule(plans) == (["LARGE", "SMALL", "OTHER"], 3)
+
+
+def test_budget_puts_the_plans_that_fit_first():
+    plans = [
+        plan_symbol("A", 100, [(date(2024, 1, 1), date(2024, 4, 29))], "minute"),
+        plan_symbol("B", 60, [(date(2024, 1, 1), date(2024, 2, 29))], "minute"),
+        plan_symbol("C", 5, [(date(2024, 1, 1), date(2024, 2, 29))], "minute"),
+    ]
+    assert [plan["calls"] for plan in plans] == [2, 1, 1]
+
+    assert schedule(plans, call_budget=3) == (["A", "B", "C"], 2)
+    # A does not fit, so B goes first.
+    assert schedule(plans, call_budget=1) == (["B", "A", "C"], 1)
+    assert schedule(plans, call_budget=2)[0][0] == "A"
+
+
+def test_plans_without_a_catalog_cover_the_whole_range():
+    membership = {"A": ["NIFTY 50"]}
+    plans = plan_downloads(["A", "B"], "day", date(2024, 1, 1), date(2024, 1, 31), membership=membership)
+    assert [(plan["symbol"], plan["weight"], plan["calls"]) for plan in plans] == [
+        ("A", 100, 1), ("B", DEFAULT_WEIGHT, 1)]
+    # 21 weekday sessions and the special session of Saturday 2024-01-20.
+    assert plans[0]["missing_bars"] == 22
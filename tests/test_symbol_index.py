@@ -0,0 +1,36 @@
+"""Sector, index and substring filters over the master catalog."""
+import pandas as pd
+
+from lib.datastore.symbol_index import SymbolIndex
+
+MASTER = pd.DataFrame({
+    "Symbol": ["TCS", "INFY", "HDFCBANK", "ABB", "ZENTEC"],
+    "Industry": ["IT", "IT", "Banks", "Capital Goods", None],
+    "Indices": ["NIFTY 50, NIFTY IT", "NIFTY 50, NIFTY IT", "NIFTY 50, NIFTY BANK", "NIFTY 500", None],
+})
+
+
+def selected(symbol_index, **filters):
+    return symbol_index.symbols[symbol_index.mask(**filters)].tolist()
+
+
+def test_filters_match_a_plain_scan():
+    index = SymbolIndex.from_frame(MASTER)
+
+    assert index.symbols.tolist() == ["ABB", "HDFCBANK", "INFY", "TCS", "ZENTEC"]
+    assert index.sectors() == ["Banks", "Capital Goods", "IT"]
+    assert index.indices() == ["NIFTY 50", "NIFTY 500", "NIFTY BANK", "NIFTY IT"]
+    for term in ("", "b", "NF", "CS", "HDFCB", "BANK", "ZZZ", "ABBX"):
+        expected = sorted(symbol for symbol in MASTER["Symbol"] if term.upper() in symbol)
+        assert selected(index, search=term) == expected
+
+
+def test_index_names_match_whole_names_only():
+    """A "NIFTY 50" filter no longer picks the members of "NIFTY 500"."""
+    index = SymbolIndex.from_frame(MASTER)
+
+    assert selected(index, index="NIFTY 50") == ["HDFCBANK", "INFY", "TCS"]
+    assert selected(index, index="NIFTY 500") == ["ABB"]
+    assert selected(index, sector="IT", search="y") == ["INFY"]
+    assert selected(index, sector="IT", index="NIFTY BANK") == []
+    assert selected(index, sector="Unknown") == []
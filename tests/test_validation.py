@@ -0,0 +1,77 @@
+"""Vectorized OHLCV validation and repair."""
+import numpy as np
+import pandas as pd
+
+from lib.datastore.schema import to_bar_table
+from lib.datastore.validation import merge_quality, quality_issues, validate_frame, validate_table
+
+
+def make_bars(periods=100):
+    dates = pd.date_range("2024-01-01 09:15", periods=periods, freq="min", tz="Asia/Kolkata")
+    close = 100 + np.sin(np.arange(periods) / 5)
+    return pd.DataFrame({
+        "date": dates,
+        "open": close,
+        "high": close + 0.5,
+        "low": close - 0.5,
+        "close": close,
+        "volume": np.full(periods, 1000, dtype=np.int64),
+    })
+
+
+def test_clean_table_is_returned_untouched():
+    table = to_bar_table(make_bars())
+    validated, report = validate_table(table)
+
+    assert validated is table
+    assert report["rows"] == 100
+    assert quality_issues(report) == ""
+
+
+def test_repairs_match_a_row_by_row_reference():
+    df = make_bars()
+    # A repeated timestamp appended at the end (kept last) and a swapped pair:
+    # two steps back in time.
+    df = pd.concat([df, df.iloc[[10]]], ignore_index=True)
+    df.iloc[[20, 21]] = df.iloc[[21, 20]].values
+    df.loc[df.index[30], "close"] = np.nan           # invalid price
+    df.loc[df.index[40], "high"] = df["close"].iloc[40] - 1   # high below close
+    df.loc[df.index[50], "volume"] = -5
+
+    repaired, report = validate_frame(df)
+
+    assert {key: report[key] for key in
+            ("unsorted", "duplicates", "invalid_prices", "repaired_bounds", "negative_volume")} == {
+        "unsorted": 2, "duplicates": 1, "invalid_prices": 1, "repaired_bounds": 1, "negative_volume": 1}
+
+    expected = df.sort_values("date", kind="stable").drop_duplicates("date", keep="last")
+    expected = expected.dropna(subset=["open", "high", "low", "close"])
+    expected = expected.assign(
+        high=expected[["open", "high", "close"]].max(axis=1),
+        low=expected[["open", "low", "close"]].min(axis=1),
+        volume=expected["volume"].clip(lower=0),
+    )
+    pd.testing.assert_frame_equal(repaired, expected.reset_index(drop=True), check_dtype=False)
+
+
+def test_isolated_spikes_are_flagged_but_level_shifts_are_not():
+    df = make_bars(200)
+    df.loc[100, ["high", "close"]] = [150.0, 149.0]
+    shifted = df.index >= 150
+    df.loc[shifted, ["open", "high", "low", "close"]] *= 1.5
+
+    _, report = validate_frame(df)
+
+    assert report["spikes"] == 1
+    assert report["max_spike"] > 0.4
+
+
+def test_reports_add_up_across_chunks():
+    df = make_bars()
+    df.loc[5, "volume"] = -1
+    _, first = validate_frame(df.iloc[:50])
+    _, second = validate_frame(df.iloc[50:])
+
+    merged = merge_quality(first, second)
+    assert merged["rows"] == 100
+    assert quality_issues(merged) == "negative_volume=1"
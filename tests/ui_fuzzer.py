@@ -124,8 +124,9 @@ class WizardWalker:
             self.history.append("Pre-fuzz action: Selecting a data source to enable wizard.")
             data_source_widget = self.setup_widget.data_source_widget
             # This is a simplified interaction; assumes the list has items.
-            if data_source_widget.available_instruments_list.count() > 0:
-                data_source_widget.available_instruments_list.setCurrentRow(0)
+            if data_source_widget.available_model.rowCount() > 0:
+                data_source_widget.available_instruments_list.setCurrentIndex(
+                    data_source_widget.available_model.index(0, 0))
                 data_source_widget.add_selected()
                 self.qtbot.wait(100) # Wait for signal propagation
 
@@ -15,16 +15,21 @@ from PySide6.QtWidgets import (
     QHBoxLayout,
     QLabel,
     QLineEdit,
+    QListView,
     QListWidget,
     QProgressBar,
     QPushButton,
+    QSpinBox,
     QVBoxLayout,
     QWidget,
     QTabWidget,
     QTextEdit,
 )
 
+from lib.datastore.bar_store import ARROW, DEFAULT_CODEC, PARQUET, PARQUET_CODECS, PARTITIONED
+from lib.datastore.symbol_index import SymbolIndex
 from lib.downloader.download_worker import DownloadWorker
+from .symbol_list_model import SymbolFilterProxy, SymbolListModel
 
 
 class Communicate(QObject):
@@ -40,6 +45,7 @@ class DownloaderScreen(QWidget):
         self.setObjectName("downloader")
         self.session_manager = session_manager
         self.master_df = None
+        self.symbol_index = None
 
         self.comm = Communicate()
         self.comm.log_signal.connect(self.add_log_entry)
@@ -75,8 +81,12 @@ class DownloaderScreen(QWidget):
         new_job_layout.addWidget(tickers_group)
         tickers_layout = QHBoxLayout(tickers_group)
         
-        self.available_symbols_list = QListWidget()
+        self.symbol_model = SymbolListModel()
+        self.available_model = SymbolFilterProxy(self.symbol_model, self)
+        self.available_symbols_list = QListView()
         self.available_symbols_list.setObjectName("downloader.new_job.available_symbols")
+        self.available_symbols_list.setUniformItemSizes(True)
+        self.available_symbols_list.setModel(self.available_model)
         self.selected_symbols_list = QListWidget()
         self.selected_symbols_list.setObjectName("downloader.new_job.selected_symbols")
         
@@ -119,6 +129,65 @@ class DownloaderScreen(QWidget):
         storage_layout.addWidget(self.output_dir_button)
         interval_layout.addLayout(storage_layout)
 
+        format_layout = QHBoxLayout()
+        self.store_format_combo = QComboBox()
+        self.store_format_combo.setObjectName("downloader.new_job.store_format")
+        self.store_format_combo.addItem("Parquet", PARQUET)
+        self.store_format_combo.addItem("Feather (Arrow IPC)", ARROW)
+        format_layout.addWidget(QLabel("Format:"))
+        format_layout.addWidget(self.store_format_combo)
+        self.compression_combo = QComboBox()
+        self.compression_combo.setObjectName("downloader.new_job.compression")
+        self.compression_combo.addItems(PARQUET_CODECS)
+        self.compression_combo.setCurrentText(DEFAULT_CODEC)
+        format_layout.addWidget(QLabel("Compression:"))
+        format_layout.addWidget(self.compression_combo)
+        self.row_group_spinbox = QSpinBox()
+        self.row_group_spinbox.setObjectName("downloader.new_job.row_group_size")
+        self.row_group_spinbox.setRange(0, 1_000_000)
+        self.row_group_spinbox.setSingleStep(10_000)
+        self.row_group_spinbox.setSpecialValueText("Per chunk")
+        format_layout.addWidget(QLabel("Row Group Rows:"))
+        format_layout.addWidget(self.row_group_spinbox)
+        self.save_csv_checkbox = QCheckBox("Also save CSV")
+        self.save_csv_checkbox.setObjectName("downloader.new_job.save_csv")
+        format_layout.addWidget(self.save_csv_checkbox)
+        format_layout.addStretch()
+        interval_layout.addLayout(format_layout)
+
+        concurrency_layout = QHBoxLayout()
+        self.concurrency_spinbox = QSpinBox()
+        self.concurrency_spinbox.setObjectName("downloader.new_job.concurrency")
+        self.concurrency_spinbox.setRange(1, 16)
+        self.concurrency_spinbox.setValue(3)
+        concurrency_layout.addWidget(QLabel("Parallel Fetchers:"))
+        concurrency_layout.addWidget(self.concurrency_spinbox)
+        self.chunk_concurrency_spinbox = QSpinBox()
+        self.chunk_concurrency_spinbox.setObjectName("downloader.new_job.chunk_concurrency")
+        self.chunk_concurrency_spinbox.setRange(1, 8)
+        self.chunk_concurrency_spinbox.setValue(1)
+        concurrency_layout.addWidget(QLabel("Chunks per Symbol:"))
+        concurrency_layout.addWidget(self.chunk_concurrency_spinbox)
+        concurrency_layout.addStretch()
+        interval_layout.addLayout(concurrency_layout)
+
+        self.update_mode_checkbox = QCheckBox("Update existing data (fetch only missing dates)")
+        self.update_mode_checkbox.setObjectName("downloader.new_job.update_mode")
+        interval_layout.addWidget(self.update_mode_checkbox)
+
+        self.compact_storage_checkbox = QCheckBox("Compact storage (integer tick prices)")
+        self.compact_storage_checkbox.setObjectName("downloader.new_job.compact_storage")
+        interval_layout.addWidget(self.compact_storage_checkbox)
+
+        self.derive_intervals_checkbox = QCheckBox("Derive 3minute to day bars from minute data")
+        self.derive_intervals_checkbox.setObjectName("downloader.new_job.derive_intervals")
+        interval_layout.addWidget(self.derive_intervals_checkbox)
+
+        self.prioritize_checkbox = QCheckBox("Prioritize by index membership and missing data")
+        self.prioritize_checkbox.setObjectName("downloader.new_job.prioritize")
+        self.prioritize_checkbox.setChecked(True)
+        interval_layout.addWidget(self.prioritize_checkbox)
+
         # --- Tab 2: Resume Job ---
         resume_job_widget = QWidget()
         resume_job_widget.setObjectName("downloader.resume_job")
@@ -176,7 +245,8 @@ class DownloaderScreen(QWidget):
     def connect_signals(self):
         self.search_filter.textChanged.connect(self.filter_symbols)
         self.sector_filter.currentIndexChanged.connect(self.filter_symbols)
-        self.available_symbols_list.itemDoubleClicked.connect(lambda item: self.add_to_queue([item.text()]))
+        self.available_symbols_list.doubleClicked.connect(
+            lambda index: self.add_to_queue(self.available_model.symbols_at([index])))
         self.selected_symbols_list.itemDoubleClicked.connect(lambda item: self.remove_from_queue([item.text()]))
         self.output_dir_button.clicked.connect(self.trigger_output_dir_chooser)
         self.manifest_file_button.clicked.connect(self.trigger_manifest_file_chooser)
@@ -197,6 +267,7 @@ class DownloaderScreen(QWidget):
             project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
             master_file_path = os.path.join(project_root, "source_data", "master_catalog_enriched.csv")
             self.master_df = pd.read_csv(master_file_path)
+            self.symbol_index = SymbolIndex.from_frame(self.master_df)
             self.comm.data_loaded_signal.emit()
         except Exception as e:
             self.comm.log_signal.emit(f"Error loading master data: {e}")
@@ -204,22 +275,16 @@ class DownloaderScreen(QWidget):
     def on_data_loaded(self):
         self.search_filter.setDisabled(False)
         self.sector_filter.setDisabled(False)
-        unique_sectors = ["All Sectors"] + sorted(self.master_df["Industry"].dropna().unique().tolist())
-        self.sector_filter.addItems(unique_sectors)
+        self.symbol_model.set_symbols(self.symbol_index.symbols)
+        self.sector_filter.addItems(["All Sectors"] + self.symbol_index.sectors())
         self.filter_symbols()
         self.add_log_entry("Master data loaded.")
 
     def filter_symbols(self):
-        if self.master_df is None: return
-        df = self.master_df.copy()
-        search_term = self.search_filter.text().upper()
+        if self.symbol_index is None: return
         sector = self.sector_filter.currentText()
-        if search_term:
-            df = df[df["Symbol"].str.contains(search_term, na=False)]
-        if sector and sector != "All Sectors":
-            df = df[df["Industry"] == sector]
-        self.available_symbols_list.clear()
-        self.available_symbols_list.addItems(df["Symbol"].tolist())
+        self.available_model.set_mask(self.symbol_index.mask(
+            self.search_filter.text(), sector if sector != "All Sectors" else None))
 
     def add_to_queue(self, symbols):
         current_items = {self.selected_symbols_list.item(i).text() for i in range(self.selected_symbols_list.count())}
@@ -246,6 +311,20 @@ class DownloaderScreen(QWidget):
                 params["end_date"] = self.end_date_edit.date().toPython()
                 params["interval"] = self.interval_combo.currentText()
                 params["output_dir"] = self.output_dir_edit.text()
+                params["update_mode"] = self.update_mode_checkbox.isChecked()
+                params["compact_storage"] = self.compact_storage_checkbox.isChecked()
+                params["derive_intervals"] = self.derive_intervals_checkbox.isChecked()
+                params["store_format"] = self.store_format_combo.currentData()
+                params["compression"] = self.compression_combo.currentText()
+                params["row_group_size"] = self.row_group_spinbox.value()
+                params["save_csv"] = self.save_csv_checkbox.isChecked()
+                params["prioritize"] = self.prioritize_checkbox.isChecked()
+                if params["compact_storage"] and params["store_format"] != PARQUET:
+                    raise ValueError("Compact storage is only available for Parquet.")
+                # Hardcoded params for simplicity, can be re-added to UI.
+                # A resumed job keeps the layout recorded in its journal.
+                params["save_parquet"] = True
+                params["sharding"] = PARTITIONED
             
             elif self.tab_widget.currentIndex() == 1: # Resume Job
                 params["resume_mode"] = True
@@ -253,10 +332,8 @@ class DownloaderScreen(QWidget):
                 if not os.path.exists(params["manifest_path"]):
                     raise ValueError("Manifest file for resume not found.")
 
-            # Hardcoded params for simplicity, can be re-added to UI
-            params["save_csv"] = True
-            params["save_parquet"] = True
-            params["sharding"] = "None"
+            params["concurrency"] = self.concurrency_spinbox.value()
+            params["chunk_concurrency"] = self.chunk_concurrency_spinbox.value()
 
             self.log_view.clear()
             self.progress_bar.setValue(0)
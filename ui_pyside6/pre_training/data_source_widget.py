@@ -3,7 +3,7 @@ from PySide6.QtWidgets import (
     QVBoxLayout,
     QGroupBox,
     QComboBox,
-    QListWidget,
+    QListView,
     QPushButton,
     QHBoxLayout,
     QDateEdit,
@@ -15,11 +15,16 @@ from PySide6.QtWidgets import (
     QLineEdit,
 )
 from PySide6.QtCore import Signal, QDate
-import json
 import os
-from datetime import datetime
+import numpy as np
 import pandas as pd
 
+from lib.datastore.catalog import open_catalog
+from lib.datastore.coverage import coverage_summary
+from lib.datastore.dataset_index import DatasetIndex
+from lib.datastore.symbol_index import SymbolIndex
+from ..symbol_list_model import SymbolFilterProxy, SymbolListModel
+
 class DataSourceWidget(QWidget):
     data_source_selected = Signal(bool)
     configuration_changed = Signal()
@@ -27,8 +32,10 @@ class DataSourceWidget(QWidget):
     def __init__(self):
         super().__init__()
         self.setObjectName("data_source")
-        self._metadata = []
+        self._dataset_index = DatasetIndex()
+        self._data_dir = None
         self.master_df = None
+        self.symbol_index = None
         self.selected_symbols = []
         
         self.init_ui()
@@ -42,6 +49,7 @@ class DataSourceWidget(QWidget):
             "master_start_date": self.master_start_date.date().toString("yyyy-MM-dd"),
             "master_end_date": self.master_end_date.date().toString("yyyy-MM-dd"),
             "validation_method": self.split_method_combo.currentText(),
+            "data_dir": self._data_dir,
         }
         
         validation_method = self.split_method_combo.currentText()
@@ -139,9 +147,16 @@ class DataSourceWidget(QWidget):
         main_layout.setContentsMargins(0,0,0,0)
         available_layout = QVBoxLayout()
         available_layout.addWidget(QLabel("Available"))
-        self.available_instruments_list = QListWidget()
+        # Both lists are filtered views of one symbol vector.
+        self.symbol_model = SymbolListModel()
+        self.available_model = SymbolFilterProxy(self.symbol_model, self)
+        self.selected_model = SymbolFilterProxy(self.symbol_model, self)
+        self.selected_model.set_mask(np.zeros(0, dtype=bool))
+        self.available_instruments_list = QListView()
         self.available_instruments_list.setObjectName("data_source.instrument_selection.available_list")
         self.available_instruments_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.available_instruments_list.setUniformItemSizes(True)
+        self.available_instruments_list.setModel(self.available_model)
         available_layout.addWidget(self.available_instruments_list)
         main_layout.addLayout(available_layout)
         buttons_layout = QVBoxLayout()
@@ -163,9 +178,11 @@ class DataSourceWidget(QWidget):
         selected_layout = QVBoxLayout()
         self.selected_count_label = QLabel("Selected: 0")
         selected_layout.addWidget(self.selected_count_label)
-        self.selected_instruments_list = QListWidget()
+        self.selected_instruments_list = QListView()
         self.selected_instruments_list.setObjectName("data_source.instrument_selection.selected_list")
         self.selected_instruments_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.selected_instruments_list.setUniformItemSizes(True)
+        self.selected_instruments_list.setModel(self.selected_model)
         selected_layout.addWidget(self.selected_instruments_list)
         main_layout.addLayout(selected_layout)
         return container
@@ -250,10 +267,10 @@ class DataSourceWidget(QWidget):
         self.remove_button.clicked.connect(self.remove_selected)
         self.add_all_button.clicked.connect(self.add_all)
         self.remove_all_button.clicked.connect(self.remove_all)
-        self.available_instruments_list.itemDoubleClicked.connect(lambda item: self.add_to_queue([item.text()]))
-        self.selected_instruments_list.itemDoubleClicked.connect(lambda item: self.remove_from_queue([item.text()]))
-        self.selected_instruments_list.model().rowsInserted.connect(self._update_date_guidance)
-        self.selected_instruments_list.model().rowsRemoved.connect(self._update_date_guidance)
+        self.available_instruments_list.doubleClicked.connect(
+            lambda index: self.add_to_queue(self.available_model.symbols_at([index])))
+        self.selected_instruments_list.doubleClicked.connect(
+            lambda index: self.remove_from_queue(self.selected_model.symbols_at([index])))
         self.time_interval_combo.currentIndexChanged.connect(self._filter_available_instruments)
         self.search_filter.textChanged.connect(self._filter_available_instruments)
         self.sector_filter.currentIndexChanged.connect(self._filter_available_instruments)
@@ -267,8 +284,6 @@ class DataSourceWidget(QWidget):
         self.validation_start_date.dateChanged.connect(self.validate_date_ranges)
         self.validation_end_date.dateChanged.connect(self.validate_date_ranges)
         self.time_interval_combo.currentIndexChanged.connect(self.configuration_changed)
-        self.selected_instruments_list.model().rowsInserted.connect(self.configuration_changed)
-        self.selected_instruments_list.model().rowsRemoved.connect(self.configuration_changed)
         self.master_start_date.dateChanged.connect(self.configuration_changed)
         self.master_end_date.dateChanged.connect(self.configuration_changed)
         self.split_method_combo.currentIndexChanged.connect(self.configuration_changed)
@@ -281,48 +296,43 @@ class DataSourceWidget(QWidget):
 
     def load_data(self):
         project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+        self._data_dir = os.path.join(project_root, "generated_data")
         try:
-            metadata_path = os.path.join(project_root, "generated_data", "metadata.json")
-            with open(metadata_path, "r") as f:
-                self._metadata = json.load(f)
-            all_intervals = ["All Intervals"] + sorted(list(set(item['interval'] for item in self._metadata)))
-            self.time_interval_combo.addItems(all_intervals)
+            with open_catalog(self._data_dir, read_only=True) as catalog:
+                self._dataset_index = DatasetIndex.from_catalog(catalog)
+            self.time_interval_combo.addItems(["All Intervals"] + self._dataset_index.intervals())
         except Exception as e:
-            print(f"Error loading metadata.json: {e}")
+            print(f"Error loading dataset catalog: {e}")
         try:
             master_catalog_path = os.path.join(project_root, "source_data", "master_catalog_enriched.csv")
             self.master_df = pd.read_csv(master_catalog_path)
+            self.symbol_index = SymbolIndex.from_frame(self.master_df)
+            self.symbol_model.set_symbols(self.symbol_index.symbols)
+            self.selected_model.set_mask(np.isin(self.symbol_model.symbols, self.selected_symbols))
             self._populate_filters()
         except Exception as e:
             print(f"Error loading master_catalog_enriched.csv: {e}")
         self._filter_available_instruments()
 
     def _populate_filters(self):
-        if self.master_df is None: return
-        unique_sectors = ["All Sectors"] + sorted(self.master_df["Industry"].dropna().unique().tolist())
-        self.sector_filter.addItems(unique_sectors)
-        all_indices = self.master_df["Indices"].dropna().apply(lambda x: [idx.strip() for idx in x.split(',')]).explode().unique().tolist()
-        unique_indices = ["All Indices"] + sorted(all_indices)
-        self.index_filter.addItems(unique_indices)
+        if self.symbol_index is None: return
+        self.sector_filter.addItems(["All Sectors"] + self.symbol_index.sectors())
+        self.index_filter.addItems(["All Indices"] + self.symbol_index.indices())
 
     def _filter_available_instruments(self):
-        if self.master_df is None or not self._metadata: return
-        selected_interval = self.time_interval_combo.currentText()
-        interval_symbols = {item['symbol'] for item in self._metadata if selected_interval == "All Intervals" or item['interval'] == selected_interval}
-        df = self.master_df.copy()
-        search_term = self.search_filter.text().upper()
+        if self.symbol_index is None or not len(self._dataset_index): return
         sector = self.sector_filter.currentText()
         index = self.index_filter.currentText()
-        if search_term:
-            df = df[df["Symbol"].str.contains(search_term, na=False)]
-        if sector != "All Sectors":
-            df = df[df["Industry"] == sector]
-        if index != "All Indices":
-            df = df[df["Indices"].str.contains(index, na=False)]
-        catalog_symbols = set(df["Symbol"].tolist())
-        final_symbols = sorted(list(interval_symbols.intersection(catalog_symbols)))
-        self.available_instruments_list.clear()
-        self.available_instruments_list.addItems([s for s in final_symbols if s not in self.selected_symbols])
+        mask = self.symbol_index.mask(
+            self.search_filter.text(),
+            sector if sector != "All Sectors" else None,
+            index if index != "All Indices" else None,
+        )
+        symbols = self.symbol_index.symbols
+        mask &= self._dataset_index.available(symbols, self._selected_interval())
+        if self.selected_symbols:
+            mask &= ~np.isin(symbols, self.selected_symbols)
+        self.available_model.set_mask(mask)
         self.configuration_changed.emit()
 
     def _update_date_guidance(self):
@@ -332,7 +342,9 @@ class DataSourceWidget(QWidget):
             return
         max_start, min_end = self.get_date_intersection()
         if max_start and min_end and max_start <= min_end:
-            self.overlapping_dates_label.setText(f"Selected Instruments Overlap: {max_start.isoformat()} to {min_end.isoformat()}")
+            self.overlapping_dates_label.setText(
+                f"Selected Instruments Overlap: {max_start.isoformat()} to {min_end.isoformat()}"
+                + self._coverage_text(max_start, min_end))
             q_max_start = QDate(max_start.year, max_start.month, max_start.day)
             q_min_end = QDate(min_end.year, min_end.month, min_end.day)
             self.master_start_date.setMinimumDate(q_max_start)
@@ -346,6 +358,25 @@ class DataSourceWidget(QWidget):
         self._update_ui_state()
         self._update_validation_ranges()
 
+    def _coverage_text(self, start, end):
+        """Completeness of the selection over [start, end], from the catalog's coverage index."""
+        interval = self.time_interval_combo.currentText()
+        if interval == "All Intervals" or not len(self._dataset_index):
+            return ""
+        try:
+            with open_catalog(self._data_dir, read_only=True) as catalog:
+                summary = coverage_summary(catalog, self.selected_symbols, interval, start, end)
+        except Exception as e:
+            print(f"Error reading coverage index: {e}")
+            return ""
+        if not summary["sessions"]:
+            return ""
+        parts = [f"{summary['complete']}/{summary['sessions']} sessions complete"]
+        for key in ("partial", "missing", "unknown"):
+            if summary[key]:
+                parts.append(f"{summary[key]} {key}")
+        return " (" + ", ".join(parts) + ")"
+
     def _update_validation_ranges(self):
         start_date = self.master_start_date.date()
         end_date = self.master_end_date.date()
@@ -366,30 +397,25 @@ class DataSourceWidget(QWidget):
         self.split_options_stack.setEnabled(has_selection)
         self.data_source_selected.emit(has_selection)
 
+    def _selected_interval(self):
+        """The interval chosen in the combo, or None for all intervals."""
+        interval = self.time_interval_combo.currentText()
+        return None if interval == "All Intervals" else interval
+
     def get_date_intersection(self):
         if not self.selected_symbols: return None, None
-        max_start, min_end, date_format = None, None, "%Y-%m-%d"
-        selected_interval = self.time_interval_combo.currentText()
-        for symbol in self.selected_symbols:
-            for item in self._metadata:
-                if item['symbol'] == symbol and (selected_interval == "All Intervals" or item['interval'] == selected_interval):
-                    start_date = datetime.strptime(item['start_date'], date_format).date()
-                    end_date = datetime.strptime(item['end_date'], date_format).date()
-                    if max_start is None or start_date > max_start: max_start = start_date
-                    if min_end is None or end_date < min_end: min_end = end_date
-        return max_start, min_end
+        return self._dataset_index.intersection(self.selected_symbols, self._selected_interval())
 
     def add_selected(self):
-        symbols = [item.text() for item in self.available_instruments_list.selectedItems()]
+        symbols = self.available_model.symbols_at(self.available_instruments_list.selectedIndexes())
         self.add_to_queue(symbols)
 
     def remove_selected(self):
-        symbols = [item.text() for item in self.selected_instruments_list.selectedItems()]
+        symbols = self.selected_model.symbols_at(self.selected_instruments_list.selectedIndexes())
         self.remove_from_queue(symbols)
 
     def add_all(self):
-        all_symbols = [self.available_instruments_list.item(i).text() for i in range(self.available_instruments_list.count())]
-        self.add_to_queue(all_symbols)
+        self.add_to_queue(self.available_model.visible_symbols())
 
     def remove_all(self):
         self.selected_symbols.clear()
@@ -409,8 +435,7 @@ class DataSourceWidget(QWidget):
 
     def refresh_lists(self):
         self.selected_symbols.sort()
-        self.selected_instruments_list.clear()
-        self.selected_instruments_list.addItems(self.selected_symbols)
+        self.selected_model.set_mask(np.isin(self.symbol_model.symbols, self.selected_symbols))
         self.selected_count_label.setText(f"Selected: {len(self.selected_symbols)}")
         self._filter_available_instruments()
         self._update_date_guidance()
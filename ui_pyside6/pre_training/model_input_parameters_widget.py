@@ -370,8 +370,8 @@ class ModelInputParametersWidget(QWidget):
         style = f"background-color: {color.name()}; color: {text_color};"
         button.setStyleSheet(style)
 
-    def _update_per_sample_estimate(self):
-        """Calculates and displays the uncompressed size of a single sample."""
+    def per_sample_bytes(self):
+        """Uncompressed size of a single sample in bytes."""
         h = self.target_height_spinbox.value()
         w = self.target_width_spinbox.value()
         
@@ -383,7 +383,11 @@ class ModelInputParametersWidget(QWidget):
         else: # RGB
             c = 3
             
-        total_bytes = h * w * c
+        return h * w * c
+
+    def _update_per_sample_estimate(self):
+        """Calculates and displays the uncompressed size of a single sample."""
+        total_bytes = self.per_sample_bytes()
         
         if total_bytes < 1024:
             size_str = f"{total_bytes} B"
@@ -0,0 +1,87 @@
+import numpy as np
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QSortFilterProxyModel, Qt
+
+
+class SymbolListModel(QAbstractListModel):
+    """A read-only list model over a NumPy vector of symbols."""
+
+    def __init__(self, symbols=(), parent=None):
+        super().__init__(parent)
+        self._symbols = np.asarray(symbols, dtype=str)
+        # Bumped on every replacement, so filter masks can tell they are stale.
+        self.version = 0
+
+    @property
+    def symbols(self):
+        return self._symbols
+
+    def set_symbols(self, symbols):
+        """
+        Replaces the whole vector; views reset once. Masks set on filter
+        proxies before the replacement hide every row until they are set again.
+        """
+        self.beginResetModel()
+        self._symbols = np.asarray(symbols, dtype=str)
+        self.version += 1
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        """Return the number of symbols in the model."""
+        if parent.isValid():
+            return 0
+        return len(self._symbols)
+
+    def data(self, index, role=Qt.DisplayRole):
+        """Return the symbol of a row."""
+        if not index.isValid() or not 0 <= index.row() < len(self._symbols):
+            return None
+        if role == Qt.DisplayRole:
+            return str(self._symbols[index.row()])
+        return None
+
+
+class SymbolFilterProxy(QSortFilterProxyModel):
+    """
+    Shows the rows of a SymbolListModel selected by a boolean mask over its
+    vector. Changing the mask re-filters in place: attached views receive
+    only the rows removed and inserted, not a reset, so their selection,
+    scroll position and item layout survive every keystroke.
+    """
+
+    def __init__(self, source, parent=None):
+        super().__init__(parent)
+        self._mask = None
+        self._version = source.version
+        self.setSourceModel(source)
+
+    def set_mask(self, mask):
+        """Shows the source rows where `mask` is True; None shows every row."""
+        if hasattr(self, "beginFilterChange"):
+            self.beginFilterChange()
+            self._mask, self._version = mask, self.sourceModel().version
+            self.endFilterChange(QSortFilterProxyModel.Direction.Rows)
+        else:
+            self._mask, self._version = mask, self.sourceModel().version
+            self.invalidateRowsFilter()
+
+    def _stale(self):
+        """True when the source vector was replaced since the mask was set."""
+        return self._mask is not None and self._version != self.sourceModel().version
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        # A stale mask hides every row until the owner sets a new one.
+        if self._mask is None:
+            return True
+        return not self._stale() and bool(self._mask[source_row])
+
+    def visible_symbols(self):
+        """Symbols of every row shown, in order."""
+        symbols = self.sourceModel().symbols
+        if self._mask is None:
+            return symbols.tolist()
+        return [] if self._stale() else symbols[self._mask].tolist()
+
+    def symbols_at(self, indexes):
+        """Symbols of the given proxy indexes, e.g. a view's selected rows."""
+        symbols = self.sourceModel().symbols
+        return [str(symbols[self.mapToSource(index).row()]) for index in indexes]
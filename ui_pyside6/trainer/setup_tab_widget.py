@@ -13,8 +13,10 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Signal, Qt, QTimer, QSize
 
 import json
+import logging
 import os
 
+from analysis.sample_count_worker import SampleCountWorker
 from ..pre_training.data_source_widget import DataSourceWidget
 from ..pre_training.model_input_parameters_widget import ModelInputParametersWidget
 from ..pre_training.model_architecture_widget import ModelArchitectureWidget
@@ -32,6 +34,7 @@ class SetupTabWidget(QWidget):
         self.setObjectName("setup_tab")
         self.is_fully_initialized = False
         self.visited_pages = set()
+        self._size_worker = None
         self.steps = [
             ("1. Data Source", DataSourceWidget),
             ("2. Input Parameters", ModelInputParametersWidget),
@@ -183,6 +186,7 @@ class SetupTabWidget(QWidget):
                 widget.configuration_changed.connect(
                     self.model_input_parameters_widget.invalidate_total_estimate
                 )
+                widget.configuration_changed.connect(self._discard_size_estimate)
 
         # Inter-widget communication
         self.model_input_parameters_widget.resolution_changed.connect(
@@ -254,21 +258,37 @@ class SetupTabWidget(QWidget):
         self.error_correction_widget.set_dynamic_plane_mode(is_dynamic)
 
     def _on_calculate_total_size_requested(self):
-        # This is where the heavy calculation will be triggered.
-        # For now, we'll simulate it to confirm the UI works.
+        """Counts the samples the stored bars yield in a worker thread; see _on_samples_counted."""
+        config = self.get_configuration()
+        if not config.get("instruments") or config.get("interval") == "All Intervals":
+            self.model_input_parameters_widget.invalidate_total_estimate()
+            return
         self.model_input_parameters_widget.set_total_size_estimate("", "", "calculating")
+        # Reading the bars of many symbols takes a while, so a worker thread
+        # does it and signals back when it is finished.
+        worker = SampleCountWorker(config, self)
+        worker.counted.connect(lambda samples: self._on_samples_counted(worker, samples))
+        worker.failed.connect(lambda message: self._on_sample_count_failed(worker, message))
+        worker.finished.connect(worker.deleteLater)
+        self._size_worker = worker
+        worker.start()
+
+    def _discard_size_estimate(self):
+        """Ignores the running estimate's result; the configuration it was started with changed."""
+        self._size_worker = None
+
+    def _on_samples_counted(self, worker, samples):
+        if worker is not self._size_worker:
+            return
+        total_gb = samples * self.model_input_parameters_widget.per_sample_bytes() / 1024**3
+        self.model_input_parameters_widget.set_total_size_estimate(
+            f"~ {total_gb:.2f} GB", f"{samples:,} samples", "done"
+        )
 
-        # In a real implementation, a worker thread would be started here.
-        # We use a QTimer to simulate a delay.
-        def _fake_calculation_done():
-            # This would be called by the worker thread's finished signal.
-            dummy_size = 5.4 
-            dummy_files = 12345
-            self.model_input_parameters_widget.set_total_size_estimate(
-                f"~ {dummy_size:.2f} GB", f"{dummy_files:,} files", "done"
-            )
-
-        QTimer.singleShot(2000, _fake_calculation_done) # Simulate 2-second calculation
+    def _on_sample_count_failed(self, worker, message):
+        logging.error(f"Error reading bars for the size estimate: {message}")
+        if worker is self._size_worker:
+            self.model_input_parameters_widget.set_total_size_estimate("", "", "error")
 
     def get_configuration(self):
         config = {}
@@ -282,6 +302,8 @@ class SetupTabWidget(QWidget):
         config_for_hash = self.get_configuration()
         config_for_hash.pop("output_metrics", None)
         config_for_hash.pop("experiment_name", None)
+        # Where the data lives is not part of the experiment.
+        config_for_hash.pop("data_dir", None)
         self.run_output_widget.update_experiment_name(config_for_hash)
 
     def _on_apply(self):
@@ -114,11 +114,23 @@ class UserScreen(QWidget):
     def go_back(self):
         self.back_requested.emit()
 
+    def fetch_dashboard(self):
+        """
+        Fetches the dashboard's margins, positions and holdings, booking each
+        call in the Kite client's quota (the one shared with downloads, once
+        the app has set it). Kite errors (e.g. an expired session) propagate
+        to the caller.
+        """
+        kite = self.session_manager.get_kite()
+        results = []
+        for fetch in (kite.margins, kite.positions, kite.holdings):
+            self.kite_api.book()
+            results.append(fetch())
+        return tuple(results)
+
     def try_auto_login(self):
         if self.kite_api.is_session_valid():
-            margins = self.session_manager.get_kite().margins()
-            positions = self.session_manager.get_kite().positions()
-            holdings = self.session_manager.get_kite().holdings()
+            margins, positions, holdings = self.fetch_dashboard()
             self.comm.update_status_signal.emit(
                 "Logged in from saved session", True, margins, positions, holdings
             )
@@ -130,9 +142,7 @@ class UserScreen(QWidget):
 
         if auth_server.request_token:
             if self.session_manager.generate_session(auth_server.request_token):
-                margins = self.session_manager.get_kite().margins()
-                positions = self.session_manager.get_kite().positions()
-                holdings = self.session_manager.get_kite().holdings()
+                margins, positions, holdings = self.fetch_dashboard()
                 self.comm.update_status_signal.emit(
                     "Login successful", True, margins, positions, holdings
                 )